@@ -80,9 +80,21 @@ def arg_parser_reader(arg_parser=None):
         arg_parser.add_argument(
             "-lco", "--listCompileOrder", action="store_true", help="list compile order"
         )
+        arg_parser.add_argument(
+            "-lts",
+            "--listTestSelection",
+            action="store_true",
+            help="list tests selected to run and why",
+        )
         arg_parser.add_argument(
             "-fc", "--forceCompile", action="store_true", help="force recompile"
         )
+        arg_parser.add_argument(
+            "-fs",
+            "--forceSimulation",
+            action="store_true",
+            help="run tests with cached pass verdicts",
+        )
         arg_parser.add_argument(
             "-sof",
             "--stopOnFailure",
@@ -171,8 +183,10 @@ def arg_parser_update_settings(settings, args) -> "HDLRegressionSettings":
 
     settings.set_list_testcase(args.listTestcase)
     settings.set_list_compile_order(args.listCompileOrder)
+    settings.set_list_test_selection(args.listTestSelection)
     settings.set_list_testgroup(args.listTestgroup)
     settings.set_force_recompile(args.forceCompile)
+    settings.set_force_simulation(args.forceSimulation)
 
     if args.exportTestcaseJson:
         settings.set_export_testcases_json_path(args.exportTestcaseJson[0])
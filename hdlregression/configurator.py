@@ -43,12 +43,14 @@ class SettingsConfigurator:
         settings.set_run_all(default_settings.get_run_all())
         settings.set_debug_mode(default_settings.get_debug_mode())
         settings.set_force_recompile(default_settings.get_force_recompile())
+        settings.set_force_simulation(default_settings.get_force_simulation())
         settings.set_clean(default_settings.get_clean())
         settings.set_testcase(default_settings.get_testcase())
         settings.set_testgroup(default_settings.get_testgroup())
         settings.set_list_testcase(default_settings.get_list_testcase())
         settings.set_export_testcases_json_path(default_settings.get_export_testcases_json_path())
         settings.set_list_compile_order(default_settings.get_list_compile_order())
+        settings.set_list_test_selection(default_settings.get_list_test_selection())
         settings.set_list_testgroup(default_settings.get_list_testgroup())
         settings.set_stop_on_failure(default_settings.get_stop_on_failure())
         settings.set_no_sim(default_settings.get_no_sim())
@@ -42,18 +42,108 @@ class ContainerIndexTypeError(HDLContainerError):
         return 'Error when accessing container index of type: %s.' % (self.type_name)
 
 
+# Attribute names of the sets kept by get_list_set()
+LIST_SET_NAMES = set()
+
+
+def get_list_set(owner, list_name) -> set:
+    """
+    Returns a set with the items of a list attribute of owner, used
+    for checking if an item is listed in constant time. The set is
+    kept next to the list and rebuilt if the list has changed length,
+    e.g. for objects loaded from a previous run.
+    """
+    item_list = getattr(owner, list_name)
+    set_name = "_{}_set".format(list_name)
+    item_set = getattr(owner, set_name, None)
+    if item_set is None or len(item_set) != len(item_list):
+        item_set = set(item_list)
+        setattr(owner, set_name, item_set)
+        LIST_SET_NAMES.add(set_name)
+    return item_set
+
+
+# Attribute name of the flag set by set_changed()
+CHANGED_NAME = "_changed"
+
+
+def set_changed(owner) -> None:
+    """
+    Marks owner as changed, i.e. a file, scan data or module loaded
+    from the project database is saved again, see ProjectDatabase.
+    The flag is not saved.
+    """
+    setattr(owner, CHANGED_NAME, True)
+
+
 class Container:
+    """
+    Insertion ordered storage of elements. Elements are indexed by
+    their case-folded name, and by identity, so adding and looking up
+    elements is done in constant time. The indexes are not pickled,
+    they are rebuilt when first used.
+    """
+
     def __init__(self, name=None):
         self.storage = []
         self.name = name.lower() if name else "no_name"
+        self._name_indexes = {}
+        self._id_set = None
+
+    def __getstate__(self) -> dict:
+        return {"storage": self.storage, "name": self.name}
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        self._name_indexes = {}
+        self._id_set = None
+
+    def _get_name_index(self, index_method="get_name") -> dict:
+        """
+        Returns a dict with the elements sharing the same case-folded
+        value of index_method, in insertion order.
+        """
+        name_index = self._name_indexes.get(index_method)
+        if name_index is None:
+            name_index = {}
+            for element in self.storage:
+                try:
+                    name = getattr(element, index_method)().lower()
+                except Exception:
+                    raise ContainerNameError(str(element))
+                name_index.setdefault(name, []).append(element)
+            self._name_indexes[index_method] = name_index
+        return name_index
+
+    def _get_id_set(self) -> set:
+        if self._id_set is None:
+            self._id_set = {id(element) for element in self.storage}
+        return self._id_set
+
+    def _reset_indexes(self) -> None:
+        self._name_indexes = {}
+        self._id_set = None
 
     def add(self, element) -> bool:
-        if element not in self.storage:
-            self.storage.append(element)
-            return True
+        # Elements compared by value, e.g. lists, are searched for
+        if type(element).__eq__ is object.__eq__:
+            is_added = id(element) in self._get_id_set()
         else:
+            is_added = element in self.storage
+        if is_added:
             return False
 
+        self.storage.append(element)
+        self._get_id_set().add(id(element))
+        for index_method, name_index in list(self._name_indexes.items()):
+            try:
+                name = getattr(element, index_method)().lower()
+            except Exception:
+                del self._name_indexes[index_method]
+                continue
+            name_index.setdefault(name, []).append(element)
+        return True
+
     def add_element_from_list(self, element_list):
         if isinstance(element_list, list):
             for element in element_list:
@@ -70,23 +160,32 @@ class Container:
     def get(self, name=None) -> list:
         if not name:
             return self.storage
-        else:
-            for element in self.storage:
-                try:
-                    if element.get_name().lower() == name.lower():
-                        return element
-                except:
-                    raise ContainerNameError(name)
-        return Container()
+        element = self.find(name)
+        return Container() if element is None else element
+
+    def find(self, name, index_method="get_name"):
+        """
+        Returns the first element where the value of index_method
+        matches name (not case sensitive), or None if not found.
+        """
+        if not self.storage or name is None:
+            return None
+        element_list = self._get_name_index(index_method).get(name.lower())
+        return element_list[0] if element_list else None
 
     def remove(self, element_name) -> None:
-        if isinstance(element_name, str):
-            temp_list = [element for element in self.storage
-                         if element.get_name().lower() != element_name.lower()]
-        else:
-            temp_list = [element for element in self.storage
-                         if element.get_name().lower() != element_name.get_name().lower()]
-        self.storage = temp_list
+        if not isinstance(element_name, str):
+            element_name = element_name.get_name()
+        if not self.storage:
+            return
+        removed_list = self._get_name_index().get(element_name.lower())
+        if not removed_list:
+            return
+        removed_ids = {id(element) for element in removed_list}
+        # Storage is replaced, i.e. a list returned by get() can be
+        # iterated while removing elements.
+        self.storage = [element for element in self.storage if id(element) not in removed_ids]
+        self._reset_indexes()
 
     def num_elements(self) -> int:
         return len(self.storage)
@@ -99,19 +198,22 @@ class Container:
 
     def empty_list(self) -> int:
         self.storage = []
+        self._reset_indexes()
 
     def exists(self, name) -> bool:
-        for element in self.storage:
-            if element.get_name().lower() == name.lower():
-                return True
-        return False
+        return self.find(name) is not None
 
     def update(self, item) -> bool:
-        for element in self.storage:
-            try:
-                if element.get_name() == item.get_name():
-                    element = item
-                    return True
-            except:
-                raise ContainerNameError(item.get_name())
-        return False
+        """
+        Replaces the first element with the same name as item.
+        """
+        element = self.find(item.get_name())
+        if element is None:
+            return False
+        if element is not item:
+            for idx, stored_element in enumerate(self.storage):
+                if stored_element is element:
+                    self.storage[idx] = item
+                    break
+            self._reset_indexes()
+        return True
@@ -13,6 +13,8 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
 #
 
+from .container import get_list_set, set_changed
+
 
 class BaseModule:
 
@@ -29,11 +31,13 @@ class BaseModule:
         self.int_dep_on_this_list = []
         self.int_dep_list = []
         self.ext_dep_list = []
+        self.ext_unit_dep_list = []
         self.this_depend_of_list = []
         self.depent_of_this_list = []
 
     def set_hdlfile(self, hdlfile):
         self.hdlfile = hdlfile
+        set_changed(self)
         self.logger.debug(
             "[%s] file=%s" % (self.get_name(), self.hdlfile.get_filename_with_path())
         )
@@ -43,12 +47,14 @@ class BaseModule:
 
     def set_name(self, name):
         self.name = name.lower()
+        set_changed(self)
 
     def get_name(self) -> str:
         return self.name
 
     def set_type(self, type):
         self.type = type.lower()
+        set_changed(self)
         self.logger.debug("[%s] type=%s" % (self.get_name(), self.type))
 
     def get_type(self) -> str:
@@ -56,6 +62,7 @@ class BaseModule:
 
     def set_library(self, library):
         self.library = library
+        set_changed(self)
         self.logger.debug(
             "[%s] library=%s" % (self.get_name(), self.library.get_name())
         )
@@ -65,6 +72,7 @@ class BaseModule:
 
     def set_filename(self, filename):
         self.filename = filename
+        set_changed(self)
 
     def get_filename(self) -> str:
         return self.filename
@@ -79,17 +87,15 @@ class BaseModule:
         return []
 
     def add_int_dep(self, dep_name_list):
-        if isinstance(dep_name_list, list):
-            for item in dep_name_list:
-                item_name = item.lower()
-                if not (item_name in self.int_dep_list):
-                    self.int_dep_list.append(item_name)
-                    self.logger.debug("[%s] int_dep=%s" % (self.get_name(), item_name))
-        else:
-            dep_name = dep_name_list.lower()
-            if not (dep_name in self.int_dep_list):
-                self.int_dep_list.append(dep_name)
-                self.logger.debug("[%s] int_dep=%s" % (self.get_name(), dep_name))
+        dep_list = dep_name_list if isinstance(dep_name_list, list) else [dep_name_list]
+        dep_set = get_list_set(self, "int_dep_list")
+        for item in dep_list:
+            item_name = item.lower()
+            if not (item_name in dep_set):
+                self.int_dep_list.append(item_name)
+                dep_set.add(item_name)
+                set_changed(self)
+                self.logger.debug("[%s] int_dep=%s" % (self.get_name(), item_name))
 
     def get_int_dep(self) -> list:
         return self.int_dep_list
@@ -105,46 +111,77 @@ class BaseModule:
         if self.get_is_verilog_module() is False:
             module_name = module_name.lower()
         self.int_dep_list.remove(module_name)
+        get_list_set(self, "int_dep_list").discard(module_name)
+        set_changed(self)
 
     def add_ext_dep(self, dep):
-        if isinstance(dep, list):
-            for item in dep:
-                item_name = item.lower()
-                if not (item_name in self.ext_dep_list):
-                    self.ext_dep_list.append(item_name)
-                    self.logger.debug("[%s] ext_dep=%s" % (self.get_name(), item_name))
-        else:
-            dep_name = dep.lower()
-            if not (dep_name in self.ext_dep_list):
-                self.ext_dep_list.append(dep_name)
-                self.logger.debug("[%s] ext_dep=%s" % (self.get_name(), dep_name))
+        dep_list = dep if isinstance(dep, list) else [dep]
+        dep_set = get_list_set(self, "ext_dep_list")
+        for item in dep_list:
+            item_name = item.lower()
+            if not (item_name in dep_set):
+                self.ext_dep_list.append(item_name)
+                dep_set.add(item_name)
+                set_changed(self)
+                self.logger.debug("[%s] ext_dep=%s" % (self.get_name(), item_name))
 
     def get_ext_dep(self) -> list:
         return self.ext_dep_list
 
+    def add_ext_unit_dep(self, dep):
+        """
+        Adds a design unit in another library, i.e. "<library>.<unit>",
+        where unit "all" refers to every unit in the library.
+        """
+        dep_list = dep if isinstance(dep, list) else [dep]
+        ext_unit_dep_list = self.get_ext_unit_dep()
+        dep_set = get_list_set(self, "ext_unit_dep_list")
+        for item in dep_list:
+            item_name = item.lower()
+            if not (item_name in dep_set):
+                ext_unit_dep_list.append(item_name)
+                dep_set.add(item_name)
+                set_changed(self)
+                self.logger.debug("[%s] ext_unit_dep=%s" % (self.get_name(), item_name))
+
+    def get_ext_unit_dep(self) -> list:
+        # Modules saved before external units were detected
+        if not hasattr(self, "ext_unit_dep_list"):
+            self.ext_unit_dep_list = []
+            set_changed(self)
+        return self.ext_unit_dep_list
+
     def set_complete(self, complete=True):
         self.complete = complete
+        set_changed(self)
         self.logger.debug("[%s] complete=%s" % (self.get_name(), complete))
 
     def get_complete(self) -> bool:
         return self.complete
 
     def set_depend_of_this(self, dep):
-        if not (dep in self.depent_of_this_list):
+        dep_set = get_list_set(self, "depent_of_this_list")
+        if not (dep in dep_set):
             self.depent_of_this_list.append(dep)
+            dep_set.add(dep)
+            set_changed(self)
 
     def get_depend_of_this(self) -> list:
         return self.depent_of_this_list
 
     def set_this_depend_of(self, dep):
-        if not (dep in self.this_depend_of_list):
+        dep_set = get_list_set(self, "this_depend_of_list")
+        if not (dep in dep_set):
             self.this_depend_of_list.append(dep)
+            dep_set.add(dep)
+            set_changed(self)
 
     def get_this_depend_of(self) -> list:
         return self.this_depend_of_list
 
     def set_is_tb(self):
         self.is_tb = True
+        set_changed(self)
 
     def get_is_tb(self) -> bool:
         return self.is_tb
@@ -187,6 +224,7 @@ class EntityModule(BaseModule):
         generic = generic.lower().replace(" ", "")
         if not (generic in self.generic_list):
             self.generic_list.append(generic)
+            set_changed(self)
 
     def get_generic(self) -> list:
         return self.generic_list
@@ -194,6 +232,7 @@ class EntityModule(BaseModule):
     def add_architecture(self, arch):
         if not (arch in self.arch_list):
             self.arch_list.append(arch)
+            set_changed(self)
 
     def get_architecture(self) -> list:
         return self.arch_list
@@ -275,13 +314,17 @@ class ArchitectureModule(BaseModule):
 
     def set_arch_of(self, arch_of) -> str:
         self.arch_of = arch_of.lower()
+        set_changed(self)
 
     def get_arch_of(self) -> str:
         return self.arch_of
 
     def add_testcase(self, testcase):
-        if testcase not in self.testcase_list:
+        testcase_set = get_list_set(self, "testcase_list")
+        if testcase not in testcase_set:
             self.testcase_list.append(testcase)
+            testcase_set.add(testcase)
+            set_changed(self)
             self.logger.debug("[%s] testcase=%s" % (self.get_name(), testcase))
 
     def get_testcase(self) -> list:
@@ -311,8 +354,11 @@ class VerilogModule(BaseModule):
 
     def add_parameter(self, parameter):
         parameter = parameter.replace(" ", "")
-        if parameter not in self.parameter_list:
+        parameter_set = get_list_set(self, "parameter_list")
+        if parameter not in parameter_set:
             self.parameter_list.append(parameter)
+            parameter_set.add(parameter)
+            set_changed(self)
 
     def get_parameter(self) -> list:
         return self.parameter_list
@@ -321,24 +367,24 @@ class VerilogModule(BaseModule):
         return "verilog_module"
 
     def add_int_dep(self, dep):
-        if isinstance(dep, list):
-            for item in dep:
-                item_name = item
-                if not (item_name in self.int_dep_list):
-                    self.int_dep_list.append(item_name)
-                    self.logger.debug("[%s] int_dep=%s" % (self.get_name(), item_name))
-        else:
-            dep_name = dep
-            if dep_name not in self.int_dep_list:
+        dep_list = dep if isinstance(dep, list) else [dep]
+        dep_set = get_list_set(self, "int_dep_list")
+        for dep_name in dep_list:
+            if dep_name not in dep_set:
                 self.int_dep_list.append(dep_name)
+                dep_set.add(dep_name)
+                set_changed(self)
                 self.logger.debug("[%s] int_dep=%s" % (self.get_name(), dep_name))
 
     def get_int_dep(self) -> list:
         return self.int_dep_list
 
     def add_testcase(self, testcase):
-        if testcase not in self.testcase_list:
+        testcase_set = get_list_set(self, "testcase_list")
+        if testcase not in testcase_set:
             self.testcase_list.append(testcase)
+            testcase_set.add(testcase)
+            set_changed(self)
             self.logger.debug("[%s] testcase=%s" % (self.get_name(), testcase))
 
     def get_testcase(self) -> list:
@@ -15,10 +15,15 @@
 
 
 import os
+import re
+import mmap
+import hashlib
 import time
 
 from ..scan.vhdlscanner import VHDLScanner
 from ..scan.verilogscanner import VerilogScanner
+from ..scan.scan_cache import ScanCache
+from .container import get_list_set, set_changed
 
 
 class HDLFile:
@@ -39,8 +44,14 @@ class HDLFile:
         self.com_options = com_options
         self.scanner = None
         self.code_coverage = code_coverage
+        # File has a testbench, i.e. the modules are only
+        # used for finding testbenches in files with one
+        self.is_tb = False
 
         self.compile_time = 0
+        # File stat and content digest when the file was compiled
+        self.compiled_stat = None
+        self.compiled_digest = None
         self.hdlfile_this_dep_on_list = []
         self.hdlfile_dep_on_this_list = []
 
@@ -57,25 +68,37 @@ class HDLFile:
         self.set_filename(filename_with_path)
         self.com_options = self.set_com_options(com_options=com_options)
 
-    def _get_file_content_as_list(self) -> list:
+    def _open_file(self):
         """
-        Reads the file and returns the content as a list.
+        Opens the file for reading the content line by line.
         """
-        with open(self.filename_with_path, encoding="ISO-8859-1") as read_file:
-            file_content_list = read_file.readlines()
-        return file_content_list
+        return open(self.filename_with_path, encoding="ISO-8859-1")
+
+    def _get_skip_bodies(self) -> bool:
+        """
+        Returns True if bodies can be skipped when scanning the file,
+        i.e. for large files without a testbench.
+        """
+        return False
 
     def set_library(self, library: str) -> None:
         self.library = library.lower()
+        set_changed(self)
 
     def get_library(self) -> str:
         return self.library
 
     def update_compile_time(self):
         self.compile_time = time.time()
+        self.compiled_stat = self._get_file_stat()
+        self.compiled_digest = self.get_file_digest()
+        set_changed(self)
+
+    def get_compile_time(self) -> float:
+        return self.compile_time
 
     def get_need_compile(self) -> bool:
-        need_compile = self.get_file_change_date() > self.compile_time
+        need_compile = self.compile_time == 0 or self.get_file_changed()
         need_compile = need_compile or self.get_library().get_need_compile()
         return need_compile
 
@@ -83,20 +106,154 @@ class HDLFile:
         """
         Resets the last compile time for this file.
         """
-        if need_compile is True:
+        if need_compile is True and self.compile_time != 0:
             self.compile_time = 0
+            set_changed(self)
+
+    def _get_file_stat(self) -> tuple:
+        try:
+            file_stat = os.stat(self.get_filename_with_path())
+        except OSError:
+            return None
+        return (file_stat.st_mtime_ns, file_stat.st_size)
+
+    def get_file_digest(self) -> str:
+        """
+        Returns a digest of the file content.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(self.get_filename_with_path(), "rb") as read_file:
+                for chunk in iter(lambda: read_file.read(1 << 20), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def get_current_digest(self) -> str:
+        """
+        Returns a digest of the file content, the file is only read
+        if it has changed since it was compiled.
+        """
+        compiled_digest = getattr(self, "compiled_digest", None)
+        if compiled_digest is not None and self._get_file_stat() == self.compiled_stat:
+            return compiled_digest
+        return self.get_file_digest()
+
+    def get_file_changed(self) -> bool:
+        """
+        Returns True if the file content has changed since the file was
+        compiled. The file is only read if the file stat has changed,
+        e.g. a checkout or touch without content changes is not a change.
+        """
+        compiled_digest = getattr(self, "compiled_digest", None)
+        # File compiled before content digests were recorded
+        if compiled_digest is None:
+            return self.get_file_change_date() > self.compile_time
+
+        file_stat = self._get_file_stat()
+        if file_stat is None:
+            return True
+        if file_stat == self.compiled_stat:
+            return False
+        if self.get_file_digest() != compiled_digest:
+            return True
+        # Same content, skip reading the file until touched again
+        self.compiled_stat = file_stat
+        set_changed(self)
+        return False
 
     def get_file_change_date(self) -> str:
         try:
-            self.file_change_date = os.path.getmtime(self.get_filename_with_path())
+            file_change_date = os.path.getmtime(self.get_filename_with_path())
         except:
-            self.file_change_date = 0
-        finally:
-            return self.file_change_date
+            file_change_date = 0
+        if file_change_date != self.file_change_date:
+            self.file_change_date = file_change_date
+            set_changed(self)
+        return self.file_change_date
 
     def parse_file_if_needed(self) -> bool:
         pass
 
+    def get_scan_request(self) -> tuple:
+        """
+        Returns the arguments for scanning the file in a scan
+        process, see scan_file_in_process(), or None if the file
+        is not scanned.
+        """
+        return None
+
+    def set_scan_result(self, scan_result) -> None:
+        """
+        Stores the result of scanning the file in a scan process,
+        the result is used next time the file is parsed.
+        """
+        self.scan_result = scan_result
+        set_changed(self)
+
+    def _scan_file(self) -> None:
+        """
+        Builds the modules from the scan result if the file has been
+        scanned in a scan process or is found in the scan cache, else
+        the file content is scanned.
+        """
+        scan_result = getattr(self, "scan_result", None)
+        self.scan_result = None
+
+        skip_bodies = self._get_skip_bodies()
+        scan_cache, cache_key = self._get_scan_cache(skip_bodies)
+        if scan_result is None and scan_cache is not None:
+            scan_result = scan_cache.restore(cache_key)
+            if scan_result is not None:
+                scan_cache.logger.debug(
+                    "Using scan cache: %s" % (self.get_filename_with_path())
+                )
+
+        if scan_result is not None:
+            self.scanner.set_scan_result(scan_result)
+        else:
+            with self._open_file() as read_file:
+                self.scanner.scan(read_file, skip_bodies)
+            if scan_cache is not None:
+                scan_cache.store(cache_key, self.scanner.get_scan_result())
+
+        # Scan data and modules are saved again
+        set_changed(self)
+        set_changed(self.scanner)
+        for module in self.scanner.get_module_container().get():
+            set_changed(module)
+        self.is_tb = any(module.get_is_tb() for module in self.get_modules())
+
+    def set_scan_result_from_cache(self) -> bool:
+        """
+        Stores the cached scan result of the file, the result is used
+        next time the file is parsed.
+
+        Returns:
+          bool: True if the file was found in the scan cache.
+        """
+        scan_cache, cache_key = self._get_scan_cache(self._get_skip_bodies())
+        if scan_cache is None:
+            return False
+        self.scan_result = scan_cache.restore(cache_key)
+        set_changed(self)
+        return self.scan_result is not None
+
+    def _get_scan_cache(self, skip_bodies=False) -> tuple:
+        """
+        Returns the scan cache and the cache key of this file,
+        or None if the scan cache is not enabled.
+        """
+        cache_path = self.project.settings.get_scan_cache_path()
+        if cache_path is None:
+            return (None, None)
+        file_digest = self.get_file_digest()
+        if file_digest is None:
+            return (None, None)
+        scan_cache = ScanCache(cache_path, project=self.project)
+        return (scan_cache, ScanCache.get_key(self.scanner, file_digest, skip_bodies))
+
     def set_filename(self, filename_with_path: str):
         """
         Extract path and filename from file absolute path,
@@ -107,6 +264,7 @@ class HDLFile:
         _, name = os.path.split(filename_with_path)
         self.name_from_file = name[0 : name.find(".")]
         self.filename = name
+        set_changed(self)
 
     def get_filename(self) -> str:
         return self.filename
@@ -134,7 +292,7 @@ class HDLFile:
         that have been created after scanning the file.
         """
         modules_list = []
-        if self.scanner:
+        if self.scanner and self.get_is_tb():
             container = self.scanner.get_module_container()
             modules_list = [module for module in container.get() if module.get_is_tb()]
         return modules_list
@@ -149,6 +307,7 @@ class HDLFile:
 
     def set_hdl_version(self, hdl_version):
         self.hdl_version = hdl_version
+        set_changed(self)
 
     def get_hdl_version(self) -> str:
         return self.hdl_version
@@ -181,8 +340,11 @@ class HDLFile:
         """
         Adds a HDLFile which this HDLFile depends on.
         """
-        if hdlfile not in self.hdlfile_this_dep_on_list:
+        hdlfile_set = get_list_set(self, "hdlfile_this_dep_on_list")
+        if hdlfile not in hdlfile_set:
             self.hdlfile_this_dep_on_list.append(hdlfile)
+            hdlfile_set.add(hdlfile)
+            set_changed(self)
 
     def get_hdlfile_this_dep_on(self) -> list:
         """
@@ -194,8 +356,11 @@ class HDLFile:
         """
         Adds a HDLFile that depends on this HDLFile.
         """
-        if hdlfile not in self.hdlfile_dep_on_this_list:
+        hdlfile_set = get_list_set(self, "hdlfile_dep_on_this_list")
+        if hdlfile not in hdlfile_set:
             self.hdlfile_dep_on_this_list.append(hdlfile)
+            hdlfile_set.add(hdlfile)
+            set_changed(self)
 
     def get_hdlfile_dep_on_this(self) -> None:
         """
@@ -205,6 +370,7 @@ class HDLFile:
 
     def set_code_coverage(self, enabled):
         self.code_coverage = enabled
+        set_changed(self)
 
     def get_code_coverage(self) -> bool:
         return self.code_coverage
@@ -266,11 +432,38 @@ class VHDLFile(HDLFile):
         # Files that should not be parsed are set to False, i.e.
         # return True to caller - caller does not care if file is parsed.
         if self.parse_file is True:
-            file_content_list = self._get_file_content_as_list()
             # Extract relevant content from source file
-            self.scanner.scan(file_content_list)
+            self._scan_file()
         return True
 
+    def get_scan_request(self) -> tuple:
+        if self.parse_file is True:
+            return (self.get_filename_with_path(), self.get_library().get_name(), True)
+        return None
+
+    def _get_skip_bodies(self) -> bool:
+        """
+        Bodies are skipped in files larger than the large file size
+        which have no testbench pragma or testcase identifier. The
+        file is searched using mmap, i.e. it is not read into memory.
+        """
+        large_file_size = self.project.settings.get_scan_large_file_size()
+        if not large_file_size:
+            return False
+        try:
+            if os.path.getsize(self.filename_with_path) < large_file_size * 1024 * 1024:
+                return False
+            re_testbench = re.compile(
+                rb"--\s*hdlregression\s*:\s*tb|"
+                + re.escape(self.project.settings.get_testcase_identifier_name().encode()),
+                flags=re.IGNORECASE,
+            )
+            with open(self.filename_with_path, "rb") as read_file:
+                with mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+                    return re_testbench.search(file_map) is None
+        except (OSError, ValueError):
+            return False
+
     def _get_com_options(self, simulator) -> str:
         """
         Return a list of compile options for this file.
@@ -282,6 +475,7 @@ class VHDLFile(HDLFile):
         """
         hdl_version = self.get_hdl_version()
         default_com_options = self.project.settings.get_com_options(hdl_lang="vhdl")
+        com_options = self.com_options
 
         # User defined hdl_version set
         if simulator.upper() == "GHDL":
@@ -326,6 +520,8 @@ class VHDLFile(HDLFile):
                     for directive in default_com_options
                 ]
 
+        if self.com_options != com_options:
+            set_changed(self)
         return self.com_options
 
     def check_file_type(self, filetype) -> bool:
@@ -343,6 +539,9 @@ class VHDLFile(HDLFile):
         and return True if any module is a TB.
         I.e. the file contain a TB.
         """
+        # Files saved before the testbench status was kept
+        if "is_tb" in self.__dict__:
+            return self.is_tb
         if self.scanner is not None:
             container = self.scanner.get_module_container()
             for module in container.get():
@@ -381,6 +580,9 @@ class NetlistFile(VHDLFile):
     def parse_file_if_needed(self) -> bool:
         return True
 
+    def get_scan_request(self) -> tuple:
+        return None
+
     def get_netlist_instance(self) -> str:
         return self.netlist_instance
 
@@ -422,11 +624,15 @@ class VerilogFile(HDLFile):
         """
         # Check if file should be parsed
         if self.parse_file is True:
-            file_content_list = self._get_file_content_as_list()
             # Extract relevant content from source file
-            self.scanner.scan(file_content_list)
+            self._scan_file()
         return True
 
+    def get_scan_request(self) -> tuple:
+        if self.parse_file is True:
+            return (self.get_filename_with_path(), self.get_library().get_name(), False)
+        return None
+
     def _get_com_options(self, simulator) -> str:
         """
         Return a list of compile options for this file.
@@ -458,6 +664,9 @@ class VerilogFile(HDLFile):
         and return True if any module is a TB.
         I.e. the file contain a TB.
         """
+        # Files saved before the testbench status was kept
+        if "is_tb" in self.__dict__:
+            return self.is_tb
         if self.scanner is not None:
             container = self.scanner.get_module_container()
             for module in container.get():
@@ -516,3 +725,59 @@ class UnknownFile(HDLFile):
             parse_file,
             code_coverage,
         )
+
+
+class ScanProject:
+    """
+    Project of a scan process, i.e. only the project
+    settings are available when scanning files.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+
+
+# Project of this scan process, see init_scan_process()
+_scan_project = None
+
+
+def init_scan_process(settings) -> None:
+    """
+    Initializes a scan process with the project settings.
+    """
+    global _scan_project
+    _scan_project = ScanProject(settings)
+
+
+def scan_file_in_process(scan_request) -> list:
+    """
+    Scans a file in a scan process.
+
+    Params:
+      scan_request(tuple): filename with path, library name and True
+                           for VHDL or False for Verilog files.
+
+    Returns:
+      scan_result(list): the modules found in the file, see
+                         HDLScanner.get_scan_result(), or None if the
+                         file could not be scanned.
+    """
+    from .hdllibrary import Library
+
+    filename_with_path, library_name, is_vhdl = scan_request
+    file_class = VHDLFile if is_vhdl else VerilogFile
+    try:
+        hdlfile = file_class(
+            filename_with_path,
+            _scan_project,
+            Library(name=library_name, project=_scan_project),
+            hdl_version=None,
+            com_options=None,
+            parse_file=True,
+            code_coverage=False,
+        )
+        hdlfile.parse_file_if_needed()
+    except Exception:
+        # Scanned again by the main process, i.e. errors are reported there
+        return None
+    return hdlfile.scanner.get_scan_result()
@@ -14,7 +14,6 @@
 #
 
 import os
-import re
 from multiprocessing.pool import ThreadPool
 
 from ..hdlfinder import HDLFinder
@@ -65,18 +64,30 @@ class Library:
     def get_lib_obj_dep(self) -> list:
         return []
 
+    def get_manual_lib_obj_dep(self) -> list:
+        return []
+
     def get_never_recompile(self) -> bool:
         return True
 
     def get_compile_order_list(self) -> list:
         return []
 
+    def get_compile_level_list(self) -> list:
+        return []
+
     def set_need_compile(self, compile) -> None:
         pass
 
     def get_need_compile(self) -> bool:
         pass
 
+    def get_has_changed_files(self) -> bool:
+        return False
+
+    def get_has_files_need_compile(self) -> bool:
+        return False
+
     def get_hdlfile_list(self) -> list:
         return []
 
@@ -121,8 +132,11 @@ class HDLLibrary(Library):
         self.no_recompile = False  # never recompile library
         self.lib_dep = []  # library dependencies list
         self.lib_obj_dep_list = []  # list of dependent library objects
+        self.manual_lib_dep = []  # dependencies not found in the design units
         self.lib_hdlfile_compile_order_list = []  # hdlfile compile order list
+        self.lib_hdlfile_compile_level_list = []  # hdlfile compile order levels
         self.compile_req = False  # library compilation required
+        self.files_changed = False  # files changed since last run
         self.hdlfile_container = Container()  # hdlfile container
         self.temp_hdlfile_container = Container()  # temp storage for add_file()
         # self.netlist_hdlfile_container = Container()  # netlist hdlfile container
@@ -284,14 +298,7 @@ class HDLLibrary(Library):
         Returns the file object if found in the file list.
         Returns None if no file object is found.
         """
-        # Check with all hdlfile objects in this library (container).
-        for hdlfile in self.get_hdlfile_list():
-            hdlfile_name = hdlfile.get_filename_with_path()
-            if hdlfile_name.lower() == filename.lower():
-                return hdlfile
-
-        # Filename not found
-        return None
+        return self.hdlfile_container.find(filename, index_method="get_filename_with_path")
 
     def update_file_list(self) -> None:
         """
@@ -301,10 +308,11 @@ class HDLLibrary(Library):
 
         Update library recompilation if necessary.
         """
+        self.files_changed = False
 
         def check_list(new_list, old_list) -> tuple:
-            new_names = [new_file.get_filename() for new_file in new_list.get()]
-            old_names = [old_file.get_filename() for old_file in old_list.get()]
+            new_names = {new_file.get_filename() for new_file in new_list.get()}
+            old_names = {old_file.get_filename() for old_file in old_list.get()}
 
             new_files = [
                 hdlfile
@@ -335,10 +343,14 @@ class HDLLibrary(Library):
             for removed_file in removed_files:
                 self.hdlfile_container.remove(removed_file)
                 self.logger.debug("Removed: %s" % (removed_file.get_filename()))
+                # Files using the removed file have to be recompiled
+                for dep_hdlfile in removed_file.get_hdlfile_dep_on_this():
+                    dep_hdlfile.set_need_compile(True)
 
-            # Updated library recompile when file number has changed.
+            # Update compile order when file number has changed,
+            # new files are compiled since they have not been compiled.
             if new_files or removed_files:
-                self.set_need_compile(True)
+                self.files_changed = True
 
             # Empty temporary storage for next regression run.
             self.temp_hdlfile_container.empty_list()
@@ -356,9 +368,10 @@ class HDLLibrary(Library):
             if hdlfile.get_need_compile() is True:
                 recompile_needed = hdlfile.parse_file_if_needed()
                 if recompile_needed is True:
-                    self.set_need_compile(True)
-                    for dep_hdlfile in hdlfile.get_hdlfile_dep_on_this():
-                        dep_hdlfile.set_need_compile(True)
+                    # Dependent files are marked for compile when all
+                    # libraries are prepared, see
+                    # mark_dependent_files_for_compile()
+                    self.files_changed = True
                 else:
                     self.logger.warning(
                         "File was not parsed: %s" % (hdlfile.get_filename_with_path())
@@ -370,7 +383,7 @@ class HDLLibrary(Library):
         num_threads = 1
         # Check if threading is enabled, i.e. > 0
         if self.project.settings.get_num_threads() > 0:
-            num_threads = len(hdlfile_list)
+            num_threads = min(len(hdlfile_list), os.cpu_count() or 1)
         # Split the list if we use more than 1 thread
         if num_threads > 1:
             devided_list = devide_list_for_threads(hdlfile_list, num_threads)
@@ -388,6 +401,16 @@ class HDLLibrary(Library):
     def get_compile_order_list(self) -> list:
         return self.lib_hdlfile_compile_order_list
 
+    def get_compile_level_list(self) -> list:
+        """
+        Returns the compile order as a list of levels, where the files
+        of a level only depend on files in earlier levels.
+        """
+        # Libraries saved before compile levels were introduced
+        if not getattr(self, "lib_hdlfile_compile_level_list", None):
+            return [[hdlfile] for hdlfile in self.lib_hdlfile_compile_order_list]
+        return self.lib_hdlfile_compile_level_list
+
     def set_need_compile(self, compile) -> None:
         """
         Sets the recompile status for the library.
@@ -410,6 +433,19 @@ class HDLLibrary(Library):
         else:
             return self.compile_req
 
+    def get_has_changed_files(self) -> bool:
+        """
+        Returns True if any file in the library changed since the
+        last run, i.e. the compile order has to be updated.
+        """
+        return getattr(self, "files_changed", False)
+
+    def get_has_files_need_compile(self) -> bool:
+        """
+        Returns True if any file in the library needs compile.
+        """
+        return any(hdlfile.get_need_compile() for hdlfile in self.get_hdlfile_list())
+
     def _get_list_of_lib_modules(self) -> list:
         """
         Returns a list of all modules detected by scanning
@@ -427,20 +463,21 @@ class HDLLibrary(Library):
         Run all necessary steps for compiling this library,
         i.e. scan files, detect dependencies, sort in
         order by dependency.
+        Modules and files are connected as in the last run if no
+        files have changed, i.e. modules are not loaded.
         """
-        # Create list of all modules
-        self.module_list = self._get_list_of_lib_modules()
-
-        # Convert module names to module objects in component/configuration modules.
-        self._create_module_from_name()
+        if self.compile_req or self.get_has_changed_files():
+            # Create list of all modules
+            self.module_list = self._get_list_of_lib_modules()
 
-        # Remove non-existing modules
-        self._remove_non_existing_modules()
-        # Connect modules by dependency and architectures with entities
-        self._connect_dep_modules()
+            # Convert module names to module objects in component/configuration modules.
+            self._create_module_from_name()
 
+            # Remove non-existing modules
+            self._remove_non_existing_modules()
+            # Connect modules by dependency and architectures with entities
+            self._connect_dep_modules()
 
-        if self.compile_req:
             # Arrange files by dependency
             self._create_list_of_files_in_compile_order()
 
@@ -455,39 +492,46 @@ class HDLLibrary(Library):
             print("{} ({}) -> ".format(module.get_name(), module.get_type()), end="")
         print("\n")
 
+    def _get_modules_by_name(self) -> dict:
+        """
+        Returns the modules of this library by name, where VHDL module
+        names are case-folded and Verilog module names are exact.
+        Modules sharing a name, e.g. a package and its body, are listed
+        in module order.
+        """
+        modules_by_name = {}
+        for module in self.module_list:
+            modules_by_name.setdefault(self._get_module_key(module, module.get_name()), []).append(module)
+        return modules_by_name
+
+    @staticmethod
+    def _get_module_key(module, name) -> str:
+        if module.get_is_verilog_module():
+            return name
+        return name.lower()
+
     def _create_module_from_name(self) -> None:
         """
         Iterate all modules and filters on component/configuration
         modules to extract dependent
         """
+        modules_by_name = self._get_modules_by_name()
         for module in self.module_list:
             if module.get_is_configuration():
-                for dep_module in self.module_list:
-                    for name in module.get_int_dep_on_this():
-                        if re.match(name, dep_module.get_name(), flags=re.IGNORECASE):
-                            dep_module.add_int_dep(module.get_name())
-                            continue
+                for name in module.get_int_dep_on_this():
+                    for dep_module in modules_by_name.get(name.lower(), []):
+                        dep_module.add_int_dep(module.get_name())
 
     def _remove_non_existing_modules(self) -> None:
         """
         Remove all modules created/detected when scanning files,
         which are not real modules (or have not been detected as modules).
         """
+        modules_by_name = self._get_modules_by_name()
         for module in self.module_list:
-            for dep_module_name in module.get_int_dep():
-                if module.get_type() == "verilog_module":
-                    match = any(
-                        dep_module
-                        for dep_module in self.module_list
-                        if dep_module.get_name() == dep_module_name
-                    )
-                else:
-                    match = any(
-                        dep_module
-                        for dep_module in self.module_list
-                        if dep_module.get_name().lower() == dep_module_name
-                    )
-                if match is False:
+            # Copy of the list, as unknown modules are removed from it
+            for dep_module_name in list(module.get_int_dep()):
+                if self._get_module_key(module, dep_module_name) not in modules_by_name:
                     module.remove_int_dep(dep_module_name)
                     self.logger.debug("Removing unknown module: %s" % (dep_module_name))
 
@@ -498,68 +542,30 @@ class HDLLibrary(Library):
         That is, all modules in all files inside this library are
         dependency connected.
         """
-        for update_module in self.module_list:
-            update_module_hdlfile = update_module.get_hdlfile()
+        modules_by_name = self._get_modules_by_name()
 
-            for check_module in self.module_list:
-                if (update_module == check_module) and (
-                    update_module.get_hdlfile() == check_module.get_hdlfile()
-                ):
-                    continue
+        def connect(module, dep_module) -> None:
+            module.set_this_depend_of(dep_module)
+            dep_module.set_depend_of_this(module)
+            # Update HDLFile objects dependency
+            module.get_hdlfile().add_hdlfile_this_dep_on(dep_module.get_hdlfile())
+            dep_module.get_hdlfile().add_hdlfile_dep_on_this(module.get_hdlfile())
 
-                check_module_hdlfile = check_module.get_hdlfile()
-
-                # Connect by detected internal dependency
-                if update_module.get_name() in check_module.get_int_dep():
-                    check_module.set_this_depend_of(update_module)
-                    update_module.set_depend_of_this(check_module)
-                    # Update HDLFile objects dependency
-                    check_module_hdlfile.add_hdlfile_this_dep_on(update_module_hdlfile)
-                    update_module_hdlfile.add_hdlfile_dep_on_this(check_module_hdlfile)
-
-                elif check_module.get_name() in update_module.get_int_dep():
-                    update_module.set_this_depend_of(check_module)
-                    check_module.set_depend_of_this(update_module)
-                    # Update HDLFile objects dependency
-                    update_module_hdlfile.add_hdlfile_this_dep_on(check_module_hdlfile)
-                    check_module_hdlfile.add_hdlfile_dep_on_this(update_module_hdlfile)
-
-                # ================================================================
-                # The following connection do not belong to verilog modules.
-                # ================================================================
-                if (
-                    check_module.get_type() != "verilog_module"
-                    and update_module.get_type() != "verilog_module"
-                ):
-                    # Connect architecture with entity
-                    if (
-                        check_module.get_is_architecture()
-                        and update_module.get_is_entity()
-                    ):
-
-                        # Knowledge:
-                        # - architecture knows which entity name
-                        # - entity do not know which architecture
-                        if check_module.get_arch_of() == update_module.get_name():
-                            check_module.set_this_depend_of(update_module)
-                            update_module.set_depend_of_this(check_module)
-                            update_module.add_architecture(check_module)
-
-                    if (
-                        update_module.get_is_architecture()
-                        and check_module.get_is_entity()
-                    ):
-                        if update_module.get_arch_of() == check_module.get_name():
-                            update_module.set_this_depend_of(check_module)
-                            check_module.set_depend_of_this(update_module)
-                            check_module.add_architecture(update_module)
-                            # Update HDLFile objects dependency
-                            update_module_hdlfile.add_hdlfile_this_dep_on(
-                                check_module_hdlfile
-                            )
-                            check_module_hdlfile.add_hdlfile_dep_on_this(
-                                update_module_hdlfile
-                            )
+        for module in self.module_list:
+            # Connect by detected internal dependency
+            for dep_name in module.get_int_dep():
+                for dep_module in modules_by_name.get(self._get_module_key(module, dep_name), []):
+                    if dep_module is not module:
+                        connect(module, dep_module)
+
+            # Connect architecture with entity, i.e. the architecture
+            # knows which entity name, the entity do not know which
+            # architecture. Not used for verilog modules.
+            if module.get_is_architecture():
+                for entity_module in modules_by_name.get(module.get_arch_of().lower(), []):
+                    if entity_module.get_is_entity():
+                        connect(module, entity_module)
+                        entity_module.add_architecture(module)
 
     def _create_list_of_files_in_compile_order(self):
         """
@@ -623,6 +629,7 @@ class HDLLibrary(Library):
         )
 
         sorted_files = []
+        level = {f: 0 for f in file_list}
 
         # Run Kahn’s algorithm
         while queue:
@@ -632,6 +639,7 @@ class HDLLibrary(Library):
             # Lower the indegree for those dependent of current
             for neighbor in adjacency[current]:
                 in_degree[neighbor] -= 1
+                level[neighbor] = max(level[neighbor], level[current] + 1)
                 if in_degree[neighbor] == 0:
                     queue.append(neighbor)
 
@@ -650,6 +658,12 @@ class HDLLibrary(Library):
 
         self.lib_hdlfile_compile_order_list = sorted_files
 
+        # Files on the same level do not depend on each other
+        num_levels = max(level.values(), default=-1) + 1
+        self.lib_hdlfile_compile_level_list = [[] for _ in range(num_levels)]
+        for f in sorted_files:
+            self.lib_hdlfile_compile_level_list[level[f]].append(f)
+
         self.logger.debug(
             "Compile order for '{}': [{}]".format(
                 self.get_name(),
@@ -664,7 +678,7 @@ class HDLLibrary(Library):
         """
         for module in self.module_list:
             for library in module.get_ext_dep():
-                self.add_lib_dep(library)
+                self.add_lib_dep(library, manual=False)
 
     def get_lib_dep(self) -> list:
         """
@@ -673,10 +687,17 @@ class HDLLibrary(Library):
         """
         return self.lib_dep
 
-    def add_lib_dep(self, library) -> None:
+    def add_lib_dep(self, library, manual=True) -> None:
         """
-        Method for manually add a library as a dependency.
+        Method for manually add a library as a dependency. Dependencies
+        found in the design units are added with manual=False.
         """
+        if manual:
+            if getattr(self, "manual_lib_dep", None) is None:
+                self.manual_lib_dep = []
+            if library.lower() not in self.manual_lib_dep:
+                self.manual_lib_dep.append(library.lower())
+
         if library.lower() not in self.lib_dep:
             self.lib_dep.append(library.lower())
 
@@ -689,8 +710,29 @@ class HDLLibrary(Library):
                     self.lib_obj_dep_list.append(lib_obj)
 
     def get_lib_obj_dep(self) -> list:
+        # Dependencies added before the library object was created
+        if len(self.lib_obj_dep_list) < len(self.lib_dep):
+            for library in self.lib_dep:
+                lib_obj = self.project._get_library_object(
+                    library, create_new_if_missing=False
+                )
+                if lib_obj is not None and lib_obj not in self.lib_obj_dep_list:
+                    self.lib_obj_dep_list.append(lib_obj)
         return self.lib_obj_dep_list
 
+    def get_manual_lib_obj_dep(self) -> list:
+        """
+        Returns the libraries this library depends on without referring
+        to their design units, e.g. set with set_dependency() for
+        component or Verilog module instantiations.
+        """
+        manual_lib_dep = getattr(self, "manual_lib_dep", [])
+        return [
+            lib_obj
+            for lib_obj in self.get_lib_obj_dep()
+            if lib_obj.get_name().lower() in manual_lib_dep
+        ]
+
     def _present_library(self) -> str:
         """
         Printer method for presenting the library w/modules
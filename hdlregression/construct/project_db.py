@@ -0,0 +1,677 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+from contextlib import closing
+import hashlib
+import importlib
+import io
+import os
+import pickle
+import sqlite3
+import sys
+from threading import RLock
+from urllib.request import pathname2url
+
+from .hdllibrary import HDLLibrary
+from .hdlfile import HDLFile
+from .hdl_modules_pkg import BaseModule
+from .container import LIST_SET_NAMES, CHANGED_NAME
+from ..scan.hdlscanner import HDLScanner
+from ..settings import HDLRegressionSettings
+from ..report.logger import Logger
+
+
+# Rows are keyed by these columns in each table
+_TABLE_KEYS = {
+    "object": ("name",),
+    "library": ("name",),
+    "hdlfile": ("library", "filename"),
+    "scanner": ("library", "filename"),
+    "module": ("library", "filename", "position"),
+    "test": ("position",),
+}
+
+# Tables with the scan data and modules of the files, which are loaded
+# for one file at a time when first used
+_LAZY_TABLES = ("scanner", "module")
+
+# Tables with the rows saved in every run, i.e. where other rows are
+# referred from
+_ROOT_TABLES = ("object", "test")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS object (name TEXT PRIMARY KEY, kind TEXT, digest TEXT, refs BLOB, data BLOB);
+CREATE TABLE IF NOT EXISTS library (name TEXT PRIMARY KEY, kind TEXT, digest TEXT, refs BLOB, data BLOB);
+CREATE TABLE IF NOT EXISTS hdlfile (library TEXT, filename TEXT, kind TEXT, digest TEXT, refs BLOB, data BLOB,
+                                    PRIMARY KEY (library, filename));
+CREATE TABLE IF NOT EXISTS scanner (library TEXT, filename TEXT, kind TEXT, digest TEXT, refs BLOB, data BLOB,
+                                    PRIMARY KEY (library, filename));
+CREATE TABLE IF NOT EXISTS module (library TEXT, filename TEXT, position INTEGER, kind TEXT, digest TEXT,
+                                   refs BLOB, data BLOB, PRIMARY KEY (library, filename, position));
+CREATE TABLE IF NOT EXISTS test (position INTEGER PRIMARY KEY, kind TEXT, digest TEXT, refs BLOB, data BLOB);
+"""
+
+
+class ProjectDatabaseError(Exception):
+    pass
+
+
+def _row_reference(pid):
+    """
+    Placeholder for objects saved in other rows, replaced by the
+    object when loaded, see _RowUnpickler.find_class().
+    """
+    raise ProjectDatabaseError("Row reference {} loaded outside the project database".format(pid))
+
+
+def _is_ghost(obj) -> bool:
+    """
+    Returns True if the object is a placeholder for a row that is
+    not loaded, see ProjectDatabase._get_ghost_class().
+    """
+    return "_project_database" in type(obj).__dict__
+
+
+def _load_ghost(obj) -> None:
+    type(obj)._project_database._load_group(obj)
+
+
+def _ghost_getattr(obj, name):
+    _load_ghost(obj)
+    return getattr(obj, name)
+
+
+def _ghost_setattr(obj, name, value) -> None:
+    _load_ghost(obj)
+    setattr(obj, name, value)
+
+
+def _ghost_delattr(obj, name) -> None:
+    _load_ghost(obj)
+    delattr(obj, name)
+
+
+def _ghost_reduce_ex(obj, protocol):
+    _load_ghost(obj)
+    return obj.__reduce_ex__(protocol)
+
+
+class _RowPickler(pickle.Pickler):
+    """
+    Pickles objects saved in other rows as references to the rows.
+    References are found in reducer_override(), which is only called
+    for class instances, i.e. not for strings, numbers, lists and dicts.
+    The keys of the referred rows are listed in ref_set.
+    """
+
+    def __init__(self, file, database):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.database = database
+        self.pid_dict = database.pid_dict
+        self.reference_type_dict = database.reference_type_dict
+        self.ref_set = set()
+
+    def reducer_override(self, obj):
+        pid = self.pid_dict.get(id(obj))
+        if pid is None:
+            obj_type = type(obj)
+            is_reference_type = self.reference_type_dict.get(obj_type)
+            if is_reference_type is None:
+                is_reference_type = self.database._get_is_reference_type(obj_type)
+                self.reference_type_dict[obj_type] = is_reference_type
+            if not is_reference_type:
+                return NotImplemented
+            pid = self.database._get_persistent_id(obj)
+        if pid[0] in _TABLE_KEYS:
+            self.ref_set.add(pid)
+        return (_row_reference, (pid,))
+
+
+class _RowUnpickler(pickle.Unpickler):
+    def __init__(self, file, database):
+        super().__init__(file)
+        self.database = database
+
+    def find_class(self, module_name, name):
+        if module_name == __name__ and name == "_row_reference":
+            return self.database._get_persistent_object
+        return super().find_class(module_name, name)
+
+
+class ProjectDatabase:
+    """
+    SQLite database of the project saved between runs. Libraries, files,
+    the scan data of the files, modules and tests are stored in one row
+    each, and refer to each other by row key, i.e. the state of each
+    object is pickled on its own. Scan data and modules are loaded for
+    one file at a time when first used. Files, scan data and modules are
+    only pickled when new or changed since loaded, see set_changed(),
+    rows are only written when their content has changed since the last
+    save, and all rows are written in one transaction.
+    """
+
+    FILENAME = "project.db"
+
+    # Increment when the tables change, older databases are rebuilt
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path, project=None):
+        self.logger = Logger(name=__name__, project=project)
+        self.project = project
+        self.filename = os.path.join(path, self.FILENAME)
+
+        # Rows are loaded by the threads scanning files
+        self.lock = RLock()
+        self.read_connection = None
+        self.class_dict = {}
+        self.ghost_class_dict = {}
+        # Types by whether their objects may be saved in other rows
+        self.reference_type_dict = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        # Objects by persistent id, and persistent ids by object id,
+        # of the rows loaded and saved
+        self.object_dict = {}
+        self.pid_dict = {}
+        # Kind, digest and pickled references of the stored rows by
+        # persistent id, references of rows not loaded are None
+        self.stored_dict = {}
+        # Rows to be saved, rows are added while pickling
+        self.row_list = []
+        self.row_id_set = set()
+        # The stored rows are known when loaded or saved, else every
+        # row is written
+        self.is_synced = False
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.filename)
+
+    def close(self) -> None:
+        """
+        Closes the connection used for loading scan data and modules,
+        a new connection is opened when they are used.
+        """
+        with self.lock:
+            if self.read_connection is not None:
+                self.read_connection.close()
+                self.read_connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.filename, timeout=60)
+        connection.execute("CREATE TABLE IF NOT EXISTS info (name TEXT PRIMARY KEY, value TEXT)")
+        row = connection.execute(
+            "SELECT value FROM info WHERE name = 'schema_version'"
+        ).fetchone()
+        if row is None or row[0] != str(self.SCHEMA_VERSION):
+            self.logger.debug("Creating project database: {}".format(self.filename))
+            # Tables of other versions are replaced
+            connection.executescript(
+                "".join("DROP TABLE IF EXISTS {};".format(table) for table in _TABLE_KEYS)
+                + _SCHEMA
+            )
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO info VALUES ('schema_version', ?)",
+                    (str(self.SCHEMA_VERSION),),
+                )
+        return connection
+
+    def _get_read_connection(self) -> sqlite3.Connection:
+        if self.read_connection is None:
+            self.read_connection = sqlite3.connect(
+                "file:{}?mode=ro".format(pathname2url(self.filename)),
+                uri=True,
+                timeout=60,
+                check_same_thread=False,
+            )
+        return self.read_connection
+
+    # ====================================================================
+    # Saving
+    # ====================================================================
+
+    def save(self, object_dict, test_list) -> None:
+        """
+        Saves the project objects, e.g. settings and the library container,
+        by name, and the tests to be re-run.
+        Libraries in the library container, their files, the scan data of
+        the files and their modules are saved in rows of their own. Rows
+        no longer referred to are removed.
+        """
+        with self.lock:
+            try:
+                self._save(object_dict, test_list)
+            finally:
+                self.row_list = []
+                self.row_id_set = set()
+                self.close()
+
+    def _save(self, object_dict, test_list) -> None:
+        is_rewrite = not self.is_synced
+        if is_rewrite:
+            self._reset()
+        library_container = object_dict.get("library")
+        if library_container is not None:
+            for library in library_container.get():
+                self._add_library_rows(library)
+        # Libraries are saved in every run, other rows when changed
+        for pid, obj in list(self.object_dict.items()):
+            if pid[0] not in _TABLE_KEYS or _is_ghost(obj):
+                continue
+            if pid[0] == "library" or pid not in self.stored_dict or CHANGED_NAME in obj.__dict__:
+                self._add_row(pid, obj)
+
+        row_dict = {}
+        for name, obj in object_dict.items():
+            row_dict[("object", name)] = self._dumps(obj)
+        for position, test in enumerate(test_list):
+            row_dict[("test", position)] = self._dumps(test)
+        # Rows are added while pickling if objects without rows are
+        # referred to
+        idx = 0
+        while idx < len(self.row_list):
+            (pid, obj) = self.row_list[idx]
+            row_dict[pid] = self._dumps(obj)
+            idx += 1
+
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        removed_set = set(
+            pid for pid in self.stored_dict if pid[0] in _ROOT_TABLES and pid not in row_dict
+        )
+        written_dict = {}
+        with closing(self._connect()) as connection:
+            # Rows may no longer be referred to if a row has been removed,
+            # or if a changed row no longer refers to a row
+            if removed_set or any(
+                self._get_has_removed_refs(pid, row) for pid, row in row_dict.items()
+            ):
+                removed_set.update(self._get_unreferred_pids(connection, row_dict))
+            with connection:
+                if is_rewrite:
+                    for table in _TABLE_KEYS:
+                        connection.execute("DELETE FROM {}".format(table))
+                for pid in removed_set:
+                    connection.execute(
+                        "DELETE FROM {} WHERE {}".format(
+                            pid[0], " AND ".join(c + " = ?" for c in _TABLE_KEYS[pid[0]])
+                        ),
+                        pid[1:],
+                    )
+                for pid, (kind, digest, ref_list, data) in row_dict.items():
+                    stored = self.stored_dict.get(pid)
+                    if pid in removed_set or (stored is not None and stored[:2] == (kind, digest)):
+                        continue
+                    refs = pickle.dumps(ref_list, pickle.HIGHEST_PROTOCOL)
+                    connection.execute(
+                        "INSERT OR REPLACE INTO {} VALUES ({})".format(
+                            pid[0], ", ".join("?" * (len(pid) + 3))
+                        ),
+                        pid[1:] + (kind, digest, refs, data),
+                    )
+                    written_dict[pid] = (kind, digest, refs)
+
+        self.stored_dict.update(written_dict)
+        for pid in removed_set:
+            self._remove_object(pid)
+        for (_, obj) in self.row_list:
+            obj.__dict__.pop(CHANGED_NAME, None)
+        self.is_synced = True
+        self.logger.debug(
+            "Project database saved: {} rows written, {} rows removed.".format(
+                len(written_dict), len(removed_set)
+            )
+        )
+
+    def _add_library_rows(self, library) -> None:
+        """
+        Adds rows for the library, and for its files, scan data and
+        modules without rows, i.e. they are keyed by file.
+        """
+        library_name = library.get_name()
+        if id(library) in self.pid_dict:
+            self._add_row(self.pid_dict[id(library)], library)
+        else:
+            self._add_object_row(("library", library_name), library)
+        for hdlfile in library.get_hdlfile_list():
+            hdlfile_pid = self.pid_dict.get(id(hdlfile))
+            if hdlfile_pid is None:
+                hdlfile_pid = self._add_object_row(
+                    ("hdlfile", library_name, hdlfile.get_filename_with_path()), hdlfile
+                )
+            # Modules are only added when scanning, i.e. when the scan
+            # data is changed
+            scanner = hdlfile.scanner
+            if scanner is None or _is_ghost(scanner):
+                continue
+            if id(scanner) not in self.pid_dict:
+                self._add_object_row(("scanner",) + hdlfile_pid[1:], scanner)
+            elif CHANGED_NAME not in scanner.__dict__:
+                continue
+            for position, module in enumerate(scanner.get_module_container().get()):
+                if id(module) not in self.pid_dict:
+                    self._add_object_row(("module",) + hdlfile_pid[1:] + (position,), module)
+
+    def _add_row(self, pid, obj) -> None:
+        if id(obj) not in self.row_id_set:
+            self.row_id_set.add(id(obj))
+            self.row_list.append((pid, obj))
+
+    def _add_object(self, pid, obj) -> None:
+        self.object_dict[pid] = obj
+        self.pid_dict[id(obj)] = pid
+
+    def _remove_object(self, pid) -> None:
+        self.stored_dict.pop(pid, None)
+        obj = self.object_dict.pop(pid, None)
+        if obj is not None:
+            del self.pid_dict[id(obj)]
+
+    def _add_object_row(self, pid, obj) -> tuple:
+        """
+        Adds a row for an object without a row, the key is numbered
+        until it is unique. Returns the key of the row.
+        """
+        idx = 0
+        unique_pid = pid
+        while unique_pid in self.object_dict or unique_pid in self.stored_dict:
+            idx += 1
+            if pid[0] == "module":
+                unique_pid = pid[:-1] + (pid[-1] + idx,)
+            else:
+                unique_pid = pid[:-1] + ("{}#{}".format(pid[-1], idx),)
+        self._add_object(unique_pid, obj)
+        self._add_row(unique_pid, obj)
+        return unique_pid
+
+    def _add_referred_row(self, obj) -> tuple:
+        """
+        Adds a row for a library, file, scan data or module that is not
+        found in the library container, e.g. a file replaced by add_file().
+        """
+        if isinstance(obj, HDLLibrary):
+            pid = ("library", obj.get_name())
+        elif isinstance(obj, HDLFile):
+            pid = ("hdlfile", "", obj.get_filename_with_path())
+        elif isinstance(obj, HDLScanner):
+            pid = ("scanner", "", obj.get_filename() or "")
+        else:
+            pid = ("module", "", "", 0)
+        return self._add_object_row(pid, obj)
+
+    def _get_is_reference_type(self, obj_type) -> bool:
+        if self.project is not None and issubclass(obj_type, type(self.project)):
+            return True
+        return issubclass(
+            obj_type, (HDLRegressionSettings, HDLLibrary, HDLFile, HDLScanner, BaseModule)
+        )
+
+    def _get_persistent_id(self, obj) -> tuple:
+        # Objects of this run are referred to, not saved
+        if self.project is not None and isinstance(obj, type(self.project)):
+            return ("project",)
+        if isinstance(obj, HDLRegressionSettings):
+            return ("settings",)
+        return self._add_referred_row(obj)
+
+    def _dumps(self, obj) -> tuple:
+        """
+        Returns the kind, digest, referred row keys and pickled state
+        of an object.
+        """
+        kind = "{}:{}".format(type(obj).__module__, type(obj).__qualname__)
+        get_state = getattr(obj, "__getstate__", None)
+        state = get_state() if get_state is not None else obj.__dict__
+        # Sets kept next to lists by get_list_set() are rebuilt when used,
+        # and not saved as their order differs between runs
+        if isinstance(state, dict) and (
+            CHANGED_NAME in state or not LIST_SET_NAMES.isdisjoint(state)
+        ):
+            state = {
+                name: value
+                for name, value in state.items()
+                if name != CHANGED_NAME and name not in LIST_SET_NAMES
+            }
+        data_file = io.BytesIO()
+        pickler = _RowPickler(data_file, self)
+        pickler.dump(state)
+        data = data_file.getvalue()
+        return kind, hashlib.blake2b(data, digest_size=16).hexdigest(), sorted(pickler.ref_set), data
+
+    def _get_has_removed_refs(self, pid, row) -> bool:
+        """
+        Returns True if a stored row referred to rows that the
+        changed row does not refer to.
+        """
+        stored = self.stored_dict.get(pid)
+        if stored is None or stored[:2] == row[:2]:
+            return False
+        if stored[2] is None:
+            return True
+        return not set(pickle.loads(stored[2])).issubset(row[2])
+
+    def _get_unreferred_pids(self, connection, row_dict) -> set:
+        """
+        Returns the keys of the rows that are not referred to from the
+        project objects or the tests, directly or through other rows.
+        Objects of these rows that are not loaded are loaded, as they
+        may still be used in this run.
+        """
+        ref_dict = {}
+        for table, key_columns in _TABLE_KEYS.items():
+            if table in _ROOT_TABLES:
+                continue
+            for row in connection.execute(
+                "SELECT {}, refs FROM {}".format(", ".join(key_columns), table)
+            ):
+                ref_dict[(table,) + tuple(row[:-1])] = row[-1]
+        for pid, row in row_dict.items():
+            ref_dict[pid] = row[2]
+
+        referred_set = set()
+        unvisited = [pid for pid in row_dict if pid[0] in _ROOT_TABLES]
+        while unvisited:
+            pid = unvisited.pop()
+            if pid in referred_set:
+                continue
+            referred_set.add(pid)
+            refs = ref_dict.get(pid)
+            if isinstance(refs, bytes):
+                refs = pickle.loads(refs)
+            unvisited.extend(ref for ref in refs or [] if ref not in referred_set)
+
+        unreferred_set = ref_dict.keys() - referred_set
+        for pid in unreferred_set:
+            obj = self.object_dict.get(pid)
+            if obj is not None and _is_ghost(obj):
+                self._load_group(obj)
+        return unreferred_set
+
+    # ====================================================================
+    # Loading
+    # ====================================================================
+
+    def load(self, object_names) -> tuple:
+        """
+        Loads the project objects with the given names, and the tests
+        to be re-run. Objects not found in the database are not returned.
+        Scan data and modules are loaded when first used.
+
+        Returns:
+            object_dict(dict): objects by name.
+            test_list(list): tests to be re-run.
+        """
+        if not self.exists():
+            return {}, []
+
+        with self.lock:
+            self.close()
+            self._reset()
+            try:
+                return self._load(object_names)
+            except Exception as error:
+                self.logger.warning(
+                    "Unable to load project database {}: {}".format(self.filename, error)
+                )
+                self._reset()
+                return {}, []
+
+    def _load(self, object_names) -> tuple:
+        rows = {}
+        with closing(self._connect()) as connection:
+            for table, key_columns in _TABLE_KEYS.items():
+                if table in _LAZY_TABLES:
+                    query = "SELECT {}, kind, digest, NULL, NULL FROM {}"
+                else:
+                    query = "SELECT {}, kind, digest, refs, data FROM {}"
+                for row in connection.execute(query.format(", ".join(key_columns), table)):
+                    pid = (table,) + tuple(row[:-4])
+                    self.stored_dict[pid] = row[-4:-1]
+                    if row[-1] is not None and (table != "object" or pid[1] in object_names):
+                        rows[pid] = (row[-4], row[-1])
+
+        # Every library and file is created before any is loaded, as
+        # they refer to each other
+        for pid, (kind, _) in rows.items():
+            if pid[0] in ("library", "hdlfile"):
+                self._add_object(pid, self._create(kind))
+
+        settings_pid = ("object", "settings")
+        if settings_pid in rows:
+            self.object_dict[("settings",)] = self._loads(settings_pid, *rows[settings_pid])
+
+        object_dict = {}
+        test_dict = {}
+        for pid, (kind, data) in rows.items():
+            if pid == settings_pid:
+                object_dict["settings"] = self.object_dict[("settings",)]
+            elif pid[0] == "object":
+                object_dict[pid[1]] = self._loads(pid, kind, data)
+            elif pid[0] == "test":
+                test_dict[pid[1]] = self._loads(pid, kind, data)
+            else:
+                self._loads(pid, kind, data)
+        test_list = [test_dict[position] for position in sorted(test_dict)]
+        self.is_synced = True
+        return object_dict, test_list
+
+    def _load_group(self, ghost) -> None:
+        """
+        Loads the scan data and modules of the file of a row that is
+        not loaded, i.e. all rows keyed by the same library and file.
+        """
+        with self.lock:
+            # Loaded by another thread
+            if not _is_ghost(ghost):
+                return
+            pid = self.pid_dict.get(id(ghost))
+            if pid is None:
+                raise ProjectDatabaseError("Object not loaded from {}".format(self.filename))
+
+            data_list = []
+            try:
+                connection = self._get_read_connection()
+                for table in _LAZY_TABLES:
+                    query = "SELECT {}, kind, digest, refs, data FROM {} WHERE library = ? AND filename = ?"
+                    for row in connection.execute(
+                        query.format(", ".join(_TABLE_KEYS[table]), table), pid[1:3]
+                    ):
+                        row_pid = (table,) + tuple(row[:-4])
+                        obj = self.object_dict.get(row_pid)
+                        # Rows saved in this run are up to date
+                        if obj is not None and not _is_ghost(obj):
+                            continue
+                        self.stored_dict[row_pid] = row[-4:-1]
+                        data_list.append((self._get_persistent_object(row_pid), row[-1]))
+            except sqlite3.Error as error:
+                raise ProjectDatabaseError(
+                    "Unable to load {} from {}: {}".format(pid, self.filename, error)
+                )
+
+            # Every object of the file is created before any is loaded
+            state_list = [(obj, self._load_state(data)) for (obj, data) in data_list]
+            for (obj, state) in state_list:
+                obj.__dict__.update(state)
+                object.__setattr__(obj, "__class__", type(obj).__bases__[0])
+            if _is_ghost(ghost):
+                raise ProjectDatabaseError("Missing row {}".format(pid))
+
+    def _create(self, kind, is_ghost=False):
+        cls = self.class_dict.get(kind)
+        if cls is None:
+            (module_name, qualname) = kind.split(":")
+            cls = importlib.import_module(module_name)
+            for name in qualname.split("."):
+                cls = getattr(cls, name)
+            self.class_dict[kind] = cls
+        if is_ghost:
+            cls = self._get_ghost_class(cls)
+        return cls.__new__(cls)
+
+    def _get_ghost_class(self, cls):
+        """
+        Returns a subclass of cls for placeholders of rows that are not
+        loaded. The row is loaded when an attribute of the placeholder
+        is used, and the placeholder is changed to a cls object.
+        """
+        ghost_class = self.ghost_class_dict.get(cls)
+        if ghost_class is None:
+            ghost_class = type(
+                cls.__name__,
+                (cls,),
+                {
+                    "__module__": cls.__module__,
+                    "__getattr__": _ghost_getattr,
+                    "__setattr__": _ghost_setattr,
+                    "__delattr__": _ghost_delattr,
+                    "__reduce_ex__": _ghost_reduce_ex,
+                    "_project_database": self,
+                },
+            )
+            self.ghost_class_dict[cls] = ghost_class
+        return ghost_class
+
+    def _load_state(self, data) -> dict:
+        state = _RowUnpickler(io.BytesIO(data), self).load()
+        # Attribute names are interned, as done by pickle, i.e. the
+        # object is saved the same way when not changed
+        return {sys.intern(name): value for name, value in state.items()}
+
+    def _loads(self, pid, kind, data):
+        obj = self.object_dict.get(pid)
+        if obj is None:
+            obj = self._create(kind)
+        set_state = getattr(obj, "__setstate__", None)
+        if set_state is not None:
+            set_state(_RowUnpickler(io.BytesIO(data), self).load())
+        else:
+            for name, value in self._load_state(data).items():
+                setattr(obj, name, value)
+        return obj
+
+    def _get_persistent_object(self, pid):
+        if pid == ("project",):
+            return self.project
+        if pid == ("settings",) and pid not in self.object_dict:
+            return self.project.settings
+        obj = self.object_dict.get(pid)
+        if obj is None:
+            # Scan data and modules are loaded when first used
+            stored = self.stored_dict.get(pid)
+            if stored is None or pid[0] not in _LAZY_TABLES:
+                raise ProjectDatabaseError("Missing row {}".format(pid))
+            obj = self._create(stored[0], is_ghost=True)
+            self._add_object(pid, obj)
+        return obj
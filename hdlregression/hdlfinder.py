@@ -17,6 +17,7 @@
 import os
 import fnmatch
 import glob
+import time
 from .report.logger import Logger
 
 
@@ -27,6 +28,12 @@ class HDLFinder(object):
 
     _WILDCARDS = ("*", "?", "[")
 
+    # Directory listings by case-folded file name, see _get_dir_index()
+    _DIR_INDEX_CACHE = {}
+    # Directories modified more recently than this are listed each time,
+    # as a change within the file system timestamp resolution is not seen.
+    _DIR_INDEX_MIN_AGE_NS = 2 * 10**9
+
     def __init__(self, project, filename=None):
         self.logger = Logger(name=__name__, project=project)
         self.project = project
@@ -70,6 +77,27 @@ class HDLFinder(object):
             for f in files:
                 yield directory, f
 
+    def _get_dir_index(self, directory) -> dict:
+        """
+        Returns a dict with the files in directory by case-folded name.
+        The listing is kept until the directory is modified, i.e. adding
+        files one by one from the same directory only lists it once.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return {}
+        cached = HDLFinder._DIR_INDEX_CACHE.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        dir_index = {}
+        for _, name in self._iter_candidates(directory, recursive=False):
+            dir_index.setdefault(name.lower(), []).append(name)
+        if time.time_ns() - mtime > self._DIR_INDEX_MIN_AGE_NS:
+            HDLFinder._DIR_INDEX_CACHE[directory] = (mtime, dir_index)
+        return dir_index
+
     def find_files(self, filename, recursive=False):
         """
         Find all files matching 'filename' (case-insensitive).
@@ -112,7 +140,11 @@ class HDLFinder(object):
         # Search each resolved directory
         for dir in dirs:
             try:
-                for root, name in self._iter_candidates(dir, recursive):
+                if recursive or self._has_wildcards(pattern):
+                    candidates = self._iter_candidates(dir, recursive)
+                else:
+                    candidates = [(dir, name) for name in self._get_dir_index(dir).get(pattern, [])]
+                for root, name in candidates:
                     if fnmatch.fnmatch(name.lower(), pattern):
                         full_path = os.path.join(root, name)
                         if full_path not in self._seen:
@@ -28,18 +28,7 @@ from .report.logger import Logger
 from .settings import HDLRegressionSettings
 from .settings import TestcaseSettings
 from .construct.container import Container
-from .report.jsonreporter import JSONReporter
-from .report.csvreporter import CSVReporter
-from .report.txtreporter import TXTReporter
-from .report.xmlreporter import XMLReporter
-from .report.htmlreporter import HTMLReporter
-from .run.tcl_runner import TclRunnerModelsim, TclRunnerRiviera, TclRunnerActiveHDL
-from .run.cmd_runner import CommandRunner
-from .run.runner_modelsim import ModelsimRunner
-from .run.runner_nvc import NVCRunner
-from .run.runner_ghdl import GHDLRunner
-from .run.runner_aldec import RivieraRunner, ActiveHDLRunner
-from .run.vivado_runner import VivadoRunner
+from .construct.project_db import ProjectDatabase
 from .construct.hdllibrary import HDLLibrary, PrecompiledLibrary
 from .configurator import SettingsConfigurator
 from .run.hdltests import TestStatus
@@ -47,6 +36,7 @@ import copy
 import sys
 import os
 import pickle
+import sqlite3
 from signal import signal, SIGINT
 
 # Enable terminal colors on windows OS
@@ -113,7 +103,6 @@ class HDLRegression:
         self._setup_logger()
         self.reporter = None
         self.testcase_settings = TestcaseSettings()
-        self.settings.detect_python_exec()
 
     def add_precompiled_library(self, compile_path: str, library_name: str):
         """
@@ -323,17 +312,28 @@ class HDLRegression:
         :param library: Write library information if set
         :type library: bool
         """
+        # Reporters are imported when used, i.e. not by listing calls
+        from .report.txtreporter import TXTReporter
+
         # Get the file extension in lower case
         file_extension = os.path.splitext(report_file)[1].lower()
         if report_file.lower().endswith(".txt"):
             self.reporter = TXTReporter(filename=report_file, project=self)
         elif report_file.lower().endswith(".csv"):
+            from .report.csvreporter import CSVReporter
+
             self.reporter = CSVReporter(filename=report_file, project=self)
         elif report_file.lower().endswith(".json"):
+            from .report.jsonreporter import JSONReporter
+
             self.reporter = JSONReporter(filename=report_file, project=self)
         elif report_file.lower().endswith(".xml"):
+            from .report.xmlreporter import XMLReporter
+
             self.reporter = XMLReporter(filename=report_file, project=self)
         elif report_file.lower().endswith(".html") or report_file.lower().endswith(".htm"):
+            from .report.htmlreporter import HTMLReporter
+
             self.reporter = HTMLReporter(filename=report_file, project=self)
         else:
             self.logger.warning(
@@ -555,6 +555,9 @@ class HDLRegression:
         elif self.settings.get_list_compile_order():
             print(list_compile_order(self.library_container))
 
+        elif self.settings.get_list_test_selection():
+            print(list_test_selection(self.runner, self.re_run_tc_list))
+
         elif self.settings.get_list_testgroup():
             print(list_testgroup(self.testgroup_collection_container))
 
@@ -568,6 +571,12 @@ class HDLRegression:
             """
             self.logger.info("Simulator: {}".format(self.runner.get_simulator_name()))
 
+            from .run.tcl_runner import (
+                TclRunnerModelsim,
+                TclRunnerRiviera,
+                TclRunnerActiveHDL,
+            )
+
             if self.settings.get_simulator_name() == "MODELSIM":
                 self.runner = TclRunnerModelsim(project=self)
             elif self.settings.get_simulator_name() == "RIVIERA-PRO":
@@ -698,6 +707,29 @@ class HDLRegression:
         """
         return self.runner.get_num_pass_test()
 
+    def get_num_cached_pass_tests(self) -> int:
+        """
+        Returns the number of passing tests that were not simulated
+        in this run, as they passed with the same inputs before.
+
+        :rtype: int
+        :return: Number of cached passing tests in run.
+        """
+        return self.runner.get_num_cached_pass_test()
+
+    def get_cached_pass_tests(self) -> list:
+        """
+        Returns the passing tests that were not simulated in this
+        run, as they passed with the same inputs before.
+
+        :rtype: list
+        :return: List of cached passing tests in run.
+        """
+        if self.runner:
+            return self.runner.get_cached_pass_test_list()
+        else:
+            return []
+
     def get_num_fail_tests(self) -> int:
         """
         Returns the number of tests that have failed in this run.
@@ -822,6 +854,8 @@ class HDLRegression:
             )
         else:
             self.logger.debug("run_command(): %s" % (command))
+            from .run.cmd_runner import CommandRunner
+
             (output, error_code) = CommandRunner(project=self).script_run(
                 command, verbose=verbose
             )
@@ -890,6 +924,18 @@ class HDLRegression:
                 file_list.append(file.get_filename_with_path())
         return file_list
 
+    def get_library_levels(self) -> list:
+        """
+        Returns the library names divided into dependency levels,
+        where the libraries of a level only depend on libraries in
+        earlier levels, i.e. can be compiled concurrently.
+
+        :rtype: list
+        :return: List of lists of library names.
+        """
+        (levels, _) = sort_libraries_by_dependency(self.library_container.get())
+        return [[library.get_name() for library in level] for level in levels]
+
     # pylint: enable=too-many-arguments
 
     # ========================================================
@@ -945,9 +991,9 @@ class HDLRegression:
 
         # Load HDLRegression install version number.
         installed_version = self._get_install_version()
-        display_info_text(version=installed_version)
-
-        self.detected_simulators = simulator_detector()
+        # Listing output is read by other tools, i.e. IDE integrations
+        if not self._get_is_listing_run():
+            display_info_text(version=installed_version)
 
         # # Load any previously saved HDLRegression cache.
         self._load_project_databases(output_path)
@@ -961,6 +1007,22 @@ class HDLRegression:
         # Update cached version (settings) with installed version number.
         self.settings.set_hdlregression_version(installed_version)
 
+    def _get_is_listing_run(self) -> bool:
+        """
+        Returns True if HDLRegression is called to list the project,
+        i.e. with one of the list arguments, and not to run it.
+        """
+        return any(
+            (
+                self.settings.get_list_testcase(),
+                self.settings.get_export_testcases_json_path(),
+                self.settings.get_list_dependencies(),
+                self.settings.get_list_compile_order(),
+                self.settings.get_list_test_selection(),
+                self.settings.get_list_testgroup(),
+            )
+        )
+
     def _rebuild_databases_if_required_or_requested(
         self, version_ok: bool, output_path: str
     ):
@@ -1025,6 +1087,8 @@ class HDLRegression:
         # Organize the libraries by dependecy
         self.logger.info("Building test suite structure...")
         organize_libraries_by_dependency(project=self)
+        # Mark files depending on changed files for compile
+        mark_dependent_files_for_compile(self.library_container.get())
 
     def _setup_simulation_runner(self):
         # Get runner object based on configuration settings
@@ -1063,6 +1127,8 @@ class HDLRegression:
         request_libraries_prepare(project=self)
         # Organize the libraries by dependecy
         organize_libraries_by_dependency(project=self)
+        # Mark files depending on changed files for compile
+        mark_dependent_files_for_compile(self.library_container.get())
 
         # Prepare modelsim.ini file
         modelsim_ini_file = self.runner._setup_ini()
@@ -1118,17 +1184,30 @@ class HDLRegression:
         :rtype: Runner
         :return: Simulator runner object.
         """
+        # Only the runner of the selected simulator is imported
         if simulator == "MODELSIM":
+            from .run.runner_modelsim import ModelsimRunner
+
             runner_obj = ModelsimRunner(project=self)
         elif simulator == "RIVIERA-PRO":
+            from .run.runner_aldec import RivieraRunner
+
             runner_obj = RivieraRunner(project=self)
         elif simulator == "ACTIVE-HDL":
+            from .run.runner_aldec import ActiveHDLRunner
+
             runner_obj = ActiveHDLRunner(project=self)
         elif simulator == "GHDL":
+            from .run.runner_ghdl import GHDLRunner
+
             runner_obj = GHDLRunner(project=self)
         elif simulator == "NVC":
+            from .run.runner_nvc import NVCRunner
+
             runner_obj = NVCRunner(project=self)
         elif simulator == "VIVADO":
+            from .run.vivado_runner import VivadoRunner
+
             runner_obj = VivadoRunner(project=self)
         else:
             sim_info = self.settings.get_simulators_info()
@@ -1196,10 +1275,9 @@ class HDLRegression:
         :rtype: Container
         :return: Testgroup container
         """
-        for testgroup_container in self.testgroup_collection_container.get():
-            # Testgroup container located
-            if testgroup_container.get_name() == testgroup_name.lower():
-                return testgroup_container
+        testgroup_container = self.testgroup_collection_container.find(testgroup_name)
+        if testgroup_container is not None:
+            return testgroup_container
 
         if create_if_not_found is True:
             new_container = Container(testgroup_name)
@@ -1233,10 +1311,9 @@ class HDLRegression:
         :return: An existing or new library object
         """
         # Check all libraries stored in structure
-        for lib_obj in self.library_container.get():
-            # Found a match, return it
-            if lib_obj.get_name() == library_name:
-                return lib_obj
+        lib_obj = self.library_container.find(library_name)
+        if lib_obj is not None:
+            return lib_obj
 
         if create_new_if_missing is True:
             # No match was found, creating a new and returning it
@@ -1250,94 +1327,117 @@ class HDLRegression:
         # else
         return None
 
+    # Project files saved by earlier versions, moved to the project
+    # database by _migrate_project_files()
+    LEGACY_PROJECT_FILES = {
+        "settings": "settings.dat",
+        "simulator": "simulator.dat",
+        "library": "library.dat",
+        "generic": "generic.dat",
+        "testgroup": "testgroup.dat",
+        "testgroup_collection": "testgroup_collection.dat",
+        "testcase": "testcase.dat",
+    }
+
     def _save_project_to_disk(self, reset: bool = True):
         """
-        Save project structure to files.
+        Save project structure to the project database.
 
         :param reset: Enables resetting of all HDLRegressionSettings obj settings.
         :type reset: bool
         """
-
-        # Helper method
-        def _dump(container, filename, output_path):
-            filename = os.path.join(os.getcwd(), output_path, filename)
-            filename = os_adjust_path(filename)
-            dump_file = open(filename, "wb")
-            pickle.dump(container, dump_file, pickle.HIGHEST_PROTOCOL)
-            dump_file.close()
-
-        settings_copy = copy.deepcopy(self.settings)
+        # Libraries, and the project through them, are referred to by
+        # the settings copy, not copied
+        memo = {id(self): self}
+        for library in self.library_container.get():
+            memo[id(library)] = library
+        settings_copy = copy.deepcopy(self.settings, memo)
         simulator_settings = settings_copy.get_simulator_settings()
         if reset:
             # Do not save argument settings, i.e. this will make next run
             # behave as selected with previous run arguments.
             settings_copy = self.settings_config.unset_argument_settings(settings_copy)
 
-        _dump(self.library_container, "library.dat", settings_copy.get_output_path())
-        _dump(self.generic_container, "generic.dat", settings_copy.get_output_path())
-        _dump(
-            self.testgroup_container, "testgroup.dat", settings_copy.get_output_path()
-        )
-        _dump(
-            self.testgroup_collection_container,
-            "testgroup_collection.dat",
-            settings_copy.get_output_path(),
-        )
-        _dump(settings_copy, "settings.dat", settings_copy.get_output_path())
-        _dump(
-            self.runner.get_re_run_test_obj_list(),
-            "testcase.dat",
-            settings_copy.get_output_path(),
-        )
-        _dump(simulator_settings, "simulator.dat", settings_copy.get_output_path())
+        object_dict = {
+            "settings": settings_copy,
+            "simulator": simulator_settings,
+            "library": self.library_container,
+            "generic": self.generic_container,
+            "testgroup": self.testgroup_container,
+            "testgroup_collection": self.testgroup_collection_container,
+        }
+        try:
+            self.project_db.save(object_dict, self.runner.get_re_run_test_obj_list())
+        except sqlite3.Error as error:
+            self.logger.error("Unable to save project database: %s" % (error))
 
     def _load_project_from_disk(self, output_path: str) -> None:
         """
-        Load project structure from files.
+        Load project structure from the project database.
         """
+        self.project_db = ProjectDatabase(
+            path=os_adjust_path(os.path.join(os.getcwd(), output_path)), project=self
+        )
+        if not self.project_db.exists():
+            self._migrate_project_files(output_path)
 
-        # Helper method
-        def _load(container, filename, output_path):
-            filename = os.path.join(os.getcwd(), output_path, filename)
-            filename = os_adjust_path(filename)
-            try:
-                load_file = open(filename, "rb")
-                container = pickle.load(load_file)
-                load_file.close()
-            except:
-                self.logger.debug("Unable to locate container file %s" % (filename))
-            return container
-
-        self.settings = _load(HDLRegressionSettings(), "settings.dat", output_path)
+        # Configured generics, testcases and testcase groups are only
+        # used when called from GUI
+        object_names = ["settings", "simulator", "library"]
+        if self.init_from_gui is True:
+            object_names += ["generic", "testgroup", "testgroup_collection"]
+        (object_dict, self.re_run_tc_list) = self.project_db.load(object_names)
+
+        self.settings = object_dict.get("settings", HDLRegressionSettings())
         self.settings.set_output_path(output_path)
-        self.library_container = _load(Container("library"), "library.dat", output_path)
+        self.library_container = object_dict.get("library", Container("library"))
 
-        self.generic_container = _load(Container("generic"), "generic.dat", output_path)
-        self.testgroup_container = _load(
-            Container("testgroup"), "testgroup.dat", output_path
+        self.generic_container = object_dict.get("generic", Container("generic"))
+        self.testgroup_container = object_dict.get("testgroup", Container("testgroup"))
+        self.testgroup_collection_container = object_dict.get(
+            "testgroup_collection", Container("testgroup_collection")
         )
-        self.testgroup_collection_container = _load(
-            Container("testgroup_collection"), "testgroup_collection.dat", output_path
-        )
-
-        # self.failing_tc_list = _load([], "testcase.dat")
-        self.re_run_tc_list = _load([], "testcase.dat", output_path)
 
-        self.cached_simulator_settings = _load(
-            self.cached_simulator_settings, "simulator.dat", output_path
+        self.cached_simulator_settings = object_dict.get(
+            "simulator", self.cached_simulator_settings
         )
 
-        # Do not load configured generics, testcases or testcase groups when
-        # called from runner script, only from GUI
-        if self.init_from_gui is False:
-            self.generic_container.empty_list()
-            self.testgroup_container.empty_list()
-            self.testgroup_collection_container.empty_list()
-
         # default settings for success run and return code:
         self.settings.set_return_code(0)
         self.settings.set_run_success(True)
 
+    def _migrate_project_files(self, output_path: str) -> None:
+        """
+        Moves a project saved by an earlier version, i.e. in pickled .dat
+        files, to the project database and removes the files.
+        """
+        object_dict = {}
+        for name, filename in self.LEGACY_PROJECT_FILES.items():
+            filename = os_adjust_path(os.path.join(os.getcwd(), output_path, filename))
+            if not os.path.isfile(filename):
+                continue
+            try:
+                with open(filename, "rb") as load_file:
+                    object_dict[name] = pickle.load(load_file)
+            except Exception as error:
+                self.logger.debug("Unable to load project file %s: %s" % (filename, error))
+        if not object_dict:
+            return
+
+        self.logger.debug("Moving project files to %s." % (self.project_db.filename))
+        test_list = object_dict.pop("testcase", [])
+        try:
+            self.project_db.save(object_dict, test_list)
+        except sqlite3.Error as error:
+            self.logger.warning("Unable to create project database: %s" % (error))
+            return
+
+        for filename in self.LEGACY_PROJECT_FILES.values():
+            try:
+                os.remove(os.path.join(os.getcwd(), output_path, filename))
+            except OSError:
+                pass
+
 
 # pylint: disable=unused-argument
 
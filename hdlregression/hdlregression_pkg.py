@@ -51,20 +51,24 @@ def list_compile_order(container) -> str:
     def compile_string(library):
         if library.get_need_compile():
             return "(recompile)"
-        elif any(lib for lib in library.get_lib_obj_dep() if lib.get_need_compile()):
-            return "(recompile)"
         else:
             return ""
 
     comp_order_str = "\nProject compile order:\n\n"
 
+    # Libraries on the same level can be compiled concurrently
+    (levels, _) = sort_libraries_by_dependency(container.get())
+    library_level = {
+        id(library): idx for idx, level in enumerate(levels) for library in level
+    }
+
     for idx, library in enumerate(container.get()):
         compile_str = compile_string(library)
 
         if idx > 0:
             comp_order_str += "|\n"
-        comp_order_str += "|--[{}]-- {} {}\n".format(
-            (idx + 1), library.get_name(), compile_str
+        comp_order_str += "|--[{}]-- {} (level {}) {}\n".format(
+            (idx + 1), library.get_name(), library_level[id(library)] + 1, compile_str
         )
 
         for hdlfile in library.get_compile_order_list():
@@ -135,6 +139,36 @@ def list_testcases(runner) -> str:
 
     return "\n".join(tc_lines)
 
+def list_test_selection(runner, re_run_tc_list) -> str:
+    """
+    List the tests selected to run with the reason each test
+    was selected.
+
+    Returns:
+    ts_string: a string of all selected tests in project.
+    """
+    ts_lines = []
+
+    runner.prepare_test_modules_and_objects(re_run_tc_list)
+    run_tests = runner.testbuilder.get_list_of_tests_to_run()
+
+    for test in run_tests:
+        ts_lines.append(
+            "TC:{0} - {1}".format(test.get_id_number(), test.get_testcase_name())
+        )
+        if test.get_gc_str(filter_testcase_id=True):
+            ts_lines.append(
+                "    Generics: {0}".format(
+                    test.get_gc_str(filter_testcase_id=True).replace("-g", "")
+                )
+            )
+        ts_lines.append("    Reason: {0}".format(test.get_selection_reason()))
+
+    if not ts_lines:
+        return "No tests selected to run."
+    return "\n".join(ts_lines)
+
+
 def export_testcases_to_json(runner, filename) -> str:
     """
     Export testcases to a JSON file.
@@ -376,8 +410,11 @@ def print_run_success(project):
     )
 
     if project.settings.get_return_code() == 0:
+        num_cached = project.get_num_cached_pass_tests()
+        cached_str = " (%d cached)" % (num_cached) if num_cached > 0 else ""
         project.logger.info(
-            "SIMULATION SUCCESS: %d passing test(s)." % (project.get_num_pass_tests()),
+            "SIMULATION SUCCESS: %d passing test(s)%s."
+            % (project.get_num_pass_tests(), cached_str),
             color="green",
         )
         num_minor_alerts = project.get_num_pass_with_minor_alert_tests()
@@ -460,6 +497,17 @@ def update_settings_from_arguments(project, kwargs: dict):
     if "threading" in kwargs:
         project.logger.info("Threading active.")
         project.settings.set_threading(kwargs.get("threading"))
+    # Number of libraries compiled concurrently
+    project.settings.set_compile_threads(kwargs.get("compile_threads", 1))
+    project.settings.set_compile_batch(kwargs.get("compile_batch", False))
+    # Compiled libraries shared by workspaces
+    project.settings.set_compile_cache_path(kwargs.get("compile_cache", None))
+    project.settings.set_compile_cache_size(kwargs.get("compile_cache_size", 5000))
+    # Processes used for scanning changed files
+    project.settings.set_scan_processes(kwargs.get("scan_processes", 0))
+    # Scan results shared by workspaces
+    project.settings.set_scan_cache(kwargs.get("scan_cache", True))
+    project.settings.set_scan_large_file_size(kwargs.get("scan_large_file_size", 50))
     # Verbosity
     if "verbose" in kwargs:
         project.settings.set_verbose(True)
@@ -479,6 +527,19 @@ def update_settings_from_arguments(project, kwargs: dict):
     if "elaboration_options" in kwargs:
         project.settings.set_elaboration_options(kwargs.get("elaboration_options"))
 
+    # Elaborate each testbench once and reuse it for all its tests
+    project.settings.set_elaboration_cache(kwargs.get("elaboration_cache", False))
+    project.settings.set_jit_time_limit(kwargs.get("jit_time_limit", None))
+    project.settings.set_ghdl_backend(kwargs.get("ghdl_backend", None))
+    project.settings.set_simulator_workers(kwargs.get("simulator_workers", False))
+    project.settings.set_simulator_worker_timeout(
+        kwargs.get("simulator_worker_timeout", None)
+    )
+    # Skip tests passing with the same inputs in a previous run
+    project.settings.set_verdict_cache(kwargs.get("verdict_cache", False))
+    if "force_simulation" in kwargs:
+        project.settings.set_force_simulation(kwargs.get("force_simulation"))
+
     # Coverage options
     if "keep_code_coverage" in kwargs:
         if kwargs.get("keep_code_coverage") is True:
@@ -502,27 +563,189 @@ def update_settings_from_arguments(project, kwargs: dict):
 def request_libraries_prepare(project) -> None:
     """Invoke all Library Objects to prepare for compile/simulate."""
 
+    # Files are scanned by the library threads unless scan processes are used
+    use_scan_processes = project.settings.get_scan_processes() > 0
+
     # Thread method
     def library_prepare(library) -> None:
-        library.update_file_list()
+        if use_scan_processes is False:
+            library.update_file_list()
         library.check_library_files_for_changes()
         library.prepare_for_run()
 
     # Get list of all libraries
     library_list = project.library_container.get()
+
+    if use_scan_processes is True:
+        for library in library_list:
+            library.update_file_list()
+        scan_files_in_processes(project, library_list)
+
     # Default number of threads
     num_threads = 1
     # Check if threading is enabled, i.e. > 0
     if project.settings.get_num_threads() > 0:
         if len(library_list) > 0:
-            num_threads = len(library_list)
+            num_threads = min(len(library_list), os.cpu_count() or 1)
 
     # Execute using 1 or more threads
     with ThreadPool(num_threads) as pool:
         pool.map(library_prepare, library_list)
 
+    # Files depending on files in other libraries
+    connect_library_files(library_list)
+
+
+def scan_files_in_processes(project, library_list) -> None:
+    """
+    Scan changed files of all libraries in a process pool, i.e. the
+    scanning is not limited by the GIL. The scan result is handed to
+    each file and used when the library threads parse the file.
+    """
+    from multiprocessing import get_context, get_all_start_methods
+    from .construct.hdlfile import init_scan_process, scan_file_in_process
+
+    hdlfile_list = []
+    for library in library_list:
+        for hdlfile in library.get_hdlfile_list():
+            if hdlfile.get_need_compile() is True:
+                if hdlfile.get_scan_request() is None:
+                    continue
+                # Files in the scan cache are not scanned again
+                if hdlfile.set_scan_result_from_cache() is False:
+                    hdlfile_list.append(hdlfile)
+
+    num_processes = min(project.settings.get_scan_processes(), len(hdlfile_list))
+    if num_processes < 2:
+        return
+
+    # Spawned processes would run the user script again
+    if "fork" not in get_all_start_methods():
+        project.logger.warning(
+            "Scan processes are not supported on this platform, scanning with threads."
+        )
+        return
+
+    scan_request_list = [hdlfile.get_scan_request() for hdlfile in hdlfile_list]
+    chunksize = max(1, len(scan_request_list) // (num_processes * 4))
+    with get_context("fork").Pool(
+        processes=num_processes,
+        initializer=init_scan_process,
+        initargs=(project.settings,),
+    ) as pool:
+        scan_result_list = pool.map(
+            scan_file_in_process, scan_request_list, chunksize=chunksize
+        )
+
+    for hdlfile, scan_result in zip(hdlfile_list, scan_result_list):
+        if scan_result is not None:
+            hdlfile.set_scan_result(scan_result)
+
+
+def connect_library_files(library_list) -> None:
+    """
+    Connects files with the files in other libraries they depend on,
+    i.e. the files of all libraries form one dependency graph. Files
+    are connected by the design units referred to with library name,
+    e.g. "use ip_lib.ip_pkg.all" or "entity ip_lib.core", where
+    "use ip_lib.all" refers to every design unit in the library.
+    Package bodies and architectures are not referred to.
+    Files are connected as in the last run if no files have changed.
+    """
+    if not any(library.get_has_changed_files() for library in library_list):
+        return
+
+    unit_files = {}
+    for library in library_list:
+        library_name = library.get_name()
+        for hdlfile in library.get_hdlfile_list():
+            for module in hdlfile.get_modules():
+                if module.get_is_architecture() or module.get_is_package_body():
+                    continue
+                for unit_name in (module.get_name().lower(), "all"):
+                    file_list = unit_files.setdefault((library_name, unit_name), [])
+                    if hdlfile not in file_list[-1:]:
+                        file_list.append(hdlfile)
+
+    for library in library_list:
+        for hdlfile in library.get_hdlfile_list():
+            for module in hdlfile.get_modules():
+                for ext_unit in module.get_ext_unit_dep():
+                    (library_name, _, unit_name) = ext_unit.partition(".")
+                    for dep_hdlfile in unit_files.get((library_name, unit_name), []):
+                        if dep_hdlfile.get_library() is not library:
+                            hdlfile.add_hdlfile_this_dep_on(dep_hdlfile)
+                            dep_hdlfile.add_hdlfile_dep_on_this(hdlfile)
+
+
+def sort_libraries_by_dependency(library_list) -> tuple:
+    """
+    Sorts the libraries topologically, i.e. divides them into levels
+    where every library only depends on libraries in earlier levels.
+    The libraries of a level can be compiled concurrently, and are
+    kept in the order of library_list. Dependencies on libraries not
+    in library_list are ignored.
+
+    Returns:
+    levels(list): a list of lists of libraries.
+    cycle(list): the libraries of a recursive dependency, e.g.
+                 [a, b, a] when a depends on b and b depends on a,
+                 or an empty list. Libraries that could not be
+                 sorted are added as single library levels.
+    """
+    position = {id(library): idx for idx, library in enumerate(library_list)}
+    dep_dict = {}
+    dependent_dict = {id(library): [] for library in library_list}
+    num_deps = {}
+    for library in library_list:
+        dep_list = []
+        for dep_library in library.get_lib_obj_dep():
+            if dep_library is library or id(dep_library) not in position:
+                continue
+            if dep_library not in dep_list:
+                dep_list.append(dep_library)
+                dependent_dict[id(dep_library)].append(library)
+        dep_dict[id(library)] = dep_list
+        num_deps[id(library)] = len(dep_list)
+
+    # Kahn's algorithm, one level at a time
+    levels = []
+    level = [library for library in library_list if num_deps[id(library)] == 0]
+    while level:
+        levels.append(level)
+        next_level = []
+        for library in level:
+            for dependent in dependent_dict[id(library)]:
+                num_deps[id(dependent)] -= 1
+                if num_deps[id(dependent)] == 0:
+                    next_level.append(dependent)
+        level = sorted(next_level, key=lambda library: position[id(library)])
+
+    remaining = [library for library in library_list if num_deps[id(library)] > 0]
+    if not remaining:
+        return levels, []
+
+    # Every remaining library depends on another remaining library,
+    # follow the dependencies until a library is visited again.
+    path = [remaining[0]]
+    visited = {id(remaining[0]): 0}
+    while True:
+        library = next(
+            dep_library
+            for dep_library in dep_dict[id(path[-1])]
+            if num_deps[id(dep_library)] > 0
+        )
+        if id(library) in visited:
+            cycle = path[visited[id(library)]:] + [library]
+            break
+        visited[id(library)] = len(path)
+        path.append(library)
+
+    levels += [[library] for library in remaining]
+    return levels, cycle
 
-def organize_libraries_by_dependency(project) -> None:
+
+def organize_libraries_by_dependency(project) -> bool:
     """
     Organize libraries by dependency order.
 
@@ -530,48 +753,116 @@ def organize_libraries_by_dependency(project) -> None:
     :return: Status of setting up library dependencies.
     """
     # Skip if no libraries have changes.
-    lib_changes = any(lib.get_need_compile() for lib in project.library_container.get())
+    lib_changes = any(
+        lib.get_need_compile() or lib.get_has_changed_files()
+        for lib in project.library_container.get()
+    )
     if lib_changes is False:
         return True
 
-    # Organize by dependency - this value of i corresponds to
-    # how many values were sorted.
-    num_libraries = project.library_container.num_elements()
     libraries = project.library_container.get()
+    (levels, cycle) = sort_libraries_by_dependency(libraries)
+    if cycle:
+        project.logger.error(
+            "Recursive library dependency: %s."
+            % (" -> ".join(library.get_name() for library in cycle))
+        )
 
-    swapped = True
-    while swapped:
-        swapped = False
-
-        for i in range(num_libraries):
-            # Assume that the first item of the unsorted
-            # segment has no dependencies.
-            lowest_value_index = i
-            # This loop iterates over the unsorted items.
-            for j in range(i + 1, num_libraries):
-                check_lib = libraries[j]
-                with_lib = libraries[lowest_value_index]
-
-                if check_lib.get_name() in with_lib.get_lib_dep():
-                    if with_lib.get_name() in check_lib.get_lib_dep():
-                        project.logger.error(
-                            "Recursive library dependency: %s and %s."
-                            % (check_lib.get_name(), with_lib.get_name())
-                        )
-                        continue
-                    lowest_value_index = j
-            # Swap values of the lowest unsorted element with the
-            # first unsorted element.
-            if i != lowest_value_index:
-                project.logger.debug(
-                    f"Swapping: {check_lib.get_name()} <-> {with_lib.get_name()}."
-                )
-                (libraries[i], libraries[lowest_value_index]) = (
-                    libraries[lowest_value_index],
-                    libraries[i],
-                )
-                swapped = True
-    return True
+    libraries[:] = [library for level in levels for library in level]
+    return not cycle
+
+
+def get_library_name_references(hdlfile) -> set:
+    """
+    Returns the names of the libraries the file refers to by library
+    name only, i.e. without referring to any of their design units,
+    e.g. a library clause for a component instantiation.
+    """
+    modules = hdlfile.get_modules()
+    ext_dep = set(dep.lower() for module in modules for dep in module.get_ext_dep())
+    unit_dep_libraries = set(
+        ext_unit.partition(".")[0].lower()
+        for module in modules
+        for ext_unit in module.get_ext_unit_dep()
+    )
+    return ext_dep - unit_dep_libraries
+
+
+def get_is_referred_by_library_name(hdlfile) -> bool:
+    """
+    Returns True if the file may be used by files referring to its
+    library by name only. Packages and contexts are referred to by
+    name in use clauses, other units may be bound by name only, e.g.
+    entities of component instantiations.
+    """
+    return any(
+        not (
+            module.get_is_package()
+            or module.get_is_package_body()
+            or module.get_is_context()
+        )
+        for module in hdlfile.get_modules()
+    )
+
+
+def mark_dependent_files_for_compile(library_list) -> None:
+    """
+    Marks every file that depends on a file needing compile, directly
+    or through other files, in the same or in other libraries, for
+    compile. Files depend on each other through the design units they
+    refer to, see connect_library_files(), or by library name only.
+    Files in a library set to depend on another library with
+    set_dependency() depend on every file of that library if they
+    refer to it by name.
+    Files not depending on changed files keep their compiled units.
+    """
+    changed_hdlfiles = [
+        hdlfile
+        for library in library_list
+        for hdlfile in library.get_hdlfile_list()
+        if hdlfile.get_need_compile()
+    ]
+    if not changed_hdlfiles:
+        return
+
+    # Files referring to other libraries by library name only
+    library_name_ref_dict = {}
+    # Files referring to libraries set as dependency by library name
+    manual_ref_dict = {}
+    for library in library_list:
+        manual_dep_names = set(
+            dep_library.get_name().lower() for dep_library in library.get_manual_lib_obj_dep()
+        )
+        for hdlfile in library.get_hdlfile_list():
+            for library_name in get_library_name_references(hdlfile):
+                library_name_ref_dict.setdefault(library_name, []).append(hdlfile)
+            for library_name in manual_dep_names.intersection(
+                dep for module in hdlfile.get_modules() for dep in module.get_ext_dep()
+            ):
+                manual_ref_dict.setdefault(library_name, []).append(hdlfile)
+
+    def get_ext_hdlfile_dep_on_this(hdlfile) -> list:
+        library = hdlfile.get_library()
+        library_name = library.get_name().lower()
+        dep_hdlfile_list = list(manual_ref_dict.get(library_name, []))
+        if get_is_referred_by_library_name(hdlfile):
+            dep_hdlfile_list += [
+                dep_hdlfile
+                for dep_hdlfile in library_name_ref_dict.get(library_name, [])
+                if dep_hdlfile.get_library() is not library
+            ]
+        return dep_hdlfile_list
+
+    marked_hdlfiles = set(changed_hdlfiles)
+    while changed_hdlfiles:
+        hdlfile = changed_hdlfiles.pop()
+        for dep_hdlfile in hdlfile.get_hdlfile_dep_on_this() + get_ext_hdlfile_dep_on_this(
+            hdlfile
+        ):
+            if dep_hdlfile not in marked_hdlfiles:
+                marked_hdlfiles.add(dep_hdlfile)
+                dep_hdlfile.set_need_compile(True)
+                changed_hdlfiles.append(dep_hdlfile)
 
 
 def validate_path(project, path=None, filename=None) -> bool:
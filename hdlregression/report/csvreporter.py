@@ -53,9 +53,10 @@ class CSVReporter(HDLReporter):
                 lf.writerow([])
                 # Write test results
                 pass_tests, fail_tests, not_run_tests = self.project.get_results()
+                cached_tests = self._get_cached_pass_tests()
                 lf.writerow(['Passing tests (%d):' % (len(pass_tests))])
                 for test in pass_tests:
-                    lf.writerow([test])
+                    lf.writerow([test, 'PASS (cached)'] if test in cached_tests else [test])
 
                 lf.writerow([])
                 lf.writerow([])
@@ -61,6 +61,13 @@ class HDLReporter:
     def _time_of_sim(self) -> str:
         return self.project.settings.get_sim_time()
 
+    def _get_cached_pass_tests(self) -> set:
+        '''
+        Returns passing tests that were not simulated as they passed
+        with the same inputs in a previous run.
+        '''
+        return set(self.project.get_cached_pass_tests())
+
     @classmethod
     def set_report_items(cls, report_compile_order, report_spec_cov, report_library):
         cls.set_report_compile_order(report_compile_order)
@@ -57,12 +57,14 @@ class HTMLReporter(HDLReporter):
 
             # Test Results
             pass_tests, fail_tests, not_run_tests = self.project.get_results()
+            cached_tests = self._get_cached_pass_tests()
             f.write('<h2>Test Results</h2>\n')
 
             def write_test_list(title, tests, css_class):
                 f.write(f'<h3>{title} ({len(tests)})</h3>\n<ul>\n')
                 for t in tests:
-                    f.write(f'<li class="{css_class}">{t}</li>\n')
+                    cached = ' (cached)' if t in cached_tests else ''
+                    f.write(f'<li class="{css_class}">{t}{cached}</li>\n')
                 f.write('</ul>\n')
 
             write_test_list("Passing Tests", pass_tests, "pass")
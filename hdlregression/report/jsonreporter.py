@@ -49,17 +49,19 @@ class JSONReporter(HDLReporter):
 
             # Write test results
             pass_tests, fail_tests, not_run_tests = self.project.get_results()
+            cached_tests = self._get_cached_pass_tests()
             pass_test_str = ''
             fail_test_str = ''
             not_run_test_str = ''
             for idx, test in enumerate(pass_tests):
+                result = 'PASS (cached)' if test in cached_tests else 'PASS'
                 if idx + 1 == len(pass_tests):
                     if len(fail_tests) == 0:
-                        pass_test_str += '"%s" : "PASS"\n' % (test)
+                        pass_test_str += '"%s" : "%s"\n' % (test, result)
                     else:
-                        pass_test_str += '"%s" : "PASS",\n' % (test)
+                        pass_test_str += '"%s" : "%s",\n' % (test, result)
                 else:
-                    pass_test_str += '"%s" : "PASS",\n' % (test)
+                    pass_test_str += '"%s" : "%s",\n' % (test, result)
             for idx, test in enumerate(fail_tests):
                 if idx + 1 == len(fail_tests):
                     fail_test_str += '"%s" : "FAIL"\n' % (test)
@@ -45,9 +45,10 @@ class TXTReporter(HDLReporter):
 
                 # Write test results
                 pass_tests, fail_tests, not_run_tests = self.project.get_results()
+                cached_tests = self._get_cached_pass_tests()
                 lf.write('\n\nPassing tests (%d):\n' % (len(pass_tests)))
                 for test in pass_tests:
-                    lf.write(test + '\n')
+                    lf.write(test + (' (cached)' if test in cached_tests else '') + '\n')
                 lf.write('\nFailing tests (%d):\n' % (len(fail_tests)))
                 for test in fail_tests:
                     lf.write(test + '\n')
@@ -46,10 +46,14 @@ class XMLReporter(HDLReporter):
         results = ET.SubElement(report, "Results")
 
         passing_tests, fail_tests, not_run_tests = self.project.get_results()
+        cached_tests = self._get_cached_pass_tests()
 
         pass_elem = ET.SubElement(results, "Passing")
         for test in passing_tests:
-            ET.SubElement(pass_elem, "Test").text = test
+            test_elem = ET.SubElement(pass_elem, "Test")
+            test_elem.text = test
+            if test in cached_tests:
+                test_elem.set("result", "PASS (cached)")
 
         fail_elem = ET.SubElement(results, "Failing")
         for test in fail_tests:
@@ -0,0 +1,123 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+import os
+import shutil
+import uuid
+
+from ..report.logger import Logger
+
+
+class CompileCache:
+    """
+    Content addressed cache of compiled libraries, which can be
+    shared by several workspaces. Each entry is a copy of a compiled
+    library folder stored under its key. The cache is bounded in
+    size, least recently used entries are removed first.
+    """
+
+    ENTRY_FOLDER = "library"
+
+    def __init__(self, path, max_size_mb, project=None):
+        self.logger = Logger(name=__name__, project=project)
+        self.path = os.path.abspath(path)
+        self.max_size = max_size_mb * 1024 * 1024
+        os.makedirs(self.path, exist_ok=True)
+
+    def _get_entry_path(self, key) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    @staticmethod
+    def _get_folder_size(path) -> int:
+        size = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    size += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return size
+
+    def restore(self, key, library_path) -> bool:
+        """
+        Replaces the library folder with the cached library.
+
+        Returns:
+            bool: True if the library was found in the cache.
+        """
+        entry_path = self._get_entry_path(key)
+        cached_library_path = os.path.join(entry_path, self.ENTRY_FOLDER)
+        if not os.path.isdir(cached_library_path):
+            return False
+
+        try:
+            if os.path.isdir(library_path):
+                shutil.rmtree(library_path)
+            shutil.copytree(cached_library_path, library_path)
+            # Mark entry as recently used
+            os.utime(entry_path)
+        except OSError as e:
+            self.logger.warning("Unable to restore from compile cache: {}".format(e))
+            return False
+        return True
+
+    def store(self, key, library_path) -> None:
+        """
+        Adds a copy of the library folder to the cache. The entry is
+        copied to a temporary folder first and then renamed, so other
+        workspaces never see a partial entry.
+        """
+        entry_path = self._get_entry_path(key)
+        if os.path.isdir(entry_path) or not os.path.isdir(library_path):
+            return
+
+        temp_path = os.path.join(self.path, "tmp_{}".format(uuid.uuid4().hex))
+        try:
+            shutil.copytree(library_path, os.path.join(temp_path, self.ENTRY_FOLDER))
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            os.rename(temp_path, entry_path)
+        except OSError as e:
+            # Entry added by another workspace or cache not writable
+            self.logger.debug("Unable to store in compile cache: {}".format(e))
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until the cache size is
+        within the limit.
+        """
+        entries = []
+        for prefix in os.listdir(self.path):
+            prefix_path = os.path.join(self.path, prefix)
+            if prefix.startswith("tmp_") or not os.path.isdir(prefix_path):
+                continue
+            for key in os.listdir(prefix_path):
+                entry_path = os.path.join(prefix_path, key)
+                try:
+                    last_used = os.path.getmtime(entry_path)
+                except OSError:
+                    continue
+                entries.append((last_used, entry_path, self._get_folder_size(entry_path)))
+
+        cache_size = sum(size for _, _, size in entries)
+        for _, entry_path, size in sorted(entries):
+            if cache_size <= self.max_size:
+                break
+            self.logger.debug("Removing from compile cache: {}".format(entry_path))
+            shutil.rmtree(entry_path, ignore_errors=True)
+            cache_size -= size
@@ -42,8 +42,11 @@ class HdlRegressionTest:
 
         self.num_sim_errors = 0
         self.num_sim_warnings = 0
+        self.sim_time = None
 
         self.test_status = TestStatus.NOT_RUN
+        self.selection_reason = None
+        self.cached_verdict = False
 
         self.hdlfile = None
         self.library = None
@@ -145,6 +148,25 @@ class HdlRegressionTest:
     def get_status(self) -> TestStatus:
         return self.test_status
 
+    def set_selection_reason(self, reason) -> None:
+        """
+        Describes why the test was selected to run.
+        """
+        self.selection_reason = reason
+
+    def get_selection_reason(self) -> str:
+        return getattr(self, "selection_reason", None)
+
+    def set_cached_verdict(self, cached) -> None:
+        """
+        Set when the test passed with the same inputs in a previous
+        run and was not simulated.
+        """
+        self.cached_verdict = cached
+
+    def get_cached_verdict(self) -> bool:
+        return getattr(self, "cached_verdict", False)
+
     # -------- test connections ---------------
 
     def set_tb(self, tb) -> None:
@@ -221,6 +243,26 @@ class HdlRegressionTest:
     def get_testcase_name(self) -> str:
         pass
 
+    def get_duration_key(self) -> str:
+        """
+        Returns a key identifying this test across regression runs,
+        i.e. library, entity, architecture, testcase and generics.
+        """
+        return "{} {}".format(self.get_testcase_name(), self.get_gc_str()).strip()
+
+    def get_duration_group_key(self) -> str:
+        """
+        Returns a key shared by all tests of the same testbench,
+        used for estimating the duration of tests not run before.
+        """
+        return self.get_testcase_name()
+
+    def set_sim_time(self, sim_time) -> None:
+        self.sim_time = sim_time
+
+    def get_sim_time(self) -> int:
+        return self.sim_time
+
     def get_sim_options(self) -> str:
         return self.settings.get_sim_options()
 
@@ -330,6 +372,11 @@ class VHDLTest(HdlRegressionTest):
             testcase_name += "." + self.get_tc()
         return testcase_name
 
+    def get_duration_group_key(self) -> str:
+        return "{}:{}.{}".format(
+            self.get_library().get_name(), self.get_name(), self.get_arch().get_name()
+        )
+
 
 class VerilogTest(HdlRegressionTest):
     def __init__(self, tb=None, tc=None, gc=[], settings=None):
@@ -351,6 +398,14 @@ class VerilogTest(HdlRegressionTest):
 
         return testcase_name
 
+    def get_duration_key(self) -> str:
+        return "{}:{}".format(
+            self.get_library().get_name(), super().get_duration_key()
+        )
+
+    def get_duration_group_key(self) -> str:
+        return "{}:{}".format(self.get_library().get_name(), self.get_name())
+
     def set_tc(self, tc) -> None:
         self.tc = tc
 
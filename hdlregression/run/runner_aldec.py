@@ -26,6 +26,7 @@ from ..scan.hdl_regex_pkg import RE_RIVIERA_WARNING, RE_RIVIERA_ERROR, RE_ACTIVE
 class RivieraRunner(SimRunner):
 
     SIMULATOR_NAME = "RIVIERA-PRO"
+    SIMULATOR_VERSION_CALL = ("vsimsa", "-version")
 
     def __init__(self, project):
         super().__init__(project)
@@ -103,8 +104,6 @@ class RivieraRunner(SimRunner):
         Returns:
           'HDLLibrary' (obj): an object if compile was OK, None if not.
         """
-        compile_ok = True
-
         libraries_path = os.path.join(
             self.project.settings.get_sim_path(),
             self.project.settings.get_output_path(),
@@ -120,26 +119,37 @@ class RivieraRunner(SimRunner):
         vlib_exec = self._get_simulator_executable("vlib")
 
         # Make library mapping if it does not exist.
-        if not os.path.isdir(library_compile_path):
-            os.makedirs(library_compile_path, exist_ok=True)
-            self._run_cmd(command=[vlib_exec, library_compile_path], path=libraries_path)
-        self._run_cmd(command=[vmap_exec, library.get_name(), library_compile_path], path=libraries_path)
-
-        # Loop every file object in the library and compile it.
-        for hdlfile in library.get_compile_order_list():
-            if hdlfile.get_is_netlist():
-                continue
-
-            if hdlfile.get_need_compile() or force_compile:
-                self.logger.debug("Recompiling file: {}".format(hdlfile.get_name()))
-
-                success = self._run_cmd(
-                    command=self._get_compile_call(hdlfile), path=libraries_path
-                )
-                if success is False:
-                    compile_ok = False
-                else:
-                    hdlfile.update_compile_time()
+        # Library mapping updates the shared library.cfg
+        with self.library_setup_lock:
+            if not os.path.isdir(library_compile_path):
+                os.makedirs(library_compile_path, exist_ok=True)
+                self._run_cmd(command=[vlib_exec, library_compile_path], path=libraries_path)
+            self._run_cmd(command=[vmap_exec, library.get_name(), library_compile_path], path=libraries_path)
+
+        def compile_hdlfile(hdlfile) -> bool:
+            self.logger.debug("Recompiling file: {}".format(hdlfile.get_name()))
+
+            success = self._run_cmd(
+                command=self._get_compile_call(hdlfile), path=libraries_path
+            )
+            if success is False:
+                return False
+            hdlfile.update_compile_time()
+            return True
+
+        # Compile every file object in the library that needs it.
+        hdlfile_list = [
+            hdlfile
+            for hdlfile in library.get_compile_order_list()
+            if not hdlfile.get_is_netlist()
+            and (hdlfile.get_need_compile() or force_compile)
+        ]
+        if self.project.settings.get_compile_batch():
+            compile_ok = self._compile_hdlfiles_in_batches(
+                hdlfile_list, self._get_compile_call, compile_hdlfile, libraries_path
+            )
+        else:
+            compile_ok = self._compile_hdlfiles_in_order(hdlfile_list, compile_hdlfile)
 
         if compile_ok:
             return library
@@ -211,14 +221,25 @@ class RivieraRunner(SimRunner):
             ""
         ).strip()
 
+        # Simulator workers end the simulation instead of exiting.
+        # Loading and ending the design set the status reported by the
+        # worker.
+        if self._get_use_simulator_workers():
+            vsim_call = self._get_worker_load_call(vsim_call)
+            onerror_call = "onerror {resume}"
+            exit_call = self._get_worker_exit_call("endsim")
+        else:
+            onerror_call = "onerror {quit -code 1}"
+            exit_call = "exit"
+
         lines = [
             "vmap -link ../../../library",
             vsim_call,
-            "onerror {quit -code 1}",
+            onerror_call,
             "onbreak {resume}",
             pre_sim_tcl_command,
             "run -all",
-            "exit"
+            exit_call
         ]
         return "\n".join(lines)
 
@@ -238,12 +259,18 @@ class RivieraRunner(SimRunner):
         """
         Runs the run.do file that starts the simulations.
         """
+        if self._get_use_simulator_workers():
+            return self._simulate_on_worker(test)
+
         sim_exec = self._get_simulator_executable("vsim")
         command = [sim_exec, "-c", "-do", "do run.do"]
 
         success = self._run_cmd(command=command, path=test.get_test_path(), test=test)
         return success
 
+    def _get_simulator_worker_command(self) -> list:
+        return [self._get_simulator_executable("vsimsa")]
+
     def _get_module_call(self, test, architecture_name):
         lib_name = test.get_library().get_name()
         return "-lib {} {} {}".format(lib_name, test.get_name(), architecture_name)
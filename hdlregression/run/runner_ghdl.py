@@ -14,14 +14,20 @@
 #
 
 import os
+import subprocess
 
 from .sim_runner import SimRunner
 from ..report.logger import Logger
-from ..scan.hdl_regex_pkg import RE_GHDL_WARNING, RE_GHDL_ERROR
+from ..scan.hdl_regex_pkg import (
+    RE_GHDL_WARNING,
+    RE_GHDL_ERROR,
+    RE_GHDL_CODE_GENERATOR,
+)
 
 
 class GHDLRunner(SimRunner):
     SIMULATOR_NAME = "GHDL"
+    SIMULATOR_VERSION_CALL = ("ghdl", "--version")
 
     # The analyze command, -a :
     #   - analyzes/compiles one or more files, and creates an object file for each source file.
@@ -33,10 +39,16 @@ class GHDLRunner(SimRunner):
 
     # The elaborate and run command, --elab-run, elaborates and runs a unit.
 
+    # With the elaboration cache enabled each testbench is elaborated (-e)
+    # once into an executable, which is run directly for every testcase
+    # and generic combination. Requires the LLVM or GCC backend, the mcode
+    # backend does not produce an executable.
+
     def __init__(self, project):
         super().__init__(project)
         self.logger = Logger(name=__name__, project=project)
         self.project = project
+        self.backend = None
 
     @classmethod
     def _is_simulator(cls, simulator) -> bool:
@@ -60,6 +72,52 @@ class GHDLRunner(SimRunner):
     def _get_simulator_warning_regex(self):
         return RE_GHDL_WARNING
 
+    def _get_backend(self) -> str:
+        """
+        Returns the GHDL code generator backend, i.e. mcode, llvm or gcc,
+        as set with the ghdl_backend option or from the code generator
+        line of ghdl --version.
+        """
+        if self.project.settings.get_ghdl_backend():
+            return self.project.settings.get_ghdl_backend().lower()
+
+        if self.backend is None:
+            self.backend = "mcode"
+            try:
+                result = subprocess.run(
+                    [self._get_simulator_executable(self.SIMULATOR_NAME), "--version"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    universal_newlines=True,
+                )
+                backend = self._get_backend_from_version(result.stdout)
+                if backend:
+                    self.backend = backend
+                else:
+                    self.logger.debug("GHDL code generator not found, using mcode.")
+            except (OSError, subprocess.SubprocessError) as error:
+                self.logger.debug("Unable to detect GHDL backend: {}".format(error))
+        return self.backend
+
+    @staticmethod
+    def _get_backend_from_version(version_str) -> str:
+        """
+        Returns the backend in the code generator line of ghdl --version,
+        e.g. " llvm 14.0.6 code generator", None if not found.
+        """
+        code_generator = RE_GHDL_CODE_GENERATOR.search(version_str)
+        return code_generator.group(1).lower() if code_generator else None
+
+    def _get_use_elaboration_cache(self) -> bool:
+        if not self.project.settings.get_elaboration_cache():
+            return False
+        if self._get_backend() == "mcode":
+            self.logger.debug(
+                "GHDL mcode backend does not create executables, elaboration cache disabled."
+            )
+            return False
+        return True
+
     def _get_simulator_call(
         self,
         hdlfile=None,
@@ -67,12 +125,16 @@ class GHDLRunner(SimRunner):
         elab_run=False,
         generic_call=None,
         module_call=None,
+        elab_only=False,
+        elab_output=None,
     ) -> list:
         """
         Get a call for the GHDL simulator.
         Typically a HDLFILE object is used for analyze (-a),
         while a MODULE object with the elab_run parameter are used for
         elaboration (-e) and running simulations (-r).
+        A MODULE object with the elab_only parameter elaborates the
+        module into the elab_output executable.
 
         Returns:
             return_list(list): a list with simulator command to be used
@@ -82,7 +144,10 @@ class GHDLRunner(SimRunner):
 
         ghdl_executable = self._get_simulator_executable(self.SIMULATOR_NAME)
         return_list = [ghdl_executable]
-        return_list.append("--elab-run" if elab_run else "-a")
+        if elab_only:
+            return_list.append("-e")
+        else:
+            return_list.append("--elab-run" if elab_run else "-a")
 
         hdl_version = self._convert_hdl_version(hdlfile.get_hdl_version())
 
@@ -105,31 +170,83 @@ class GHDLRunner(SimRunner):
             "-P{}/".format(output_path),
         ]
 
+        if elab_only:
+            return_list += ["-o", elab_output]
+
         if module:
             return_list.append(module.get_name())
         else:
             return_list.append(hdlfile.get_filename_with_path())
 
-        if elab_run:
+        if elab_only:
+            if module_call:
+                return_list.append(module_call)
+
+        elif elab_run:
             if module_call:
                 return_list.append(module_call)
             if generic_call:
                 return_list += generic_call.split(" ")
 
-            if self.project.settings.get_gui_mode():
-                wave_file_format = (
-                    self.project.settings.get_simulator_wave_file_format()
-                )
-                self.project.settings.add_sim_options(
-                    "--{}=sim.{}".format(wave_file_format, wave_file_format),
-                    warning=False,
-                )
-
-            for opt in self.project.settings.get_sim_options():
-                return_list.append(opt)
+            return_list += self._get_runtime_call()
 
         return return_list
 
+    def _get_runtime_call(self) -> list:
+        """
+        Returns the run options passed on to the simulation.
+        """
+        if self.project.settings.get_gui_mode():
+            wave_file_format = self.project.settings.get_simulator_wave_file_format()
+            self.project.settings.add_sim_options(
+                "--{}=sim.{}".format(wave_file_format, wave_file_format),
+                warning=False,
+            )
+        return list(self.project.settings.get_sim_options())
+
+    def _get_elaborated_executable(self, test, module_call) -> str:
+        """
+        Elaborates the test module into an executable, unless an
+        executable elaborated from the same dependency files and
+        options exists.
+
+        Returns:
+            executable(str): executable path, None if elaboration failed.
+        """
+        library_name = test.get_library().get_name()
+        exe_name = test.get_name()
+        if module_call:
+            exe_name += "-" + module_call
+        elab_path = os.path.join(
+            os.path.abspath(self.project.settings.get_elaboration_path()),
+            self.SIMULATOR_NAME.lower(),
+            library_name,
+        )
+        executable = os.path.join(elab_path, exe_name.lower())
+        hash_file = executable + ".hash"
+
+        cmd = self._get_simulator_call(
+            module=test.get_tb(),
+            module_call=module_call,
+            elab_only=True,
+            elab_output=executable,
+        )
+        elab_hash = self._get_elaboration_hash(test, cmd)
+
+        with self._get_elaboration_lock(executable):
+            if os.path.isfile(executable) and (
+                self._get_cached_elaboration_hash(hash_file) == elab_hash
+            ):
+                self.logger.debug("Using elaborated executable: {}".format(executable))
+                return executable
+
+            self.logger.debug("Elaborating: {}".format(executable))
+            os.makedirs(elab_path, exist_ok=True)
+            if not self._run_cmd(command=cmd, path=elab_path, test=test):
+                return None
+            self._set_cached_elaboration_hash(hash_file, elab_hash)
+        return executable
+
     def _compile_library(self, library, force_compile=False) -> "HDLLibrary":
         """
         Get all libraries and compile every file in each.
@@ -138,18 +255,35 @@ class GHDLRunner(SimRunner):
             success(bool): True if library compilation successed.
         """
         success = True
-        # Analyze files in library
-        if library.get_need_compile() or force_compile:
-            for hdlfile in library.get_compile_order_list():
-                self.logger.debug("Recompiling file: %s" % (hdlfile.get_name()))
-                cmd = self._get_simulator_call(hdlfile=hdlfile)
-                # Call command runner in super-class
-                if not self._run_cmd(cmd):
-                    file_name = hdlfile.get_filename_with_path()
-                    self.logger.error("Failed to compile %s!" % (file_name))
-                    success = False
-                else:
-                    hdlfile.update_compile_time()
+
+        def compile_hdlfile(hdlfile) -> bool:
+            if not (hdlfile.get_need_compile() or force_compile):
+                return True
+
+            self.logger.debug("Recompiling file: %s" % (hdlfile.get_name()))
+            cmd = self._get_simulator_call(hdlfile=hdlfile)
+            # Call command runner in super-class
+            if not self._run_cmd(cmd):
+                file_name = hdlfile.get_filename_with_path()
+                self._log_output_line("error", "Failed to compile %s!" % (file_name))
+                return False
+            hdlfile.update_compile_time()
+            return True
+
+        # Analyze changed files, and files depending on them, in library
+        if self.project.settings.get_compile_batch():
+            hdlfile_list = [
+                hdlfile
+                for hdlfile in library.get_compile_order_list()
+                if hdlfile.get_need_compile() or force_compile
+            ]
+            success = self._compile_hdlfiles_in_batches(
+                hdlfile_list,
+                lambda hdlfile: self._get_simulator_call(hdlfile=hdlfile),
+                compile_hdlfile,
+            )
+        else:
+            success = self._compile_hdlfiles(library, compile_hdlfile)
 
         if success:
             return library
@@ -163,13 +297,25 @@ class GHDLRunner(SimRunner):
         self.logger.debug("Running simulations.")
         # Define a transcript file and location for simulator output
         transcript_file = os.path.join(test.get_test_path(), "transcript")
-        # Get simulator call for elaboration and run
-        cmd = self._get_simulator_call(
-            module=test.get_tb(),
-            elab_run=True,
-            generic_call=generic_call,
-            module_call=module_call,
-        )
+
+        if self._get_use_elaboration_cache():
+            executable = self._get_elaborated_executable(test, module_call)
+            if executable is None:
+                self.logger.error("Failed to elaborate %s!" % (test.get_name()))
+                return False
+            # Run the cached executable with the test generics
+            cmd = [executable]
+            if generic_call:
+                cmd += generic_call.split(" ")
+            cmd += self._get_runtime_call()
+        else:
+            # Get simulator call for elaboration and run
+            cmd = self._get_simulator_call(
+                module=test.get_tb(),
+                elab_run=True,
+                generic_call=generic_call,
+                module_call=module_call,
+            )
         # Call Runner object
         success = self._run_cmd(
             command=cmd,
@@ -26,6 +26,15 @@ from ..scan.hdl_regex_pkg import RE_MODELSIM_WARNING, RE_MODELSIM_ERROR
 class ModelsimRunner(SimRunner):
 
     SIMULATOR_NAME = "MODELSIM"
+    SIMULATOR_VERSION_CALL = ("vsim", "-version")
+
+    # Concurrent vcom/vlog calls are serialized on the library lock file
+    CONCURRENT_FILE_COMPILE = True
+
+    # With the elaboration cache enabled each testbench architecture is
+    # optimized once (vopt) into a named design in the testbench library,
+    # with floating top-level generics so every testcase and generic
+    # value loads the same optimized design.
 
     def __init__(self, project):
         super().__init__(project)
@@ -130,8 +139,6 @@ class ModelsimRunner(SimRunner):
         Returns:
           'HDLLibrary' (obj): an object if compile was OK, None if not.
         """
-        compile_ok = True
-
         libraries_path = os.path.join(
             self.project.settings.get_sim_path(),
             self.project.settings.get_output_path(),
@@ -146,20 +153,23 @@ class ModelsimRunner(SimRunner):
         vmap_exec = self._get_simulator_executable("vmap")
         vlib_exec = self._get_simulator_executable("vlib")
 
-        # Create library
-        if not os.path.isdir(library_compile_path):
-            self._run_cmd(command=[vlib_exec, library.get_name()], path=libraries_path)
+        # Library mapping updates the shared modelsim.ini
+        with self.library_setup_lock:
+            # Create library
+            if not os.path.isdir(library_compile_path):
+                self._run_cmd(
+                    command=[vlib_exec, library.get_name()], path=libraries_path
+                )
 
-        # Map library
-        self._run_cmd(
-            command=[vmap_exec, library.get_name(), library_compile_path],
-            path=libraries_path,
-        )
+            # Map library
+            self._run_cmd(
+                command=[vmap_exec, library.get_name(), library_compile_path],
+                path=libraries_path,
+            )
 
-        # Loop every file object in the library and compile it.
-        for hdlfile in library.get_compile_order_list():
+        def compile_hdlfile(hdlfile) -> bool:
             if hdlfile.get_is_netlist():
-                continue
+                return True
 
             if hdlfile.get_need_compile() or force_compile:
                 self.logger.debug("Recompiling file: %s" % (hdlfile.get_name()))
@@ -168,15 +178,122 @@ class ModelsimRunner(SimRunner):
                     command=self._get_compile_call(hdlfile), path=libraries_path
                 )
                 if success is False:
-                    compile_ok = False
+                    return False
                 else:
                     hdlfile.update_compile_time()
+            return True
+
+        # Compile every file object in the library.
+        if self.project.settings.get_compile_batch():
+            hdlfile_list = [
+                hdlfile
+                for hdlfile in library.get_compile_order_list()
+                if not hdlfile.get_is_netlist()
+                and (hdlfile.get_need_compile() or force_compile)
+            ]
+            compile_ok = self._compile_hdlfiles_in_batches(
+                hdlfile_list, self._get_compile_call, compile_hdlfile, libraries_path
+            )
+        else:
+            compile_ok = self._compile_hdlfiles(library, compile_hdlfile)
 
         if compile_ok:
             return library
         else:
             return None
 
+    # =========================================================================
+    #
+    # Optimization
+    #
+    # =========================================================================
+
+    def _get_use_optimized_design(self) -> bool:
+        """
+        Returns True if tests should load a shared vopt optimized design.
+        Code coverage and netlist timing are set up by vsim, i.e. these
+        tests are optimized by vsim as before.
+        """
+        if not self.project.settings.get_elaboration_cache():
+            return False
+        if self.project.hdlcodecoverage.get_code_coverage_file():
+            return False
+        if self._get_netlist_call():
+            return False
+        return True
+
+    @staticmethod
+    def _get_optimized_design_name(test) -> str:
+        name = test.get_name()
+        if test.get_is_vhdl():
+            name += "_" + test.get_arch().get_name()
+        return "{}_opt".format(name).lower()
+
+    def _get_optimize_call(self, test, module_call) -> list:
+        """
+        Returns a vopt call creating a named optimized design of the
+        testbench, with floating generics for the testbench.
+        """
+        vopt_exec = self._get_simulator_executable("vopt")
+        return_list = [
+            vopt_exec,
+            "-modelsimini",
+            self._get_modelsim_ini_path(),
+            "-work",
+            test.get_library().get_name(),
+            module_call,
+            "-o",
+            self._get_optimized_design_name(test),
+            "-floatgenerics+{}.".format(test.get_name()),
+        ]
+        if self.project.settings.get_wlf_dump_enable() is True:
+            return_list.append("+acc")
+        return_list += self.project.settings.get_elaboration_options() or []
+        return return_list
+
+    def _optimize_design(self, test, module_call) -> bool:
+        """
+        Runs vopt for the test, unless the optimized design was created
+        from the same dependency files and options.
+        """
+        libraries_path = os_adjust_path(
+            os.path.join(
+                self.project.settings.get_sim_path(),
+                self.project.settings.get_output_path(),
+                "library",
+            )
+        )
+        elab_path = os.path.join(
+            os.path.abspath(self.project.settings.get_elaboration_path()),
+            self.SIMULATOR_NAME.lower(),
+            test.get_library().get_name(),
+        )
+        hash_file = os.path.join(
+            elab_path, "{}.hash".format(self._get_optimized_design_name(test))
+        )
+
+        cmd = self._get_optimize_call(test, module_call)
+        elab_hash = self._get_elaboration_hash(test, cmd)
+
+        with self._get_elaboration_lock(hash_file):
+            if self._get_cached_elaboration_hash(hash_file) == elab_hash:
+                self.logger.debug(
+                    "Using optimized design: {}".format(
+                        self._get_optimized_design_name(test)
+                    )
+                )
+                return True
+
+            self.logger.debug(
+                "Optimizing: {}".format(self._get_optimized_design_name(test))
+            )
+            os.makedirs(elab_path, exist_ok=True)
+            if not self._run_cmd(command=cmd, path=libraries_path, test=test):
+                self.logger.error("Failed to optimize %s!" % (module_call))
+                return False
+            self._set_cached_elaboration_hash(hash_file, elab_hash)
+        return True
+
     # =========================================================================
     #
     # Simulations
@@ -237,6 +354,12 @@ class ModelsimRunner(SimRunner):
         """
         modelsim_ini = self._get_modelsim_ini_path()
 
+        # Load the shared optimized design
+        if self._get_use_optimized_design():
+            module_call = "{}.{}".format(
+                test.get_library().get_name(), self._get_optimized_design_name(test)
+            )
+
         code_coverage_file = self.project.hdlcodecoverage.get_code_coverage_file()
 
         if code_coverage_file:
@@ -271,18 +394,40 @@ class ModelsimRunner(SimRunner):
             wlf_logging = ""
             wlf_save_call = ""
 
-        # Command should not include path
-        return " ".join(
+        # Simulator workers must survive the test: finish stops the
+        # simulation, errors are checked from the output and the design
+        # is unloaded instead of exiting the simulator. Loading and
+        # unloading the design set the status reported by the worker.
+        if self._get_use_simulator_workers():
+            onfinish_call = "-onfinish stop"
+            onerror_call = "onerror {resume};"
+            exit_call = self._get_worker_exit_call("quit -sim")
+        else:
+            onfinish_call = ""
+            onerror_call = "onerror {quit -code 1};"
+            exit_call = "exit"
+
+        vsim_call = " ".join(
             [
                 "vsim",
+                onfinish_call,
                 wlf_save_call,
                 generic_call,
                 module_call,
                 sim_options,
                 netlist_call,
-                code_coverage_call_enable, 
-                "-modelsimini {" + modelsim_ini + "};",
-                "onerror {quit -code 1};",
+                code_coverage_call_enable,
+                "-modelsimini {" + modelsim_ini + "}",
+            ]
+        )
+        if self._get_use_simulator_workers():
+            vsim_call = self._get_worker_load_call(vsim_call)
+
+        # Command should not include path
+        return " ".join(
+            [
+                vsim_call + ";",
+                onerror_call,
                 "onbreak {resume};",
                 wlf_logging,
                 pre_sim_tcl_command + ";",
@@ -290,7 +435,7 @@ class ModelsimRunner(SimRunner):
                 "-all;",
                 code_coverage_call_save,
                 code_coverage_set_testname,
-                "exit",
+                exit_call,
             ]
         )
 
@@ -311,12 +456,22 @@ class ModelsimRunner(SimRunner):
         """
         Runs the run.do file that starts the simulations.
         """
+        if self._get_use_optimized_design():
+            if not self._optimize_design(test, module_call):
+                return False
+
+        if self._get_use_simulator_workers():
+            return self._simulate_on_worker(test)
+
         sim_exec = self._get_simulator_executable("vsim")
         command = [sim_exec, "-c", "-do", "do run.do"]
 
         success = self._run_cmd(command=command, path=test.get_test_path(), test=test)
         return success
 
+    def _get_simulator_worker_command(self) -> list:
+        return [self._get_simulator_executable("vsim"), "-c"]
+
     def _get_module_call(self, test, architecture_name):
         lib_name = test.get_library().get_name()
         if test.get_is_vhdl():
@@ -14,6 +14,8 @@
 #
 
 import os
+import shutil
+import hashlib
 
 from .sim_runner import SimRunner
 from ..report.logger import Logger
@@ -23,6 +25,19 @@ import wave
 
 class NVCRunner(SimRunner):
     SIMULATOR_NAME = "NVC"
+    SIMULATOR_VERSION_CALL = ("nvc", "--version")
+
+    # NVC locks the work library while analysing a file
+    CONCURRENT_FILE_COMPILE = True
+
+    # NVC elaborates (-e) a design into the work library. With the
+    # elaboration cache enabled the elaborated design is saved and
+    # reused by later tests with identical dependencies, elaboration
+    # options and generics, i.e. only the run (-r) step is executed.
+    # Each elaborated snapshot is saved in its own copy of the work
+    # library, so tests of the same testbench run concurrently.
+
+    JIT_ELABORATION_OPTIONS = ["--jit", "--no-save"]
 
     def __init__(self, project):
         super().__init__(project)
@@ -58,12 +73,19 @@ class NVCRunner(SimRunner):
         elab_run=False,
         generic_call=None,
         module_call=None,
+        elab_options=None,
+        elab_only=False,
+        run_only=False,
+        work_path=None,
     ) -> list:
         """
         Get a call for the simulator.
         Typically a HDLFILE object is used for analyze (-a),
         while a MODULE object with the elab_run parameter are used for
         elaboration (-e) and running simulations (-r).
+        The elab_only and run_only parameters split elaboration and
+        running of a MODULE object into separate calls, work_path
+        replaces the work library, e.g. with an elaborated snapshot.
 
         Returns:
             return_list(list): a list with simulator command to be used
@@ -76,32 +98,40 @@ class NVCRunner(SimRunner):
 
         hdl_version = self._convert_hdl_version(hdlfile.get_hdl_version())
 
-        output_path = os.path.join(
-            self.project.settings.get_sim_path(),
-            self.project.settings.get_output_path(),
-            "library",
-        )
+        output_path = self._get_library_output_path()
         library_name = hdlfile.get_library().get_name()
-        library_compile_path = os.path.join(output_path, library_name)
+        if work_path is None:
+            work_path = os.path.join(output_path, library_name)
 
         return_list += [
             "-L{}".format(output_path),
-            "--work={}:{}".format(library_name, library_compile_path),
+            "--work={}:{}".format(library_name, work_path),
             "--std={}".format(hdl_version),
         ]
 
         for glob_opt in self.project.settings.get_global_options():
             return_list.append(glob_opt)
 
-        if elab_run:
-            for elab_opt in self.project.settings.get_elaboration_options():
-                return_list.append(elab_opt)
+        if elab_run or elab_only or run_only:
+            if elab_options is None:
+                elab_options = self.project.settings.get_elaboration_options()
 
-            if module_call:
-                return_list.append(module_call)
-            if generic_call:
-                return_list += generic_call.split(" ")
+            if not run_only:
+                for elab_opt in elab_options:
+                    return_list.append(elab_opt)
+
+                if module_call:
+                    return_list.append(module_call)
+                if generic_call:
+                    return_list += generic_call.split(" ")
+
+        if elab_only:
+            return return_list
+
+        if elab_run or run_only:
             return_list.append("-r")
+            if run_only and module_call:
+                return_list.append(module_call)
 
             if self.project.settings.get_gui_mode():
                 wave_file_format = (
@@ -126,6 +156,13 @@ class NVCRunner(SimRunner):
 
         return return_list
 
+    def _get_library_output_path(self) -> str:
+        return os.path.join(
+            self.project.settings.get_sim_path(),
+            self.project.settings.get_output_path(),
+            "library",
+        )
+
     def _compile_library(self, library, force_compile=False) -> "HDLLibrary":
         """
         Get all libraries and compile every file in each.
@@ -134,18 +171,35 @@ class NVCRunner(SimRunner):
             success(bool): True if library compilation successed.
         """
         success = True
-        # Analyze files in library
-        if library.get_need_compile() or force_compile:
-            for hdlfile in library.get_compile_order_list():
-                self.logger.debug("Recompiling file: %s" % (hdlfile.get_name()))
-                cmd = self._get_simulator_call(hdlfile=hdlfile)
-                # Call command runner in super-class
-                if not self._run_cmd(cmd):
-                    file_name = hdlfile.get_filename_with_path()
-                    self.logger.error("Failed to compile %s!" % (file_name))
-                    success = False
-                else:
-                    hdlfile.update_compile_time()
+
+        def compile_hdlfile(hdlfile) -> bool:
+            if not (hdlfile.get_need_compile() or force_compile):
+                return True
+
+            self.logger.debug("Recompiling file: %s" % (hdlfile.get_name()))
+            cmd = self._get_simulator_call(hdlfile=hdlfile)
+            # Call command runner in super-class
+            if not self._run_cmd(cmd):
+                file_name = hdlfile.get_filename_with_path()
+                self._log_output_line("error", "Failed to compile %s!" % (file_name))
+                return False
+            hdlfile.update_compile_time()
+            return True
+
+        # Analyze changed files, and files depending on them, in library
+        if self.project.settings.get_compile_batch():
+            hdlfile_list = [
+                hdlfile
+                for hdlfile in library.get_compile_order_list()
+                if hdlfile.get_need_compile() or force_compile
+            ]
+            success = self._compile_hdlfiles_in_batches(
+                hdlfile_list,
+                lambda hdlfile: self._get_simulator_call(hdlfile=hdlfile),
+                compile_hdlfile,
+            )
+        else:
+            success = self._compile_hdlfiles(library, compile_hdlfile)
 
         if success:
             return library
@@ -160,6 +214,11 @@ class NVCRunner(SimRunner):
         # Define a transcript file and location for simulator output
         transcript_file = os.path.join(test.get_test_path(), "transcript")
 
+        if self._get_use_elaboration_cache(test):
+            return self._simulate_with_elaboration_cache(
+                test, generic_call, module_call, transcript_file
+            )
+
         # Get simulator call for elaboration and run
         cmd = self._get_simulator_call(
             module=test.get_tb(),
@@ -176,6 +235,155 @@ class NVCRunner(SimRunner):
         )
         return success
 
+    def _get_use_elaboration_cache(self, test) -> bool:
+        """
+        Short tests are run using JIT elaboration when a JIT time limit
+        is set, as saving the elaborated design costs more than running it.
+        """
+        if not self.project.settings.get_elaboration_cache():
+            return False
+
+        jit_time_limit = self.project.settings.get_jit_time_limit()
+        if jit_time_limit is not None:
+            duration = self.project.settings.get_test_duration(
+                test.get_duration_key()
+            )
+            if duration is not None and duration < jit_time_limit * 1000:
+                self.logger.debug(
+                    "Using JIT elaboration for short test: {}".format(
+                        test.get_duration_key()
+                    )
+                )
+                return False
+        return True
+
+    def _get_cached_elaboration_options(self) -> list:
+        """
+        Elaboration options with JIT and no-save removed, i.e. the
+        elaborated design is code generated and saved in the library.
+        """
+        return [
+            elab_opt
+            for elab_opt in self.project.settings.get_elaboration_options()
+            if elab_opt not in self.JIT_ELABORATION_OPTIONS
+        ]
+
+    def _simulate_with_elaboration_cache(
+        self, test, generic_call, module_call, transcript_file
+    ) -> bool:
+        """
+        Run the elaborated snapshot matching the test dependencies,
+        elaboration options and generics, elaborate it if not saved.
+        """
+        work_path = self._get_elaborated_snapshot(test, generic_call, module_call)
+        if work_path is None:
+            self.logger.error("Failed to elaborate %s!" % (module_call))
+            return False
+
+        run_cmd = self._get_simulator_call(
+            module=test.get_tb(),
+            module_call=module_call,
+            run_only=True,
+            work_path=work_path,
+        )
+        return self._run_cmd(
+            command=run_cmd,
+            path=test.get_test_path(),
+            output_file=transcript_file,
+            test=test,
+        )
+
+    def _get_elaborated_snapshot(self, test, generic_call, module_call) -> str:
+        """
+        Returns the work library of the snapshot elaborated from the test
+        dependencies, elaboration options and generics. The snapshot is
+        elaborated in a copy of the work library if not already saved.
+        Snapshots elaborated from other dependencies are outdated and
+        removed.
+
+        Returns:
+            work_path(str): snapshot work library, None if elaboration failed.
+        """
+        elab_options = self._get_cached_elaboration_options()
+
+        def get_elab_cmd(work_path=None) -> list:
+            return self._get_simulator_call(
+                module=test.get_tb(),
+                generic_call=generic_call,
+                module_call=module_call,
+                elab_options=elab_options,
+                elab_only=True,
+                work_path=work_path,
+            )
+
+        closure_hash = self._get_elaboration_hash(test, [])
+        options_hash = hashlib.sha256(" ".join(get_elab_cmd()).encode()).hexdigest()
+
+        library_name = test.get_library().get_name()
+        module_path = os.path.join(
+            os.path.abspath(self.project.settings.get_elaboration_path()),
+            self.SIMULATOR_NAME.lower(),
+            library_name,
+            module_call.lower(),
+        )
+        closure_path = os.path.join(module_path, closure_hash[:16])
+        snapshot_path = os.path.join(closure_path, options_hash[:16])
+        work_path = os.path.join(snapshot_path, library_name)
+        hash_file = os.path.join(snapshot_path, "snapshot.hash")
+
+        # The lock is released before the snapshot is run
+        with self._get_elaboration_lock(snapshot_path):
+            if self._get_cached_elaboration_hash(hash_file) == closure_hash + options_hash:
+                self.logger.debug("Using elaborated design: {}".format(snapshot_path))
+                return work_path
+
+            # Tests in this run have the same dependencies, i.e. snapshots
+            # of other dependencies are not in use
+            with self._get_elaboration_lock(module_path):
+                if os.path.isdir(module_path):
+                    for name in os.listdir(module_path):
+                        if name != closure_hash[:16]:
+                            shutil.rmtree(
+                                os.path.join(module_path, name), ignore_errors=True
+                            )
+
+            self.logger.debug("Elaborating: {}".format(snapshot_path))
+            shutil.rmtree(snapshot_path, ignore_errors=True)
+            try:
+                shutil.copytree(
+                    os.path.join(self._get_library_output_path(), library_name),
+                    work_path,
+                    copy_function=self._link_library_file,
+                )
+            except (OSError, shutil.Error) as error:
+                self.logger.warning(
+                    "Unable to copy library {}: {}".format(library_name, error)
+                )
+                return None
+
+            if not self._run_cmd(
+                command=get_elab_cmd(work_path), path=test.get_test_path(), test=test
+            ):
+                return None
+            self._set_cached_elaboration_hash(hash_file, closure_hash + options_hash)
+        return work_path
+
+    @staticmethod
+    def _link_library_file(src, dst) -> str:
+        """
+        Hard links an analysed unit into a snapshot library, as
+        elaboration only adds files to the library. The library index
+        is copied, and files are copied if they can not be linked, e.g.
+        when on another file system.
+        """
+        if not os.path.basename(src).startswith("_NVC_LIB"):
+            try:
+                os.link(src, dst)
+                return dst
+            except OSError:
+                pass
+        return shutil.copy2(src, dst)
+
     def _get_module_call(self, test, architecture_name):
         return "{}-{}".format(test.get_name(), architecture_name)
 
@@ -17,17 +17,24 @@ import os
 import re
 import time
 import shutil
+import hashlib
+import subprocess
 from abc import abstractmethod
-from threading import Thread
+from threading import Thread, Lock, Event, local
 from queue import Queue
+from multiprocessing.pool import ThreadPool
 from shutil import copytree
 
 from .testbuilder import TestBuilder
 from ..construct.hdl_modules_pkg import *
 from .cmd_runner import CommandRunner
+from .sim_worker import SimulatorWorker, SimulatorWorkerPool
+from .compile_cache import CompileCache
 from ..report.logger import Logger
 from ..hdlregression_pkg import convert_from_millisec
 from ..hdlregression_pkg import os_adjust_path
+from ..hdlregression_pkg import mark_dependent_files_for_compile
+from ..hdlregression_pkg import sort_libraries_by_dependency
 from .hdltests import VHDLTest, VerilogTest, TestStatus
 from ..construct.hdlfile import VHDLFile, VerilogFile
 
@@ -65,6 +72,14 @@ class SimRunner:
 
     SIMULATOR_NAME = ""
 
+    # Set if the simulator can compile several files into the
+    # same library concurrently
+    CONCURRENT_FILE_COMPILE = False
+
+    # Simulator executable and argument for reporting the simulator
+    # version, used by the compile cache
+    SIMULATOR_VERSION_CALL = None
+
     def __init__(self, project):
         self.logger = Logger(name=__name__, project=project)
 
@@ -80,12 +95,60 @@ class SimRunner:
         # Test builder will create a list of test objects to run
         self.testbuilder = TestBuilder(project=project)
 
+        self._init_run_state()
+
+        # Compiled libraries shared by workspaces
+        self.compile_cache = None
+        self.simulator_version = None
+        self.library_cache_key_dict = {}
+
         # Prepare regex
         self.RE_UVVM_SUMMARY = None
         self.RE_UVVM_RESULT = None
         self.RE_USER = None
         self._compile_regex()
 
+    # Locks, threads and simulator processes of a run, not saved with
+    # the project, i.e. when libraries referring to the runner are saved
+    RUN_STATE = (
+        "elaboration_lock",
+        "elaboration_lock_dict",
+        "worker_pool",
+        "library_setup_lock",
+        "compile_report_lock",
+        "compile_output",
+        "cmd_file_lock",
+        "compile_event_dict",
+    )
+
+    def _init_run_state(self) -> None:
+        # Serialize elaboration of the same design when running threaded
+        self.elaboration_lock = Lock()
+        self.elaboration_lock_dict = {}
+
+        # Persistent simulator processes, started by simulate()
+        self.worker_pool = None
+
+        # Libraries are compiled concurrently, library mapping and
+        # terminal output are serialized
+        self.library_setup_lock = Lock()
+        self.compile_report_lock = Lock()
+        self.compile_output = local()
+        self.cmd_file_lock = Lock()
+        # Set when files and libraries have compiled, see
+        # _wait_for_compile_dependencies()
+        self.compile_event_dict = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for name in self.RUN_STATE:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        self._init_run_state()
+
     def get_simulator_name(self) -> str:
         return self.SIMULATOR_NAME
 
@@ -104,6 +167,20 @@ class SimRunner:
     def get_num_pass_with_minor_alerts_test(self) -> int:
         return len(self._get_pass_with_minor_alert_list())
 
+    def get_num_cached_pass_test(self) -> int:
+        return len(self.get_cached_pass_test_list())
+
+    def get_cached_pass_test_list(self) -> list:
+        """
+        Returns the passing tests that were not simulated, as they
+        passed with the same inputs in a previous run.
+        """
+        return [
+            test.get_test_id_string()
+            for test in self.get_test_list()
+            if test.get_status() == TestStatus.PASS and test.get_cached_verdict()
+        ]
+
     def get_num_tests_run(self) -> int:
         """
         Returns the number of all passing and
@@ -160,6 +237,221 @@ class SimRunner:
     def _compile_library(self, library, force_compile=False) -> "HDLLibrary":
         pass
 
+    def _compile_hdlfiles(self, library, compile_hdlfile) -> bool:
+        """
+        Calls compile_hdlfile(hdlfile) for the files of the library in
+        compile order. Files on the same compile level are compiled
+        concurrently if supported by the simulator.
+
+        Returns:
+            success(bool): True if all files compiled.
+        """
+        num_compile_threads = self.project.settings.get_compile_threads()
+        if self.CONCURRENT_FILE_COMPILE and num_compile_threads > 1:
+            compile_levels = library.get_compile_level_list()
+        else:
+            compile_levels = [[hdlfile] for hdlfile in library.get_compile_order_list()]
+
+        # Messages are collected for the library when compiled concurrently
+        messages = getattr(self.compile_output, "messages", None)
+
+        def compile_level_hdlfile(hdlfile) -> bool:
+            self.compile_output.messages = messages
+            try:
+                return compile_hdlfile(hdlfile)
+            finally:
+                self.compile_output.messages = None
+
+        success = True
+        for compile_level in compile_levels:
+            self._wait_for_compile_dependencies(compile_level)
+            num_threads = min(num_compile_threads, len(compile_level))
+            if num_threads > 1:
+                with ThreadPool(num_threads) as pool:
+                    results = pool.map(compile_level_hdlfile, compile_level)
+            else:
+                results = [compile_hdlfile(hdlfile) for hdlfile in compile_level]
+            self._set_compile_done(compile_level)
+            if not all(results):
+                success = False
+        return success
+
+    def _compile_hdlfiles_in_order(self, hdlfile_list, compile_hdlfile) -> bool:
+        """
+        Calls compile_hdlfile(hdlfile) for the files in order.
+
+        Returns:
+            success(bool): True if all files compiled.
+        """
+        success = True
+        for hdlfile in hdlfile_list:
+            self._wait_for_compile_dependencies([hdlfile])
+            if not compile_hdlfile(hdlfile):
+                success = False
+            self._set_compile_done([hdlfile])
+        return success
+
+    def _get_compile_dependencies(self, hdlfile) -> tuple:
+        """
+        Returns the files and libraries a file has to wait for before it
+        is compiled, i.e. the files it depends on in other libraries, and
+        the libraries it refers to without referring to any of their
+        files, e.g. a library clause only.
+        """
+        library = hdlfile.get_library()
+        dep_hdlfiles = [
+            dep_hdlfile
+            for dep_hdlfile in hdlfile.get_hdlfile_this_dep_on()
+            if dep_hdlfile.get_library() is not library
+        ]
+        dep_file_libraries = set(
+            dep_hdlfile.get_library().get_name() for dep_hdlfile in dep_hdlfiles
+        )
+        dep_libraries = set(
+            dep_library
+            for module in hdlfile.get_modules()
+            for dep_library in module.get_ext_dep()
+            if dep_library not in dep_file_libraries
+        )
+        return dep_hdlfiles, dep_libraries
+
+    def _wait_for_compile_dependencies(self, hdlfile_list) -> None:
+        """
+        Waits until the files in other libraries that the files depend
+        on have compiled, when libraries are compiled concurrently.
+        Only files and libraries earlier in compile order are waited for.
+        """
+        if not self.compile_event_dict:
+            return
+        for hdlfile in hdlfile_list:
+            (position, _) = self.compile_event_dict.get(id(hdlfile.get_library()), (None, None))
+            if position is None:
+                continue
+            (dep_hdlfiles, dep_libraries) = self._get_compile_dependencies(hdlfile)
+            dep_keys = [id(dep_hdlfile) for dep_hdlfile in dep_hdlfiles] + list(dep_libraries)
+            for key in dep_keys:
+                (dep_position, event) = self.compile_event_dict.get(key, (None, None))
+                if dep_position is not None and dep_position < position:
+                    event.wait()
+
+    def _set_compile_done(self, hdlfile_list) -> None:
+        if not self.compile_event_dict:
+            return
+        for hdlfile in hdlfile_list:
+            (_, event) = self.compile_event_dict.get(id(hdlfile), (None, None))
+            if event is not None:
+                event.set()
+
+    def _get_compile_event_dict(self, library_list) -> dict:
+        """
+        Returns a dict with the compile order position and an event for
+        each library, by library name and object id, and each file, by
+        object id.
+        """
+        compile_event_dict = {}
+        for position, library in enumerate(library_list):
+            library_event = (position, Event())
+            compile_event_dict[library.get_name()] = library_event
+            compile_event_dict[id(library)] = library_event
+            for hdlfile in library.get_hdlfile_list():
+                compile_event_dict[id(hdlfile)] = (position, Event())
+        return compile_event_dict
+
+    @staticmethod
+    def _get_compile_batches(hdlfile_list, get_compile_call) -> list:
+        """
+        Groups consecutive files with identical compile calls, apart
+        from the filename, into one compile call with all the files.
+
+        Returns:
+            batches(list): a list of (compile call, hdlfile list) tuples.
+        """
+        batches = []
+        batch_key = None
+        for hdlfile in hdlfile_list:
+            cmd = get_compile_call(hdlfile)
+            filename = os.path.basename(hdlfile.get_filename_with_path())
+            file_index = next(
+                (
+                    idx
+                    for idx in range(len(cmd) - 1, -1, -1)
+                    if os.path.basename(str(cmd[idx]).replace("\\", "/")) == filename
+                ),
+                None,
+            )
+            if file_index is None:
+                batches.append((cmd, [hdlfile]))
+                batch_key = None
+                continue
+
+            key = (tuple(cmd[:file_index]), tuple(cmd[file_index + 1 :]))
+            if batches and key == batch_key:
+                batch_cmd, batch_files = batches[-1]
+                insert_index = file_index + len(batch_files)
+                batch_cmd.insert(insert_index, cmd[file_index])
+                batch_files.append(hdlfile)
+            else:
+                batches.append((list(cmd), [hdlfile]))
+                batch_key = key
+        return batches
+
+    def _compile_hdlfiles_in_batches(
+        self, hdlfile_list, get_compile_call, compile_hdlfile, path="./"
+    ) -> bool:
+        """
+        Compiles the files in order, with consecutive files sharing
+        compile options in one compile call. The files of a failing
+        batch are compiled one by one with compile_hdlfile(hdlfile),
+        so errors are reported for the failing file.
+
+        Returns:
+            success(bool): True if all files compiled.
+        """
+        success = True
+        for cmd, batch_files in self._get_compile_batches(
+            hdlfile_list, get_compile_call
+        ):
+            self._wait_for_compile_dependencies(batch_files)
+            try:
+                if not self._compile_batch(cmd, batch_files, compile_hdlfile, path):
+                    success = False
+            finally:
+                self._set_compile_done(batch_files)
+        return success
+
+    def _compile_batch(self, cmd, batch_files, compile_hdlfile, path) -> bool:
+        """
+        Compiles the files of a batch in one compile call, or one by one
+        if the batch fails.
+
+        Returns:
+            success(bool): True if all files compiled.
+        """
+        if len(batch_files) == 1:
+            return compile_hdlfile(batch_files[0])
+
+        self.logger.debug("Compiling {} files in one call.".format(len(batch_files)))
+
+        # Keep batch messages until the batch is known to compile
+        library_messages = getattr(self.compile_output, "messages", None)
+        self.compile_output.messages = []
+        try:
+            batch_ok = self._run_cmd(command=cmd, path=path)
+            batch_messages = self.compile_output.messages
+        finally:
+            self.compile_output.messages = library_messages
+
+        if batch_ok:
+            for level, line in batch_messages:
+                self._log_output_line(level, line)
+            for hdlfile in batch_files:
+                hdlfile.update_compile_time()
+            return True
+
+        self.logger.debug("Batch failed, compiling files one by one.")
+        results = [compile_hdlfile(hdlfile) for hdlfile in batch_files]
+        return all(results)
+
     def compile_libraries(self):
         """
         Called from HDLRegression() object to:
@@ -176,46 +468,140 @@ class SimRunner:
             lib for lib in lib_container.get() if lib.get_is_precompiled() is False
         ]
 
-        # Update libraries for compile if a dependent library require compilation
+        # Libraries without a library folder are compiled in full
         for lib in regular_lib:
-            dep_lib_compiled = any(
-                dep_lib
-                for dep_lib in lib.get_lib_obj_dep()
-                if dep_lib.get_need_compile() is True
-            )
-            if dep_lib_compiled is True:
+            if self._check_if_library_path_is_missing(lib):
                 lib.set_need_compile(True)
 
+        # Update files for compile if a file they depend on require
+        # compilation, in this or in other libraries
+        mark_dependent_files_for_compile(regular_lib)
+
         success = True
 
         # Empty list of libraries compiled in this run
         self.project.settings.reset_library_compile()
 
-        # Check all libraries in project
-        for library in regular_lib:
+        # Cache keys are computed from the current library files,
+        # before any library is compiled
+        self.library_cache_key_dict = {}
+        compile_cache = self._get_compile_cache()
+        if compile_cache is not None:
+            for library in regular_lib:
+                self._get_library_cache_key(library)
+
+        def compile_library(library, threaded=False) -> bool:
             lib_path_missing = self._check_if_library_path_is_missing(library)
             compile_required = self._check_for_recompile(library, lib_path_missing)
             force_compile = self._check_for_force_compile(library, lib_path_missing)
 
-            if compile_required or force_compile:
+            if not (compile_required or force_compile):
+                return True
+
+            # Restore library from compile cache, the library is still
+            # set up, i.e. mapped, by the simulator runner.
+            use_cache = compile_cache is not None and not (
+                self.project.settings.get_force_recompile()
+                or self.project.settings.get_gui_compile_all()
+            )
+            restored_from_cache = False
+            if use_cache:
+                cache_key = self._get_library_cache_key(library)
+                if compile_cache.restore(
+                    cache_key, self._get_library_cache_folder(library)
+                ):
+                    self.logger.debug(
+                        "Restored library {} from compile cache.".format(
+                            library.get_name()
+                        )
+                    )
+                    library.set_need_compile(False)
+                    for hdlfile in library.get_hdlfile_list():
+                        hdlfile.update_compile_time()
+                    force_compile = False
+                    restored_from_cache = True
+
+            if threaded:
+                # Collect messages and report the library when done
+                self.compile_output.messages = []
+                compiled_library = self._compile_library(
+                    library=library, force_compile=force_compile
+                )
+                messages = self.compile_output.messages
+                self.compile_output.messages = None
+            else:
                 self.logger.info(
                     "Compiling library: {}".format(library.get_name()), end=" "
                 )
                 compiled_library = self._compile_library(
                     library=library, force_compile=force_compile
                 )
+                messages = []
+
+            if compiled_library and use_cache and not restored_from_cache:
+                compile_cache.store(cache_key, self._get_library_cache_folder(library))
+
+            with self.compile_report_lock:
+                if threaded:
+                    self.logger.info(
+                        "Compiling library: {}".format(library.get_name()), end=" "
+                    )
+                    for level, line in messages:
+                        getattr(self.logger, level)(line)
 
                 if not compiled_library:
                     self.logger.info(" - FAIL - ", end="\n", color="red")
-                    success = False
-                    library.set_need_compile(True)
                     self.project.settings.set_return_code(1)
+                    return False
                 else:
                     self.logger.info(" - OK - ", end="\n", color="green")
                     library.set_need_compile(False)
                     # Update list of libraries compiled in this run
                     self.project.settings.add_library_compile(library)
                     self.project._get_library_container().update(compiled_library)
+                    return True
+
+        (waves, cycle) = sort_libraries_by_dependency(regular_lib)
+        compile_threads = self.project.settings.get_compile_threads()
+        if compile_threads > 1 and len(regular_lib) > 1 and not cycle:
+            # Libraries are started in dependency order and each file
+            # waits only for the files it depends on in other libraries
+            library_list = [library for wave in waves for library in wave]
+            self.compile_event_dict = self._get_compile_event_dict(library_list)
+
+            def compile_library_and_set_done(library) -> bool:
+                try:
+                    return compile_library(library, threaded=True)
+                finally:
+                    self._set_compile_done(library.get_hdlfile_list())
+                    self.compile_event_dict[library.get_name()][1].set()
+
+            num_compile_threads = min(compile_threads, len(library_list))
+            try:
+                with ThreadPool(num_compile_threads) as pool:
+                    results = pool.map(
+                        compile_library_and_set_done, library_list, chunksize=1
+                    )
+            finally:
+                self.compile_event_dict = None
+            if not all(results):
+                success = False
+            waves = []
+
+        # Libraries in the same wave do not depend on each other
+        for wave in waves:
+            num_compile_threads = min(
+                self.project.settings.get_compile_threads(), len(wave)
+            )
+            if num_compile_threads > 1:
+                with ThreadPool(num_compile_threads) as pool:
+                    results = pool.map(
+                        lambda library: compile_library(library, threaded=True), wave
+                    )
+            else:
+                results = [compile_library(library) for library in wave]
+            if not all(results):
+                success = False
 
         # Update settings with the compilation time
         if success:
@@ -278,11 +664,15 @@ class SimRunner:
                 )
             )
 
-            # create test queue for threads to operate with
+            # create test queue for threads to operate with,
+            # longest running tests are started first
             test_queue = Queue()
-            for test in self.get_test_list():
+            for test in self._order_tests_by_duration(self.get_test_list()):
                 test_queue.put(test)
 
+            # one simulator worker per thread when enabled
+            self._start_worker_pool(num_threads)
+
             # run threads
             for _ in range(num_threads):
                 thread = Thread(target=run_test, args=(test_queue,))
@@ -292,6 +682,8 @@ class SimRunner:
             # wait for test queue to finish
             test_queue.join()
 
+            self._stop_worker_pool()
+
             # Calculate and update timing
             finish_time = round(time.time() * 1000)
             elapsed_time = finish_time - start_time
@@ -357,7 +749,11 @@ class SimRunner:
 
     def _check_for_recompile(self, library, lib_path_missing) -> bool:
         # Check if library compile is needed
-        compile_required = lib_path_missing or library.get_need_compile()
+        compile_required = (
+            lib_path_missing
+            or library.get_need_compile()
+            or library.get_has_files_need_compile()
+        )
         return compile_required
 
     def _check_for_force_compile(self, library, lib_path_missing) -> bool:
@@ -374,6 +770,102 @@ class SimRunner:
         force_compile = True if lib_path_missing is True else force_compile
         return force_compile
 
+    # ---------------------------------------------------------
+    # Compile cache
+    # ---------------------------------------------------------
+
+    def _get_compile_cache(self) -> CompileCache:
+        """
+        Returns the compile cache, or None if not enabled.
+        """
+        cache_path = self.project.settings.get_compile_cache_path()
+        if cache_path is None:
+            return None
+        if self.compile_cache is None or self.compile_cache.path != cache_path:
+            self.compile_cache = CompileCache(
+                cache_path,
+                self.project.settings.get_compile_cache_size(),
+                project=self.project,
+            )
+        return self.compile_cache
+
+    def _get_simulator_version(self) -> str:
+        """
+        Returns the first line reported by the simulator version call.
+        """
+        if self.simulator_version is None:
+            self.simulator_version = ""
+            if self.SIMULATOR_VERSION_CALL:
+                sim_exec, version_arg = self.SIMULATOR_VERSION_CALL
+                try:
+                    result = subprocess.run(
+                        [self._get_simulator_executable(sim_exec), version_arg],
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        universal_newlines=True,
+                    )
+                    lines = result.stdout.strip().splitlines()
+                    self.simulator_version = lines[0].strip() if lines else ""
+                except (OSError, subprocess.SubprocessError) as error:
+                    self.logger.debug(
+                        "Unable to get simulator version: {}".format(error)
+                    )
+        return self.simulator_version
+
+    def _get_library_cache_folder(self, library) -> str:
+        """
+        Returns the folder holding the compiled library.
+        """
+        return os.path.join(
+            self.project.settings.get_output_path(), "library", library.get_name()
+        )
+
+    def _get_library_cache_key(self, library) -> str:
+        """
+        Returns a key for the compiled library, computed from the
+        content, compile options and HDL version of each file, the
+        simulator name and version, and the keys of the libraries
+        it depends on.
+        """
+        cache_key = self.library_cache_key_dict.get(library.get_name())
+        if cache_key is not None:
+            return cache_key
+
+        # Mark as visited in case of recursive library dependencies
+        self.library_cache_key_dict[library.get_name()] = library.get_name()
+
+        settings = self.project.settings
+        cc_settings = self.project.hdlcodecoverage.get_code_coverage_settings()
+        digest = hashlib.sha256()
+        key_items = [
+            self.SIMULATOR_NAME,
+            self._get_simulator_version(),
+            library.get_name(),
+            str(settings.get_global_options()),
+        ]
+        if library.get_is_precompiled():
+            key_items.append(library.get_compile_path())
+        else:
+            for hdlfile in library.get_compile_order_list():
+                key_items += [
+                    os.path.basename(hdlfile.get_filename()),
+                    hdlfile.__class__.__name__,
+                    hdlfile.get_current_digest(),
+                    str(hdlfile._get_com_options(simulator=self.SIMULATOR_NAME)),
+                    str(hdlfile.get_hdl_version()),
+                    str(hdlfile.get_code_coverage() and cc_settings),
+                ]
+            for dep_library in library.get_lib_obj_dep():
+                if dep_library is not library:
+                    key_items.append(self._get_library_cache_key(dep_library))
+
+        for item in key_items:
+            digest.update(str(item).encode())
+            digest.update(b"\0")
+        cache_key = digest.hexdigest()
+        self.library_cache_key_dict[library.get_name()] = cache_key
+        return cache_key
+
     @staticmethod
     def _divide_test_list_to_num_threads(test_list, num_threads) -> list:
         """
@@ -394,6 +886,47 @@ class SimRunner:
                 test_list += item
         return test_list
 
+    def _order_tests_by_duration(self, test_list) -> list:
+        """
+        Sorts the tests longest-first using the wall time recorded in
+        previous runs, so that long tests do not end up running alone
+        at the end of a threaded regression.
+
+        Tests without a recorded duration are estimated from the mean
+        duration of tests in the same testbench, or from the mean of
+        all recorded tests if the testbench has not been run before.
+
+        Returns
+            test_list (list) : tests ordered by expected duration.
+        """
+        durations = {}
+        group_durations = {}
+        for test in test_list:
+            duration = self.project.settings.get_test_duration(test.get_duration_key())
+            if duration is not None:
+                durations[test] = duration
+                group_durations.setdefault(test.get_duration_group_key(), []).append(
+                    duration
+                )
+
+        # Keep discovery order when nothing is known
+        if not durations:
+            return list(test_list)
+
+        all_durations = list(durations.values())
+        default_estimate = sum(all_durations) / len(all_durations)
+
+        def estimate_duration(test) -> float:
+            if test in durations:
+                return durations[test]
+            group = group_durations.get(test.get_duration_group_key())
+            if group:
+                return sum(group) / len(group)
+            return default_estimate
+
+        # Sorting is stable, i.e. equal estimates keep discovery order
+        return sorted(test_list, key=estimate_duration, reverse=True)
+
     def _get_number_of_threads(self) -> int:
         """
         Adjusts the number of threads to run simulations by
@@ -551,24 +1084,25 @@ class SimRunner:
             except IOError as e:
                 self.logger.error("Error appending to command file: {}".format(e))
 
-        if not self.cmd_file_cleaned:
-            self.cmd_file_cleaned = True
-            output_dir = self.project.settings.get_output_path()
+        if isinstance(cmd, list):
+            cmd = " ".join(map(str, cmd))
 
-            if not os.path.isdir(output_dir):
-                try:
-                    os.mkdir(output_dir)
-                except OSError as e:
-                    self.logger.error("Error creating output directory: {}".format(e))
-                    return
+        with self.cmd_file_lock:
+            if not self.cmd_file_cleaned:
+                self.cmd_file_cleaned = True
+                output_dir = self.project.settings.get_output_path()
 
-            if not create_cmd_file():
-                return
+                if not os.path.isdir(output_dir):
+                    try:
+                        os.mkdir(output_dir)
+                    except OSError as e:
+                        self.logger.error("Error creating output directory: {}".format(e))
+                        return
 
-        if isinstance(cmd, list):
-            cmd = " ".join(map(str, cmd))
+                if not create_cmd_file():
+                    return
 
-        append_cmd_to_file(cmd)
+            append_cmd_to_file(cmd)
 
     def _get_error_detection_str(self) -> str:
         return ""
@@ -588,21 +1122,6 @@ class SimRunner:
         Returns:
             bool: True if command was successful, else False
         """
-
-        def check_has_line_warning(line) -> bool:
-            return bool(re.search(self._get_simulator_warning_regex(), line))
-
-        def check_has_line_error(line) -> bool:
-            return bool(re.search(self._get_simulator_error_regex(), line))
-
-        def show_errors_and_warnings() -> tuple:
-            # override or compilation
-            if self.project.settings.get_show_err_warn_output() is True or test is None:
-                return True
-            # simulation
-            else:
-                return False
-
         # Write command to file
         self._save_cmd(command)
 
@@ -613,29 +1132,61 @@ class SimRunner:
 
         success = True
 
-        show_sim_errors_and_warnings = show_errors_and_warnings()
+        show_sim_errors_and_warnings = self._get_show_errors_and_warnings(test)
 
         for line, success in cmd_runner.run(
             command=command, path=path, env=self.env_var, output_file=output_file
         ):
-            line = line.strip()
+            self._handle_output_line(test, line, success, show_sim_errors_and_warnings)
+
+        return success
 
-            # Sim output direction
-            self._output_handler(test, line)
+    def _get_show_errors_and_warnings(self, test) -> bool:
+        # override or compilation
+        if self.project.settings.get_show_err_warn_output() is True or test is None:
+            return True
+        # simulation
+        else:
+            return False
 
-            if check_has_line_error(line) is True or not success:
-                if show_sim_errors_and_warnings is True:
-                    self.logger.error(line)
-                if test is not None:
-                    test.inc_num_sim_errors()
+    def _handle_output_line(self, test, line, success, show_errors_and_warnings):
+        """
+        Directs an output line and counts simulator errors and warnings.
+        """
 
-            if check_has_line_warning(line) is True:
-                if show_sim_errors_and_warnings is True:
-                    self.logger.warning(line)
-                if test is not None:
-                    test.inc_num_sim_warnings()
+        def check_has_line_warning(line) -> bool:
+            return bool(re.search(self._get_simulator_warning_regex(), line))
 
-        return success
+        def check_has_line_error(line) -> bool:
+            return bool(re.search(self._get_simulator_error_regex(), line))
+
+        line = line.strip()
+
+        # Sim output direction
+        self._output_handler(test, line)
+
+        if check_has_line_error(line) is True or not success:
+            if show_errors_and_warnings is True:
+                self._log_output_line("error", line)
+            if test is not None:
+                test.inc_num_sim_errors()
+
+        if check_has_line_warning(line) is True:
+            if show_errors_and_warnings is True:
+                self._log_output_line("warning", line)
+            if test is not None:
+                test.inc_num_sim_warnings()
+
+    def _log_output_line(self, level, line) -> None:
+        """
+        Logs an error or warning line, or collects it when the
+        library is compiled concurrently with other libraries.
+        """
+        messages = getattr(self.compile_output, "messages", None)
+        if messages is not None:
+            messages.append((level, line))
+        else:
+            getattr(self.logger, level)(line)
 
     def _output_handler(self, test, line):
         """
@@ -650,6 +1201,201 @@ class SimRunner:
             if self.project.settings.get_verbose() and single_sim_thread:
                 print(line, flush=True)
 
+    # ---------------------------------------------------------
+    # Simulator workers
+    # ---------------------------------------------------------
+
+    def _get_simulator_worker_command(self) -> list:
+        """
+        Returns the command for starting a persistent simulator
+        process reading Tcl commands from stdin, or None if the
+        simulator does not support workers.
+        """
+        return None
+
+    def _get_use_simulator_workers(self) -> bool:
+        return self.worker_pool is not None
+
+    def _start_worker_pool(self, num_workers) -> None:
+        if not self.project.settings.get_simulator_workers():
+            return
+
+        command = self._get_simulator_worker_command()
+        if command is None:
+            self.logger.warning(
+                "Simulator workers are not supported by {}.".format(
+                    self.SIMULATOR_NAME
+                )
+            )
+            return
+
+        self.logger.debug("Using {} simulator worker(s).".format(num_workers))
+        self.worker_pool = SimulatorWorkerPool(
+            command=command,
+            num_workers=num_workers,
+            path=os.path.join(
+                os.path.abspath(self.project.settings.get_output_path()), "worker"
+            ),
+            env=self.env_var,
+            project=self.project,
+        )
+
+    def _stop_worker_pool(self) -> None:
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+            self.worker_pool = None
+
+    def _get_simulator_worker_commands(self, test) -> list:
+        """
+        Tcl commands given to a worker for running a test, i.e. the
+        run.do file is executed from the test folder. The run.do file
+        sets the status of loading and quitting the design, see
+        _get_worker_load_call() and _get_worker_exit_call(), which is
+        reported to the worker. Errors do not stop run.do on a worker.
+        """
+        test_path = os.path.abspath(test.get_test_path()).replace("\\", "/")
+        return [
+            "set hdlregression_status {not run}",
+            "cd {" + test_path + "}",
+            "do run.do",
+            'puts "{} $hdlregression_status"'.format(SimulatorWorker.STATUS_MARKER),
+        ]
+
+    @staticmethod
+    def _get_worker_load_call(load_call) -> str:
+        """
+        Tcl loading the design on a worker and setting the worker status.
+        """
+        return (
+            "if {[catch {" + load_call + "}]} "
+            "{set hdlregression_status {load failed}} "
+            "else {set hdlregression_status ok}"
+        )
+
+    @staticmethod
+    def _get_worker_exit_call(exit_call) -> str:
+        """
+        Tcl quitting the design on a worker and setting the worker status.
+        """
+        return (
+            "if {[catch {" + exit_call + "}] && $hdlregression_status eq {ok}} "
+            "{set hdlregression_status {quit failed}}"
+        )
+
+    def _simulate_on_worker(self, test) -> bool:
+        """
+        Runs the test run.do file on a simulator worker and checks
+        the worker output. A worker that dies during the test fails
+        the test and is replaced before running the next test.
+        """
+        transcript_file = os.path.join(test.get_test_path(), "transcript")
+        commands = self._get_simulator_worker_commands(test)
+        self._save_cmd("; ".join(commands))
+
+        test.clear_output()
+        success = True
+        show_sim_errors_and_warnings = self._get_show_errors_and_warnings(test)
+
+        try:
+            worker_id, worker = self.worker_pool.acquire()
+        except OSError as e:
+            self.logger.error("Command error: {}.".format(e))
+            return False
+
+        try:
+            with open(transcript_file, "w") as transcript:
+                for line, line_ok in worker.run(
+                    commands, timeout=self.project.settings.get_simulator_worker_timeout()
+                ):
+                    transcript.write(line if line.endswith("\n") else line + "\n")
+                    if not line_ok:
+                        success = False
+                    self._handle_output_line(
+                        test, line, line_ok, show_sim_errors_and_warnings
+                    )
+        finally:
+            self.worker_pool.release(worker_id, worker)
+        return success
+
+    # ---------------------------------------------------------
+    # Elaboration cache
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def _get_test_dependency_files(test) -> list:
+        """
+        Returns all HDL files the testbench of a test depends on,
+        including every file in the libraries the testbench
+        libraries depend on.
+        """
+        hdlfile_list = []
+        library_list = []
+
+        start_hdlfiles = [test.get_tb().get_hdlfile()]
+        if test.get_is_vhdl() and test.get_arch() is not None:
+            start_hdlfiles.append(test.get_arch().get_hdlfile())
+
+        # Files in the testbench library
+        while start_hdlfiles:
+            hdlfile = start_hdlfiles.pop()
+            if hdlfile is None or hdlfile in hdlfile_list:
+                continue
+            hdlfile_list.append(hdlfile)
+            start_hdlfiles += hdlfile.get_hdlfile_this_dep_on()
+
+            if hdlfile.get_library() not in library_list:
+                library_list.append(hdlfile.get_library())
+
+        # Files in dependent libraries
+        for library in library_list:
+            for dep_library in library.get_lib_obj_dep():
+                if dep_library not in library_list:
+                    library_list.append(dep_library)
+                    for hdlfile in dep_library.get_hdlfile_list():
+                        if hdlfile not in hdlfile_list:
+                            hdlfile_list.append(hdlfile)
+
+        return sorted(hdlfile_list, key=lambda f: f.get_filename_with_path())
+
+    def _get_elaboration_hash(self, test, options) -> str:
+        """
+        Returns a hash of the compile time of every file in the test
+        dependency closure and the elaboration options, i.e. the hash
+        changes when any dependency is recompiled.
+        """
+        elab_hash = hashlib.sha256()
+        for hdlfile in self._get_test_dependency_files(test):
+            elab_hash.update(
+                "{}:{};".format(
+                    hdlfile.get_filename_with_path(), hdlfile.get_compile_time()
+                ).encode()
+            )
+        elab_hash.update(" ".join(map(str, options)).encode())
+        return elab_hash.hexdigest()
+
+    def _get_elaboration_lock(self, key) -> "Lock":
+        with self.elaboration_lock:
+            if key not in self.elaboration_lock_dict:
+                self.elaboration_lock_dict[key] = Lock()
+            return self.elaboration_lock_dict[key]
+
+    @staticmethod
+    def _get_cached_elaboration_hash(hash_file) -> str:
+        try:
+            with open(hash_file, "r") as read_file:
+                return read_file.read().strip()
+        except OSError:
+            return None
+
+    def _set_cached_elaboration_hash(self, hash_file, elab_hash) -> None:
+        try:
+            with open(hash_file, "w") as write_file:
+                write_file.write(elab_hash)
+        except OSError as error:
+            self.logger.warning(
+                "Unable to write elaboration hash file {}: {}".format(hash_file, error)
+            )
+
     # ---------------------------------------------------------
     # Testbench and simulations
     # ---------------------------------------------------------
@@ -688,6 +1434,23 @@ class SimRunner:
             self._check_test_result(test=test, sim_start_time=sim_start_time)
             test.set_folder_to_name_mapping(descriptive_test_name)
 
+        def use_cached_verdict(test, descriptive_test_name):
+            terminal_output_string = self._create_terminal_test_info_output_string(
+                test, descriptive_test_name
+            )
+            test.set_test_id_string(terminal_output_string)
+            test.set_sim_time(0)
+            test.set_cached_verdict(True)
+            test.set_status(TestStatus.PASS)
+            test.set_terminal_test_details_str(
+                "{}{}PASS (cached){}.\n".format(
+                    terminal_output_string,
+                    self.logger.green(),
+                    self.logger.reset_color(),
+                )
+            )
+            test.set_folder_to_name_mapping(descriptive_test_name)
+
         gen_call = test.get_gc_str()
         architecture_name = "" if not test.get_is_vhdl() else test.get_arch().get_name()
 
@@ -696,8 +1459,82 @@ class SimRunner:
             test, architecture_name, module_call
         )
 
+        verdict_hash = None
+        if self._get_use_verdict_cache():
+            verdict_hash = self._get_verdict_hash(test)
+            cached_verdict_hash = self.project.settings.get_test_verdict(
+                test.get_duration_key()
+            )
+            if (
+                cached_verdict_hash == verdict_hash
+                and not self.project.settings.get_force_simulation()
+            ):
+                use_cached_verdict(test, descriptive_test_name)
+                return
+
         run_simulation(test, descriptive_test_name, module_call, gen_call)
 
+        if verdict_hash is not None:
+            self.project.settings.set_test_verdict(
+                test.get_duration_key(),
+                verdict_hash if test.get_status() == TestStatus.PASS else None,
+            )
+
+    def _get_use_verdict_cache(self) -> bool:
+        """
+        Tests are run to collect code coverage, even if they passed
+        with the same inputs.
+        """
+        return (
+            self.project.settings.get_verdict_cache()
+            and not self.project.hdlcodecoverage.get_code_coverage_settings()
+        )
+
+    def _get_verdict_hash(self, test) -> str:
+        """
+        Returns a hash of everything a test result depends on, i.e. the
+        content of every file in the test dependency closure, generics,
+        simulator options, simulator version and the files copied to
+        the test folder.
+        """
+        settings = self.project.settings
+        verdict_hash = hashlib.sha256()
+        key_items = [
+            self.SIMULATOR_NAME,
+            self._get_simulator_version(),
+            test.get_duration_key(),
+            test.get_gc_str(),
+            settings.get_sim_options(),
+            settings.get_elaboration_options(),
+            settings.get_runtime_options(),
+            settings.get_global_options(),
+            settings.get_result_check_str(),
+            test.get_netlist_timing(),
+        ]
+        for hdlfile in self._get_test_dependency_files(test):
+            key_items += [
+                hdlfile.get_filename_with_path(),
+                hdlfile.get_current_digest(),
+                hdlfile._get_com_options(simulator=self.SIMULATOR_NAME),
+            ]
+
+        sim_path = settings.get_sim_path()
+        for filename in self.project.testcase_settings.get_copy_file_to_testcase_folder(
+            test.get_id_number()
+        ):
+            file_digest = hashlib.sha256()
+            try:
+                with open(os.path.join(sim_path, filename), "rb") as read_file:
+                    file_digest.update(read_file.read())
+            except OSError:
+                file_digest.update(b"missing")
+            key_items += [filename, file_digest.hexdigest()]
+
+        for item in key_items:
+            verdict_hash.update(str(item).encode())
+            verdict_hash.update(b"\0")
+        return verdict_hash.hexdigest()
+
     def _prepare_test_folder(self, test):
         test_folder = test.get_test_path()
 
@@ -805,8 +1642,7 @@ class SimRunner:
         def format_test_details_string(
             test_str_result, sim_num_errors_and_warnings_str
         ):
-            sim_end_time = round(time.time() * 1000)
-            elapsed_time = sim_end_time - sim_start_time
+            elapsed_time = test.get_sim_time()
             sim_sec, sim_min, sim_hrs = convert_from_millisec(elapsed_time)
             return "{}{} ({}h:{}m:{}s){}.\n".format(
                 test.get_terminal_test_string(),
@@ -817,6 +1653,15 @@ class SimRunner:
                 sim_num_errors_and_warnings_str,
             )
 
+        def update_test_duration(test):
+            sim_end_time = round(time.time() * 1000)
+            elapsed_time = sim_end_time - sim_start_time
+            test.set_sim_time(elapsed_time)
+            # Used for ordering tests on the next run
+            self.project.settings.set_test_duration(
+                test.get_duration_key(), elapsed_time
+            )
+
         def update_test_status_and_info(test):
             (test_ok, test_ok_no_minor_alerts) = self._check_file_content(
                 test.get_output_no_format()
@@ -839,6 +1684,7 @@ class SimRunner:
             else:
                 test.set_status(TestStatus.NOT_RUN)
 
+        update_test_duration(test)
         update_test_status_and_info(test)
 
     def _create_terminal_test_info_output_string(
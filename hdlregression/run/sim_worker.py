@@ -0,0 +1,190 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+import os
+import re
+import sys
+import time
+import subprocess
+from pathlib import Path
+from queue import Queue, Empty
+from threading import Thread
+
+from ..report.logger import Logger
+
+
+class SimulatorWorker:
+    """
+    A long-lived simulator process (vsim -c / vsimsa) which is
+    given Tcl commands on stdin, i.e. the simulator is started and
+    the license is checked out once for all tests run by the worker.
+    """
+
+    ON_POSIX = "posix" in sys.builtin_module_names
+
+    # Printed by the worker when all commands for a test are done
+    END_MARKER = "HDLREGRESSION_WORKER_DONE"
+    # Printed by the worker before END_MARKER with the status of loading
+    # and quitting the design, see SimRunner._get_simulator_worker_commands()
+    STATUS_MARKER = "HDLREGRESSION_WORKER_STATUS"
+    STATUS_OK = "ok"
+    RE_STATUS = re.compile(STATUS_MARKER + r" ([a-z ]+)$")
+
+    def __init__(self, command, path="./", env=None):
+        Path(path).mkdir(parents=True, exist_ok=True)
+        self.output_queue = Queue()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            bufsize=1,
+            cwd=path,
+            env=env,
+            close_fds=self.ON_POSIX,
+        )
+        self.reader = Thread(target=self._enqueue_output)
+        self.reader.daemon = True  # thread dies with the program
+        self.reader.start()
+
+    def _enqueue_output(self) -> None:
+        for line in iter(self.process.stdout.readline, ""):
+            self.output_queue.put(line)
+        # Simulator output closed, i.e. the process has ended
+        self.output_queue.put(None)
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, commands, timeout=None) -> tuple:
+        """
+        Sends the commands to the simulator and yields each output
+        line with a success flag until the commands are done.
+        The success flag is False if the simulator process died, if the
+        commands report a status other than ok, or if the commands are
+        not done within timeout seconds. The worker is then killed, i.e.
+        replaced by the pool, as the simulator state is unknown.
+        """
+        script = "\n".join(commands + ['puts "{}"'.format(self.END_MARKER)])
+        try:
+            self.process.stdin.write(script + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            yield "Error: Simulator worker is not running", False
+            return
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                if deadline is None:
+                    line = self.output_queue.get()
+                else:
+                    line = self.output_queue.get(
+                        timeout=max(0, deadline - time.monotonic())
+                    )
+            except Empty:
+                self.kill()
+                yield "Error: Simulator worker timed out after {} seconds".format(
+                    timeout
+                ), False
+                return
+
+            if line is None:
+                yield "Error: Simulator worker ended with exit code {}".format(
+                    self.process.wait()
+                ), False
+                return
+            if line.rstrip().endswith(self.END_MARKER):
+                return
+
+            status = self.RE_STATUS.search(line.rstrip())
+            if status and status.group(1) != self.STATUS_OK:
+                self.kill()
+                yield "Error: Simulator worker status: {}".format(status.group(1)), False
+                return
+            yield line, True
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.wait()
+
+    def stop(self) -> None:
+        """
+        Quits the simulator, the process is killed if it does not quit.
+        """
+        try:
+            self.process.stdin.write("quit -f\n")
+            self.process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+class SimulatorWorkerPool:
+    """
+    A pool of simulator workers, one for each simulation thread.
+    Workers are started on first use, and a worker that has died
+    is replaced by a new worker when it is acquired.
+    """
+
+    def __init__(self, command, num_workers, path="./", env=None, project=None):
+        self.logger = Logger(name=__name__, project=project)
+        self.command = command
+        self.path = path
+        self.env = env
+        self.workers = Queue()
+        for worker_id in range(num_workers):
+            self.workers.put((worker_id, None))
+
+    def _start_worker(self, worker_id) -> SimulatorWorker:
+        worker_path = os.path.join(self.path, "worker_{}".format(worker_id))
+        self.logger.debug("Starting simulator worker {}.".format(worker_id))
+        return SimulatorWorker(self.command, path=worker_path, env=self.env)
+
+    def acquire(self) -> tuple:
+        """
+        Returns an idle worker and its id, starting a new worker
+        if it has not been started or has died.
+        """
+        worker_id, worker = self.workers.get()
+        if worker is not None and not worker.is_alive():
+            self.logger.warning(
+                "Simulator worker {} died, starting a new worker.".format(worker_id)
+            )
+            worker.stop()
+            worker = None
+        if worker is None:
+            try:
+                worker = self._start_worker(worker_id)
+            except Exception:
+                self.workers.put((worker_id, None))
+                raise
+        return worker_id, worker
+
+    def release(self, worker_id, worker) -> None:
+        self.workers.put((worker_id, worker))
+
+    def stop(self) -> None:
+        """
+        Quits all started workers.
+        """
+        while not self.workers.empty():
+            _, worker = self.workers.get()
+            if worker is not None:
+                worker.stop()
@@ -19,6 +19,10 @@ from ..construct.container import Container
 from ..report.logger import Logger
 from ..construct.hdlfile import VHDLFile, VerilogFile
 from .hdltests import VHDLTest, VerilogTest, TestStatus
+from ..hdlregression_pkg import (
+    get_library_name_references,
+    get_is_referred_by_library_name,
+)
 
 
 class TestBuilder:
@@ -35,6 +39,10 @@ class TestBuilder:
         self.tests_to_run_container = Container(name="tests_to_run_container")
         self.base_tests_container = Container(name="base_tests_container")
         self.test_id_count = 0
+        # Files each file depends on, directly and through other files
+        self.dependency_closure_dict = {}
+        # Tests are only affected by changes if any file needs compile
+        self.has_files_need_compile = True
 
     def build_tb_module_list(self) -> None:
         """
@@ -76,6 +84,7 @@ class TestBuilder:
         # Run all
         if self.project.settings.get_run_all():
             self.logger.debug("building tests for full regression")
+            self._set_selection_reason("full regression")
 
         # Run in GUI mode
         elif self.project.settings.get_gui_mode():
@@ -83,8 +92,10 @@ class TestBuilder:
 
             if self.project.settings.get_testcase():
                 self._build_testcase()
+                self._set_selection_reason("selected testcase")
             elif self.project.settings.get_testgroup():
                 self._build_testgroup()
+                self._set_selection_reason("selected test group")
             else:
                 self._build_modified()
 
@@ -94,9 +105,11 @@ class TestBuilder:
         # Run testcase
         elif self.project.settings.get_testcase():
             self._build_testcase()
+            self._set_selection_reason("selected testcase")
         # Run testgroup
         elif self.project.settings.get_testgroup():
             self._build_testgroup()
+            self._set_selection_reason("selected test group")
         # Run only changed
         else:
             self._build_modified()
@@ -121,6 +134,10 @@ class TestBuilder:
     def _set_return_code(self, return_code):
         self.project.settings.set_return_code(return_code)
 
+    def _set_selection_reason(self, reason) -> None:
+        for test in self.tests_to_run_container.get():
+            test.set_selection_reason(reason)
+
     def _str_match(self, str1, str2) -> bool:
         return str1.upper() == str2.upper()
 
@@ -549,27 +566,130 @@ class TestBuilder:
     def _build_modified(self) -> None:
         """
         Build a list of tests that have to
-        be re-run due to changes.
+        be re-run due to changes, i.e. tests where the
+        testbench depends on a changed file, directly or
+        through other files.
         """
         self.logger.debug("building tests for changed only")
 
+        self.dependency_closure_dict = {}
+        self.has_files_need_compile = any(
+            library.get_has_files_need_compile()
+            for library in self.project._get_library_container().get()
+        )
         filtered_tests = []
         for test in self.base_tests_container.get():
-            if test.get_hdlfile().get_need_compile() is True:
-                filtered_tests.append(test)
-            elif test.get_status() == TestStatus.FAIL:
-                filtered_tests.append(test)
-            elif test.get_status() == TestStatus.RE_RUN:
-                filtered_tests.append(test)
-            elif not self.project.settings.get_run_success():
-                filtered_tests.append(test)
-            elif test.get_hdlfile().get_library().get_need_compile() is True:
-                filtered_tests.append(test)
-            elif test.get_hdlfile().get_library().get_dependencies_need_compile() is True:
+            reason = self._get_modified_reason(test)
+            if reason is not None:
+                test.set_selection_reason(reason)
                 filtered_tests.append(test)
 
         self._copy_filtered_tests_to_tests_to_run_container(filtered_tests)
 
+    def _get_modified_reason(self, test) -> str:
+        """
+        Returns why the test has to be re-run, or None if
+        the test is not affected by any changes.
+        """
+        if test.get_status() == TestStatus.FAIL:
+            return "failed in previous run"
+        elif test.get_status() == TestStatus.RE_RUN:
+            return "marked for re-run"
+        elif not self.project.settings.get_run_success():
+            return "previous run did not complete"
+        elif not self.has_files_need_compile:
+            return None
+
+        tb_hdlfile = test.get_hdlfile()
+        changed_hdlfiles = [
+            hdlfile
+            for hdlfile in self._get_dependency_closure(tb_hdlfile)
+            if hdlfile.get_need_compile()
+        ]
+        if not changed_hdlfiles:
+            return None
+        elif tb_hdlfile in changed_hdlfiles and (
+            len(changed_hdlfiles) == 1 or tb_hdlfile.get_file_changed()
+        ):
+            return "testbench changed: {}".format(tb_hdlfile.get_name())
+
+        # Testbench is recompiled for the files it depends on
+        if tb_hdlfile in changed_hdlfiles:
+            changed_hdlfiles.remove(tb_hdlfile)
+        # Present files with changed content first
+        changed_hdlfiles.sort(key=lambda hdlfile: not hdlfile.get_file_changed())
+        names = [hdlfile.get_name() for hdlfile in changed_hdlfiles[:3]]
+        if len(changed_hdlfiles) > 3:
+            names.append("{} more".format(len(changed_hdlfiles) - 3))
+        return "depends on changed: {}".format(", ".join(names))
+
+    def _get_dependency_closure(self, hdlfile) -> set:
+        """
+        Returns the file and all files it depends on, directly or
+        through other files, in this and in other libraries.
+        """
+        closure = self.dependency_closure_dict.get(hdlfile)
+        if closure is not None:
+            return closure
+
+        closure = {hdlfile}
+        unvisited = [hdlfile]
+        while unvisited:
+            current = unvisited.pop()
+            for dep_hdlfile in (
+                current.get_hdlfile_this_dep_on()
+                + self._get_implementing_hdlfiles(current)
+                + self._get_ext_hdlfile_this_dep_on(current)
+            ):
+                if dep_hdlfile not in closure:
+                    closure.add(dep_hdlfile)
+                    unvisited.append(dep_hdlfile)
+
+        self.dependency_closure_dict[hdlfile] = closure
+        return closure
+
+    @staticmethod
+    def _get_implementing_hdlfiles(hdlfile) -> list:
+        """
+        Returns files with architectures and package bodies of the
+        entities and packages in the file. These files depend on the
+        file, but are needed by any design using it.
+        """
+        unit_names = set(module.get_name().lower() for module in hdlfile.get_modules())
+        return [
+            dep_hdlfile
+            for dep_hdlfile in hdlfile.get_hdlfile_dep_on_this()
+            if any(
+                (module.get_is_architecture() and module.get_arch_of().lower() in unit_names)
+                or (module.get_is_package_body() and module.get_name().lower() in unit_names)
+                for module in dep_hdlfile.get_modules()
+            )
+        ]
+
+    def _get_ext_hdlfile_this_dep_on(self, hdlfile) -> list:
+        """
+        Returns files in other libraries the file may use without
+        referring to their design units, i.e. design units of the
+        libraries referred by library name only, and all files of the
+        libraries set as dependencies with set_dependency().
+        Design units referred by name are in get_hdlfile_this_dep_on().
+        """
+        library_names = get_library_name_references(hdlfile)
+        dep_hdlfile_list = []
+        for library in self.project._get_library_container().get():
+            if library is hdlfile.get_library():
+                continue
+            elif library.get_name().lower() not in library_names:
+                continue
+            dep_hdlfile_list += [
+                dep_hdlfile
+                for dep_hdlfile in library.get_hdlfile_list()
+                if get_is_referred_by_library_name(dep_hdlfile)
+            ]
+        for library in hdlfile.get_library().get_manual_lib_obj_dep():
+            dep_hdlfile_list += library.get_hdlfile_list()
+        return dep_hdlfile_list
+
     def _get_test_object(self, tb=None, arch=None, tc=None, gc=None):
         """
         Will return test object based on HDL file type.
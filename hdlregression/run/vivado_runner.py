@@ -15,6 +15,8 @@
 
 
 import os
+import hashlib
+import shutil
 
 from .sim_runner import SimRunner, OutputFileError
 from ..report.logger import Logger
@@ -24,6 +26,16 @@ from ..scan.hdl_regex_pkg import RE_VIVADO_WARNING, RE_VIVADO_ERROR
 class VivadoRunner(SimRunner):
 
     SIMULATOR_NAME = "XSIM"
+    SIMULATOR_VERSION_CALL = ('xsim', '--version')
+
+    # Files are compiled (xvhdl/xvlog) into xsim.dir in the library folder.
+    # Each testbench is elaborated (xelab) into a snapshot in the same
+    # xsim.dir, and the snapshot is copied to xsim.dir in the test folder
+    # and run by xsim from there, i.e. tests never share a snapshot folder.
+    # Xsim takes generics at elaboration only, so a snapshot is created
+    # per testbench/architecture and generic combination. With the
+    # elaboration cache enabled, snapshots are reused as long as their
+    # dependency files and elaboration options are unchanged.
 
     def __init__(self, project):
         super().__init__(project)
@@ -66,29 +78,37 @@ class VivadoRunner(SimRunner):
         return return_list
 
     def _compile_library(self, library, force_compile=False) -> 'HDLLibrary':
-        compile_ok = True
         libraries_path = os.path.join(self.project.settings.get_sim_path(), self.project.settings.get_output_path(), 'library')
         libraries_path = os_adjust_path(libraries_path)
 
         # Library compile path
         library_compile_path = os.path.join(libraries_path, library.get_name())
         library_compile_path = os_adjust_path(library_compile_path)
+        # Xsim compiles to xsim.dir, the library folder marks the library as compiled
+        os.makedirs(library_compile_path, exist_ok=True)
+
+        def compile_hdlfile(hdlfile) -> bool:
+            self.logger.debug('Recompiling file: %s' % (hdlfile.get_name()))
+            success = self._run_cmd(command=self._get_compile_call(hdlfile), path=libraries_path)
+            if not success:
+                return False
+            hdlfile.update_compile_time()
+            return True
 
         # Compile each HDL file
-        for hdlfile in library.get_compile_order_list():
-            if hdlfile.get_is_netlist():
-                continue
-
-            if hdlfile.get_need_compile() or force_compile:
-                self.logger.debug('Recompiling file: %s' % (hdlfile.get_name()))
-                success = self._run_cmd(command=self._get_compile_call(hdlfile), path=libraries_path)
-                if not success:
-                    compile_ok = False
-                else:
-                    hdlfile.update_compile_time()
+        hdlfile_list = [hdlfile for hdlfile in library.get_compile_order_list()
+                        if not hdlfile.get_is_netlist() and (hdlfile.get_need_compile() or force_compile)]
+        if self.project.settings.get_compile_batch():
+            compile_ok = self._compile_hdlfiles_in_batches(hdlfile_list, self._get_compile_call,
+                                                           compile_hdlfile, libraries_path)
+        else:
+            compile_ok = self._compile_hdlfiles_in_order(hdlfile_list, compile_hdlfile)
 
         return library if compile_ok else None
 
+    def _get_library_cache_folder(self, library) -> str:
+        return os.path.join(self._get_libraries_path(), 'xsim.dir', library.get_name())
+
     def _get_simulator_error_regex(self):
         return RE_VIVADO_ERROR
 
@@ -98,9 +118,93 @@ class VivadoRunner(SimRunner):
     def _get_netlist_call(self) -> str:
         return ''
 
+    def _get_libraries_path(self) -> str:
+        libraries_path = os.path.join(self.project.settings.get_sim_path(), self.project.settings.get_output_path(), 'library')
+        return os_adjust_path(libraries_path)
+
+    @staticmethod
+    def _get_snapshot_name(test, generic_call) -> str:
+        """
+        Returns the snapshot name for a test, i.e. one snapshot for each
+        testbench/architecture and generic combination.
+        """
+        name = test.get_name()
+        if test.get_is_vhdl():
+            name += '_' + test.get_arch().get_name()
+        if generic_call:
+            name += '_' + hashlib.sha1(generic_call.encode()).hexdigest()[:8]
+        return name.lower()
+
+    def _get_elaborate_call(self, test, generic_call, module_call, snapshot) -> list:
+        """
+        Returns a xelab call for creating a snapshot of the testbench,
+        with generics set on the top-level.
+        """
+        return_list = [self._get_simulator_executable('xelab')]
+        for library in self.project._get_library_container().get():
+            return_list += ['-L', library.get_name()]
+        return_list += self.project.settings.get_elaboration_options() or []
+        if generic_call:
+            for generic in generic_call.split(' '):
+                return_list += ['-generic_top', generic[2:] if generic.startswith('-g') else generic]
+        return_list += ['--snapshot', snapshot, module_call]
+        return return_list
+
+    def _elaborate_snapshot(self, test, generic_call, module_call, snapshot) -> bool:
+        """
+        Elaborates the snapshot unless a snapshot created from the same
+        dependency files and options exists and the elaboration cache
+        is enabled, and copies the snapshot to the test folder.
+        """
+        libraries_path = self._get_libraries_path()
+        elab_path = os.path.join(os.path.abspath(self.project.settings.get_elaboration_path()),
+                                 self.SIMULATOR_NAME.lower(),
+                                 test.get_library().get_name())
+        hash_file = os.path.join(elab_path, '{}.hash'.format(snapshot))
+
+        cmd = self._get_elaborate_call(test, generic_call, module_call, snapshot)
+        elab_hash = self._get_elaboration_hash(test, cmd)
+
+        with self._get_elaboration_lock(hash_file):
+            snapshot_path = os.path.join(libraries_path, 'xsim.dir', snapshot)
+            if (self.project.settings.get_elaboration_cache() and os.path.isdir(snapshot_path)
+                    and self._get_cached_elaboration_hash(hash_file) == elab_hash):
+                self.logger.debug('Using snapshot: {}'.format(snapshot))
+            else:
+                self.logger.debug('Elaborating snapshot: {}'.format(snapshot))
+                os.makedirs(elab_path, exist_ok=True)
+                if not self._run_cmd(command=cmd, path=libraries_path, test=test):
+                    self.logger.error('Failed to elaborate %s!' % (module_call))
+                    return False
+                self._set_cached_elaboration_hash(hash_file, elab_hash)
+            # Snapshot is not replaced while copied
+            return self._copy_snapshot_to_test_folder(test, snapshot)
+
+    def _copy_snapshot_to_test_folder(self, test, snapshot) -> bool:
+        """
+        Xsim loads snapshots from xsim.dir in the run folder and writes
+        to the snapshot folder while running, so each test folder gets
+        its own copy of the snapshot.
+        """
+        snapshot_path = os.path.join(self._get_libraries_path(), 'xsim.dir', snapshot)
+        test_xsim_dir = os.path.join(test.get_test_path(), 'xsim.dir')
+        # Test folders used to link the shared xsim.dir
+        if os.path.islink(test_xsim_dir):
+            os.unlink(test_xsim_dir)
+        test_snapshot_path = os.path.join(test_xsim_dir, snapshot)
+        shutil.rmtree(test_snapshot_path, ignore_errors=True)
+        try:
+            shutil.copytree(snapshot_path, test_snapshot_path)
+        except (OSError, shutil.Error) as error:
+            self.logger.error('Unable to copy snapshot {}: {}'.format(snapshot, error))
+            return False
+        return True
+
     def _get_simulator_do_cmd(self, test, generic_call, module_call) -> str:
-        sim_options = ' '.join(self.project.settings.get_sim_options())
-        return ' '.join(['xsim', generic_call, module_call, sim_options, '-R'])
+        """
+        Returns the xsim Tcl batch commands used in run.do.
+        """
+        return '\n'.join(['run -all', 'quit'])
 
     def _write_run_do_file(self, test, generic_call, module_call):
         sim_call = self._get_simulator_do_cmd(test, generic_call, module_call)
@@ -112,12 +216,28 @@ class VivadoRunner(SimRunner):
             raise OutputFileError(run_file)
 
     def _simulate(self, test, generic_call, module_call) -> bool:
-        print('--->> starting sim')
-        command = ['xsim', '--runall', 'run.do']
+        snapshot = self._get_snapshot_name(test, generic_call)
+        if not self._elaborate_snapshot(test, generic_call, module_call, snapshot):
+            return False
+
+        sim_exec = self._get_simulator_executable('xsim')
+        command = [sim_exec, snapshot, '--tclbatch', 'run.do']
+        command += self.project.settings.get_sim_options()
         success = self._run_cmd(command=command, path=test.get_test_path(), test=test)
-        print('---->>> sim done')
         return success
 
+    def _get_module_call(self, test, architecture_name):
+        # Testbench architecture is selected on the xelab top-level
+        lib_name = test.get_library().get_name()
+        if test.get_is_vhdl():
+            return '{}.{}({})'.format(lib_name, test.get_name(), architecture_name)
+        else:
+            return '{}.{}'.format(lib_name, test.get_name())
+
+    def _get_descriptive_test_name(self, test, architecture_name, module_call):
+        name = '{}.{}'.format(test.get_library().get_name(), test.get_name())
+        return '{}({})'.format(name, architecture_name) if test.get_is_vhdl() else name
+
     def _get_ignored_error_detection_str(self) -> str:
         # This should include any XSIM-specific ignored errors
         return r'^\/\/  (Reconnected|Lost connection) to license server'
@@ -54,6 +54,11 @@ ID_GHDL_ERROR = r"(error: (.*):(\d+):(\d+):\s(.*))"
 RE_GHDL_ERROR = re.compile(ID_GHDL_ERROR, flags=re.IGNORECASE)
 ID_GHDL_WARNING = r"(warning: (.*):(\d+):(\d+):\s(.*))"
 RE_GHDL_WARNING = re.compile(ID_GHDL_WARNING, flags=re.IGNORECASE)
+# ghdl --version, e.g. " llvm 14.0.6 code generator"
+ID_GHDL_CODE_GENERATOR = r"^\s*(\w+)\b.*\bcode generator\s*$"
+RE_GHDL_CODE_GENERATOR = re.compile(
+    ID_GHDL_CODE_GENERATOR, flags=re.IGNORECASE | re.MULTILINE
+)
 
 # Regex for detecting Xsim errors
 ID_VIVADO_ERROR = r"[\r\n\s]?ERROR[:\s]"
@@ -13,17 +13,45 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
 #
 
+import re
 from abc import abstractmethod
+from collections import namedtuple
 
 from ..construct.container import Container
 from ..report.logger import Logger
 
 
+# Compact and picklable scan result for one module
+ModuleScanResult = namedtuple(
+    "ModuleScanResult",
+    [
+        "type",
+        "name",
+        "arch_of",
+        "int_dep",
+        "ext_dep",
+        "generic",
+        "parameter",
+        "testcase",
+        "is_tb",
+        "ext_unit_dep",
+    ],
+)
+
+
 class HDLScanner:
     """
     Base scanner class
     """
 
+    # Increment when the scan result of a file may change, i.e. cached
+    # scan results from earlier versions are not used.
+    SCANNER_VERSION = 3
+
+    # Line comment and testbench pragma, set by each scanner
+    LINE_COMMENT = None
+    RE_TB_PRAGMA = None
+
     def __init__(self, project, library, filename, hdlfile):
         self.logger = Logger(name=__name__, project=project)
         self.testcase_string = project.settings.get_testcase_identifier_name()
@@ -35,6 +63,7 @@ class HDLScanner:
         # Lists
         self.library_list = []
         self.int_use_list = []
+        self.ext_unit_list = []
         self.testcase_list = []
 
         # Assertion
@@ -44,8 +73,13 @@ class HDLScanner:
     def get_library(self) -> str:
         return self.library
 
-    def scan(self, file_content):
-        file_content = self._clean_code(file_content)
+    def scan(self, file_content, skip_bodies=False):
+        """
+        Scans the file content, i.e. a list of lines or an open file.
+        Only statements relevant for design unit headers and
+        dependencies are scanned when skip_bodies is True.
+        """
+        file_content = self._clean_code(file_content, skip_bodies)
         self.tokenize(file_content)
 
     def set_filename(self, filename):
@@ -78,6 +112,20 @@ class HDLScanner:
         self.int_use_list = []
         return list_copy
 
+    def add_ext_unit_dep(self, library, unit):
+        ext_unit = "{}.{}".format(library, unit).lower()
+        if not (ext_unit in self.ext_unit_list):
+            self.ext_unit_list.append(ext_unit)
+
+    def get_ext_unit_dep(self) -> list:
+        """
+        Returns the list of units in other libraries and empties
+        the stored list.
+        """
+        list_copy = [item for item in self.ext_unit_list]
+        self.ext_unit_list = []
+        return list_copy
+
     def add_testcase(self, testcase):
         if testcase not in self.testcase_list:
             self.testcase_list.append(testcase)
@@ -92,16 +140,150 @@ class HDLScanner:
     def get_module_container(self) -> "Container":
         return self.container
 
+    def get_scan_result(self) -> list:
+        """
+        Returns the modules found when scanning the file as a
+        list of ModuleScanResult, i.e. without module objects.
+        """
+        scan_result = []
+        for module in self.container.get():
+            scan_result.append(
+                ModuleScanResult(
+                    type=module.get_type(),
+                    name=module.get_name(),
+                    arch_of=module.get_arch_of() if module.get_is_architecture() else None,
+                    int_dep=list(module.get_int_dep()),
+                    ext_dep=list(module.get_ext_dep()),
+                    generic=list(module.get_generic()) if module.get_is_entity() else [],
+                    parameter=list(module.get_parameter()) if module.get_is_verilog_module() else [],
+                    testcase=list(getattr(module, "testcase_list", [])),
+                    is_tb=module.get_is_tb(),
+                    ext_unit_dep=list(module.get_ext_unit_dep()),
+                )
+            )
+        return scan_result
+
+    def set_scan_result(self, scan_result) -> None:
+        """
+        Builds the modules of a scan result, i.e. from a
+        file scanned by another process.
+        """
+        for module_result in scan_result:
+            module = self._get_module_from_result(module_result)
+            module.add_int_dep(module_result.int_dep)
+            module.add_ext_dep(module_result.ext_dep)
+            module.add_ext_unit_dep(module_result.ext_unit_dep)
+            for generic in module_result.generic:
+                module.add_generic(generic)
+            for parameter in module_result.parameter:
+                module.add_parameter(parameter)
+            for testcase in module_result.testcase:
+                module.add_testcase(testcase)
+            if module_result.is_tb:
+                module.set_is_tb()
+            module.set_complete()
+
     def increment_assertion_count(self) -> None:
         self.assertion_count += 1
 
     def get_assertion_count(self) -> int:
         return self.assertion_count
 
+    def _clean_code(self, file_content_list, skip_bodies=False):
+        """
+        Pre-cleaning code to ease tokenizing afterwards, each line is
+        read once and cleaned statements are yielded to the tokenizer:
+         - 1 - check for pragmas
+         - 2 - remove comments (regular and block)
+         - 3 - remove all strings, except in statements with testcases
+         - 4 - skip statements in bodies, see _skip_statement()
+        """
+        re_special = re.compile(r'"|/\*|' + re.escape(self.LINE_COMMENT))
+        re_testcase = re.compile(self.testcase_string, flags=re.IGNORECASE)
+        in_block_comment = False
+        statement = []
+        has_testcase = False
+        skip_statement = None
+
+        for line in file_content_list:
+            line = line.strip()
+            keep_strings = has_testcase or re_testcase.search(line) is not None
+            is_tb = False
+            code = []
+            pos = 0
+            while pos < len(line):
+                if in_block_comment:
+                    end = line.find("*/", pos)
+                    if end < 0:
+                        break
+                    in_block_comment = False
+                    pos = end + 2
+                    continue
+
+                match = re_special.search(line, pos)
+                if match is None:
+                    code.append(line[pos:])
+                    break
+                code.append(line[pos:match.start()])
+
+                if match.group() == '"':
+                    end = line.find('"', match.end())
+                    if end < 0:
+                        code.append(line[match.start():])
+                        break
+                    code.append(line[match.start():end + 1] if keep_strings else '""')
+                    pos = end + 1
+                elif match.group() == "/*":
+                    in_block_comment = True
+                    pos = match.end()
+                else:
+                    # Line comment, only the testbench pragma is kept
+                    pragma = self.RE_TB_PRAGMA.match(line, match.start())
+                    if pragma is not None:
+                        code.append(pragma.group())
+                        is_tb = True
+                    break
+
+            code = "".join(code)
+            # Skipped statements are decided by their first line of code,
+            # and again after a line ending a design unit header.
+            if skip_bodies and skip_statement is None and code:
+                skip_statement = self._skip_statement(code)
+            if not skip_statement:
+                statement.append(code)
+                has_testcase = has_testcase or re_testcase.search(code) is not None
+                if skip_bodies and self._is_header_end(code):
+                    skip_statement = None
+
+            if is_tb or self._is_statement_end(code):
+                if statement:
+                    yield " ".join(statement)
+                statement = []
+                has_testcase = False
+                skip_statement = None
+
+    def _skip_statement(self, code) -> bool:
+        """
+        Returns True if the statement starting with this line of code
+        can be skipped when scanning bodies is skipped.
+        """
+        return False
+
+    def _is_header_end(self, code) -> bool:
+        """
+        Returns True if this line of code ends a design unit header,
+        i.e. the statement continues with declarations.
+        """
+        return False
+
     @abstractmethod
-    def _clean_code(self, file_content_list) -> list:
+    def _is_statement_end(self, code) -> bool:
         pass
 
     @abstractmethod
     def tokenize(self, file_content_list):
         pass
+
+    @abstractmethod
+    def _get_module_from_result(self, module_result):
+        pass
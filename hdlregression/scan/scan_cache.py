@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+import hashlib
+import json
+import os
+import uuid
+
+from .hdlscanner import ModuleScanResult
+from ..report.logger import Logger
+
+
+class ScanCache:
+    """
+    Content addressed cache of scan results, which can be shared by
+    several workspaces. Each entry is the list of modules found in a
+    file, stored as JSON under a key computed from the file content,
+    scanner version, library name and testcase identifier.
+    """
+
+    def __init__(self, path, project=None):
+        self.logger = Logger(name=__name__, project=project)
+        self.path = os.path.abspath(path)
+
+    @staticmethod
+    def get_key(scanner, file_digest, skip_bodies=False) -> str:
+        """
+        Returns the cache key of a file scanned by the scanner.
+        """
+        key = hashlib.blake2b(digest_size=16)
+        for item in [
+            type(scanner).__name__,
+            str(scanner.SCANNER_VERSION),
+            scanner.get_library().get_name().lower(),
+            scanner.testcase_string.lower(),
+            file_digest,
+            "skip_bodies" if skip_bodies else "",
+        ]:
+            key.update(item.encode())
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def _get_entry_file(self, key) -> str:
+        return os.path.join(self.path, key[:2], key + ".json")
+
+    def restore(self, key) -> list:
+        """
+        Returns the cached scan result, or None if not found.
+        """
+        try:
+            with open(self._get_entry_file(key), "r") as read_file:
+                return [ModuleScanResult(*entry) for entry in json.load(read_file)]
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def store(self, key, scan_result) -> None:
+        """
+        Adds the scan result to the cache. The entry is written to a
+        temporary file first and then renamed, so other workspaces
+        never see a partial entry.
+        """
+        entry_file = self._get_entry_file(key)
+        temp_file = "{}.tmp_{}".format(entry_file, uuid.uuid4().hex)
+        try:
+            os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+            with open(temp_file, "w") as write_file:
+                json.dump([list(module_result) for module_result in scan_result], write_file)
+            os.replace(temp_file, entry_file)
+        except OSError as e:
+            # Cache not writable
+            self.logger.debug("Unable to store in scan cache: {}".format(e))
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
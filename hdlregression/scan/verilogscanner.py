@@ -24,6 +24,9 @@ from .hdl_regex_pkg import *
 class VerilogScanner(HDLScanner):
     """ """
 
+    LINE_COMMENT = "//"
+    RE_TB_PRAGMA = RE_VERILOG_TB
+
     def __init__(self, project, library, filename, hdlfile):
         super().__init__(project, library, filename, hdlfile)
         self.logger = Logger(name=__name__, project=project)
@@ -44,6 +47,9 @@ class VerilogScanner(HDLScanner):
         self.add_module_to_container(module)
         return module
 
+    def _get_module_from_result(self, module_result) -> VerilogModule:
+        return self.get_verilog_module(module_result.name)
+
     def tokenize(self, file_content_list):
         """
         Scan code for dependencies and modules.
@@ -76,84 +82,11 @@ class VerilogScanner(HDLScanner):
     # ================================================
     #  Pre-processing methods
     # ================================================
-    def _clean_code(self, file_content_list) -> list:
+    def _is_statement_end(self, code) -> bool:
         """
-        Pre-cleaning code to ease tokenizing afterwards:
-         - 1 - check for pragmas
-         - 2 - remove comments (regular and block)
-         - 3 - remove all strings
+        Cleaned statements end with an end keyword, e.g. endmodule.
         """
-        res = []
-        in_block_comment = False
-        append_line = None
-        is_tb = False
-        for line in file_content_list:
-            line = line.strip()
-
-            if append_line is None:
-                append_line = line
-            else:
-                append_line += " " + line
-
-            if not in_block_comment:
-
-                # clear content in strings on this line, except testcases
-                if not re.search(
-                    self.testcase_string, append_line, flags=re.IGNORECASE
-                ):
-                    append_line = re.sub(
-                        '".*?"', '""', append_line, flags=re.IGNORECASE
-                    )
-
-                # check for hdlregression pragmas
-                if re.search(RE_VERILOG_TB, append_line) and is_tb is False:
-                    is_tb = True
-                    append_line += append_line + " "
-
-                # remove comments line, except TB pragma
-                elif re.search(RE_VERILOG_COMMENT_LINE, append_line):
-                    append_line = re.sub(RE_VERILOG_COMMENT_LINE, "", append_line)
-
-                # check if the block comment starts on this line
-                if re.findall(RE_VERILOG_COMMENT_BLOCK_START, append_line):
-
-                    # check if block comment also finishes on this line
-                    if re.findall(
-                        RE_VERILOG_COMMENT_BLOCK_START, append_line
-                    ) and re.findall(RE_VERILOG_COMMENT_BLOCK_END, append_line):
-                        self.logger.debug("[BC_START_COMPLETE] %s" % (append_line))
-                        in_block_comment = False
-                        append_line = re.sub(r"/\*.*\*/", "", append_line)
-
-                    else:
-                        self.logger.debug("[BC_START] %s" % (line))
-                        in_block_comment = True
-                        append_line = re.sub(
-                            RE_VERILOG_COMMENT_BLOCK_START_LINE, "", append_line
-                        )
-
-            elif in_block_comment:
-                # check if the block comment ends on this line
-                if re.findall(RE_VERILOG_COMMENT_BLOCK_END, append_line):
-                    self.logger.debug("[BC_END] %s" % (append_line))
-                    in_block_comment = False
-                    append_line = re.sub(
-                        RE_VERILOG_COMMENT_BLOCK_END_LINE, "", append_line
-                    )
-
-                # still in a block comment -> empty the line
-                else:
-                    append_line = ""
-
-            if (
-                re.search(r"\bend[a-zA-Z_0-9]+", append_line, flags=re.IGNORECASE)
-                or is_tb is True
-            ):
-                res.append(append_line)
-                append_line = None
-                is_tb = False
-
-        return res
+        return re.search(r"\bend[a-zA-Z_0-9]+", code, flags=re.IGNORECASE) is not None
 
 
 class BaseParser:
@@ -14,9 +14,7 @@
 #
 
 import re
-from multiprocessing.pool import ThreadPool
-from _multiprocessing import flags
-from concurrent.futures import ThreadPoolExecutor as ThreadPool
+from bisect import bisect_left
 
 
 from .hdlscanner import HDLScanner
@@ -25,139 +23,362 @@ from ..report.logger import Logger
 from .hdl_regex_pkg import *
 
 
+# regex flags
+_ALL_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE
+
+# Tokens located by the lexer. Each token is a named group in the lexer
+# regex, i.e. the group name gives the token kind. Groups inside a token
+# are prefixed with the token kind to have unique group names.
+# NOTE! Tokens which can match at the same position have to be ordered,
+#       i.e. 'new_package' prior to 'package'.
+_VHDL_TOKEN_LIST = [
+    # testbench pragma
+    ('tb_pragma', r'''
+        --\s*hdlregression\s*:\s*tb
+    '''),
+    # library <name>[, <name>];
+    ('library', r'''
+        \blibrary
+        \s+(?P<library_name>[a-zA-Z_,0-9\s*]+)
+        \s*;
+    '''),
+    # use <lib>.<pkg>[.<suffix>];
+    ('use', r'''
+        \buse
+        \s+(?P<use_library>\w+)
+        \.(?P<use_name>\w+)
+        (?:\.\w+)?
+        \s*;
+    '''),
+    # use entity <lib>.<name>(<arch>)
+    ('use_entity', r'''
+        USE\s+ENTITY\s+
+        (?P<use_entity_library>\w+)\.
+        (?P<use_entity_name>\w+)\s*
+        \((?P<use_entity_arch>\w+)\)
+    '''),
+    # use configuration [<lib>.]<name>;
+    ('use_configuration', r'''
+        \buse
+        \s+configuration
+        \s+
+        (?:(?P<use_configuration_library>\w+)\.)?
+        (?P<use_configuration_name>\w+)
+        \s*;
+    '''),
+    # <label> : entity [<lib>.]<name>[(<arch>)]
+    ('entity_instance', r'''
+        \b\w+
+        \s*\:\s*entity
+        \s+(?P<entity_instance_name>[a-zA-Z_0-9\.]+)
+        (\s*\((?P<entity_instance_arch>\w+)\))?
+        (\s+|\s*;)
+    '''),
+    # <label> : configuration [<lib>.]<name> [generic map] [port map];
+    ('configuration_instance', r'''
+        \b\w+
+        \s*:\s*configuration
+        \s+(?P<configuration_instance_name>[a-zA-Z_0-9\.]+)
+        (?:\s+generic\s+map\s*\(.*?\))?
+        (?:\s+port\s+map\s*\(.*?\))?
+        \s*;
+    '''),
+    # entity <name> is
+    ('entity', r'''
+        \bentity
+        \s+(?P<entity_name>\w+)
+        \s+is\s+
+    '''),
+    # configuration <name> of <entity> is
+    ('configuration', r'''
+        \bconfiguration
+        \s+(?P<configuration_name>\w+)
+        \s+of
+        \s+(?P<configuration_of>\w+)
+        \s+is
+        \s+
+    '''),
+    # context <name> is
+    ('context', r'''
+        \bcontext
+        \s+(?P<context_name>[a-zA-Z_0-9]+)
+        \s+is
+    '''),
+    # architecture <name> of <entity> is
+    ('architecture', r'''
+        \barchitecture
+        \s+(?P<architecture_name>\w+)
+        \s+of
+        \s+(?P<architecture_of>\w+)
+        \s+is
+    '''),
+    # package body <name> is
+    ('package_body', r'''
+        \bpackage
+        \s+body
+        \s+(?P<package_body_name>\w+)
+        \s+is
+        \s+
+    '''),
+    # package <name> is new <lib>.<name>
+    ('new_package', r'''
+        (?P<new_package_is>
+            \bpackage
+            \s+(?P<new_package_name>[a-zA-Z_0-9]+)
+            \s+is
+            \s+
+        )
+        new
+        \s+
+        (?P<new_package_library>[a-zA-Z_0-9]+)
+        \.
+        (?P<new_package_of>[a-zA-Z_0-9]+)
+        \s+
+    '''),
+    # package <name> is
+    ('package', r'''
+        \bpackage
+        \s+(?P<package_name>\w+)
+        \s+is
+        \s+
+    '''),
+    # alias <name> [: <type>] is <name> [<signature>];
+    ('alias', r'''
+        \balias
+        \s+[a-zA-Z_0-9]+
+        (\s*\:\s*[a-zA-Z_\.0-9]+)?
+        \s+is
+        \s+(?P<alias_name>[a-zA-Z_\.0-9]+)
+        (\s+[a-zA-Z_\.0-9]+)?
+        \s*;
+    '''),
+    # <testcase string> = "<testcase>"
+    ('testcase', r'''
+        \s+
+        (\(\s*)?
+        %s\s*
+        =
+        \s*\"(?P<testcase_name>[a-zA-Z_\-0-9]+)\"\s*
+        (\)\s*)?
+    '''),
+]
+
+# Lexer regex for each testcase identifier
+_TOKEN_REGEX_DICT = {}
+
+# Context reference statement: context <lib>.<name>;
+_RE_CONTEXT_REFERENCE = re.compile(r'''
+    (?:^|(?<=;))\s*
+    (?P<pre>end\s+)?
+    context\s+
+    (?P<use>[a-zA-Z_][a-zA-Z_0-9]*\.[a-zA-Z_0-9\.]+)
+    \s*;
+''', flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE)
+
+# Entity end: end [entity] [<name>];
+_RE_ENTITY_END = re.compile(r'''
+    (\b|\s*)
+    end
+    (\s+[a-zA-Z_0-9]+)?
+    (\s+[a-zA-Z_0-9]+)?
+    \s*;
+''', flags=_ALL_FLAGS)
+
+_RE_GENERIC_START = re.compile(r'(\b|\s+)generic\s*\(', flags=_ALL_FLAGS)
+
+# Generic: <name> : <type>
+_RE_GENERIC = re.compile(r'''
+    \b
+    (?P<name>\w+)
+    \s*\:\s*
+    (?P<type>[a-zA-Z_\-\(\)\.]+)
+''', flags=_ALL_FLAGS)
+
+# Configuration end: end [configuration] [<name>]; excluding "end for;"
+_RE_CONFIGURATION_END = re.compile(r'''
+    \bend
+    (\s+configuration)?
+    (?!\s+for\s*;)
+    (\s+\w+)?
+    \s*;
+''', flags=_ALL_FLAGS)
+
+_RE_CONFIGURATION_USE = re.compile(r'''
+    \buse
+    \s+configuration
+    \s+
+    (?:(?P<lib>\w+)\.)?
+    (?P<conf>\w+)
+    \s*;
+''', flags=_ALL_FLAGS)
+
+# Configuration dependency: "for all:", "for" and "use entity"
+_RE_CONFIGURATION_DEP = re.compile(r'''
+    ((\bfor\s+(all\s*:\s*)?)|(\buse\s+entity\s+))
+    (?P<name>[a-zA-Z_0-9\(\)\.]+)
+''', flags=_ALL_FLAGS)
+
+_RE_CONFIGURATION_DEP_MODULE = re.compile(r'''
+    (?P<library>[a-zA-Z_0-9]+\.)?
+    (?P<entity>[a-zA-Z_0-9]+)
+    (?P<arch>\([a-zA-Z_0-9]+\))?
+''', flags=re.IGNORECASE | re.VERBOSE | re.DOTALL)
+
+# Context end: end [context] [<name>];
+_RE_CONTEXT_END = re.compile(r'''
+    \bend
+    (\s+context)?
+    (\s+[a-zA-Z0-0\_]*)?
+    \s*;
+''', flags=_ALL_FLAGS)
+
+_RE_CONTEXT_LIBRARY = re.compile(r'\blibrary\s+(?P<library>\w+)\s*;', flags=re.IGNORECASE)
+
+_RE_CONTEXT_USE = re.compile(r'\buse\s+(?P<lib>\w+)\.(?P<name>\w+)(?:\.\w+)?\s*;', flags=re.IGNORECASE)
+
+
+def _get_token_regex(testcase_string):
+    '''
+    Returns the lexer regex, i.e. all tokens combined into one regex
+    which is compiled once for each testcase identifier.
+    '''
+    token_regex = _TOKEN_REGEX_DICT.get(testcase_string)
+    if token_regex is None:
+        token_list = []
+        for kind, pattern in _VHDL_TOKEN_LIST:
+            if kind == 'testcase':
+                pattern = pattern % testcase_string
+            token_list.append('(?P<%s>%s)' % (kind, pattern))
+        token_regex = re.compile('|'.join(token_list), flags=_ALL_FLAGS)
+        _TOKEN_REGEX_DICT[testcase_string] = token_regex
+    return token_regex
+
+
+# Statements kept when skipping bodies, see VHDLScanner._skip_statement()
+_RE_ENTITY_DECLARATION = re.compile(r'\s*entity\s+\w+\s+is\b', flags=re.IGNORECASE)
+_RE_END_STATEMENT = re.compile(r'\s*end\b', flags=re.IGNORECASE)
+_RE_HEADER_END = re.compile(r'\b(?:is|begin)\s*$', flags=re.IGNORECASE)
+_RE_KEEP_STATEMENT = re.compile(r'''
+    \s*(?:
+        (?:library|use|entity|architecture|package|configuration|context|
+           end|alias|begin|for|component)\b
+        | \w+\s*:\s*(?:(?:entity|configuration)\b|$)
+    )
+''', flags=_ALL_FLAGS)
+
+
 class VHDLScanner(HDLScanner):
     '''
 
     '''
 
+    LINE_COMMENT = '--'
+    RE_TB_PRAGMA = RE_VHDL_TB
+
     def __init__(self, project, library, filename, hdlfile):
         super().__init__(project, library, filename, hdlfile)
         self.logger = Logger(name=__name__, project=project)
         self.library_name = self.get_library().get_name().lower()
+        self.module_dict = {}
         self.project = project
         self.logger.set_level(self.project.settings.get_logger_level())
 
-    def get_entity_module(self, name) -> 'EntityModule':
-        for module in self.container.get():
-            if module.get_is_entity():
-                if module.get_name().lower() == name.lower():
-                    return module
-        # Not found
-        module = EntityModule(name=name,
-                              library=self.get_library(),
-                              logger=self.logger)
-        module.set_filename(self.get_filename())
-        self.add_module_to_container(module)
+    def _get_module(self, module_key, module_class, **kwargs):
+        '''
+        Returns the module with the module key, i.e. module type and
+        name, and creates the module if not found.
+        '''
+        module = self.module_dict.get(module_key)
+        if module is None:
+            module = module_class(library=self.get_library(),
+                                  logger=self.logger,
+                                  **kwargs)
+            module.set_filename(self.get_filename())
+            self.add_module_to_container(module)
+            self.module_dict[module_key] = module
         return module
 
+    def _index_modules(self):
+        '''
+        Index modules from a previous scan of the file by type and name.
+        '''
+        self.module_dict = {}
+        for module in self.get_module_container().get():
+            self.module_dict.setdefault(self._get_module_key(module), module)
+
+    @staticmethod
+    def _get_module_key(module) -> tuple:
+        if module.get_is_architecture():
+            return (module.get_type(), module.get_name(), module.get_arch_of())
+        return (module.get_type(), module.get_name())
+
+    def get_entity_module(self, name) -> 'EntityModule':
+        return self._get_module(('entity', name.lower()), EntityModule, name=name)
+
     def get_context_module(self, name) -> 'ContextModule':
-        for module in self.container.get():
-            if module.get_is_context():
-                if module.get_name().lower() == name.lower():
-                    return module
-        # Not found
-        module = ContextModule(name=name,
-                               library=self.get_library(),
-                               logger=self.logger)
-        module.set_filename(self.get_filename())
-        self.add_module_to_container(module)
-        return module
+        return self._get_module(('context', name.lower()), ContextModule, name=name)
 
     def get_configuration_module(self, name) -> 'ConfigurationModule':
-        for module in self.container.get():
-            if module.get_is_configuration():
-                if module.get_name().lower() == name.lower():
-                    return module
-        # Not found
-        module = ConfigurationModule(name=name,
-                                     library=self.get_library(),
-                                     logger=self.logger)
-        module.set_filename(self.get_filename())
-        self.add_module_to_container(module)
-        return module
+        return self._get_module(('configuration', name.lower()), ConfigurationModule, name=name)
 
     def get_architecture_module(self, name, arch_of_name) -> 'ArchitectureModule':
-        for module in self.container.get():
-            if module.get_is_architecture():
-                if module.get_name().lower() == name.lower() and module.get_arch_of().lower() == arch_of_name.lower():
-                    return module
-        # Not found
-        module = ArchitectureModule(name=name,
-                                    arch_of=arch_of_name,
-                                    library=self.get_library(),
-                                    logger=self.logger)
-        module.set_filename(self.get_filename())
-        self.add_module_to_container(module)
-        return module
+        return self._get_module(('architecture', name.lower(), arch_of_name.lower()),
+                                ArchitectureModule, name=name, arch_of=arch_of_name)
 
     def get_package_module(self, name) -> 'PackageModule':
-        for module in self.container.get():
-            if module.get_is_package():
-                if module.get_name().lower() == name.lower():
-                    return module
-        # Not found
-        module = PackageModule(name=name,
-                               library=self.get_library(),
-                               logger=self.logger)
-        module.set_filename(self.get_filename())
-        self.add_module_to_container(module)
-        return module
+        return self._get_module(('package', name.lower()), PackageModule, name=name)
 
     def get_package_body_module(self, name) -> 'PackageBodyModule':
-        for module in self.container.get():
-            if module.get_is_package_body():
-                if module.get_name().lower() == name.lower():
-                    return module
-        # Not found
-        module = PackageBodyModule(name=name,
-                                   library=self.get_library(),
-                                   logger=self.logger)
-        module.set_filename(self.get_filename())
-        self.add_module_to_container(module)
-        return module
+        return self._get_module(('package_body', name.lower()), PackageBodyModule, name=name)
+
+    def set_scan_result(self, scan_result):
+        self._index_modules()
+        super().set_scan_result(scan_result)
+
+    def _get_module_from_result(self, module_result):
+        if module_result.type == 'entity':
+            return self.get_entity_module(module_result.name)
+        elif module_result.type == 'context':
+            return self.get_context_module(module_result.name)
+        elif module_result.type == 'configuration':
+            return self.get_configuration_module(module_result.name)
+        elif module_result.type == 'architecture':
+            return self.get_architecture_module(module_result.name, module_result.arch_of)
+        elif module_result.type == 'package_body':
+            return self.get_package_body_module(module_result.name)
+        else:
+            return self.get_package_module(module_result.name)
 
     def tokenize(self, file_content_list):
         '''
         Scan code for dependencies and modules.
-        '''
-
-        def devide_list_for_threads(lst, sz): return [
-            lst[i:i + sz] for i in range(0, len(lst), sz)]
 
+        The code is lexed in a single pass, collecting the tokens of
+        each kind in the order they are found. The modules are then
+        built from the tokens, and the code is only searched again
+        inside entity, configuration and context declarations.
+        '''
         code = ' '.join(map(str, file_content_list))
+        self.re_library_match = re.compile(r'%s|work' % self.library_name,
+                                           flags=re.IGNORECASE)
+
+        self._index_modules()
 
-        # Helper method for executing code parsing.
-        def run_parser(parser):
-            parser._parse(code)
+        tokens = VHDLTokens()
+        for match in _get_token_regex(self.testcase_string).finditer(code):
+            tokens.add(match.lastgroup, match)
+            # A new package instance is also a package declaration
+            if match.lastgroup == 'new_package':
+                tokens.add('package', match)
 
-        # Need to run library parser prior to building
+        # Need to parse library clauses prior to building
         # any other module
-        lib_parser = LibraryParser(master=self)
-        lib_parser._parse(code)
-
-        # Setup remaining parsers
-        parsers = []
-        parsers.append(EntityParser(master=self))
-        parsers.append(ConfigurationParser(master=self))
-        parsers.append(ContextParser(master=self))
-        parsers.append(ArchitectureParser(master=self))
-        parsers.append(PackageParser(master=self))
-
-        # Default number of threads
-        num_threads = 1
-        # Adjust to one thread per parser if threading is enabled
-        if self.project.settings.get_num_threads() > 0:
-            num_threads = len(parsers)
-        # Split the list if we use more than 1 thread
-        if num_threads > 1:
-            devided_list = devide_list_for_threads(parsers, num_threads)
-            parsers = []
-            for item in devided_list:
-                parsers += item
-        # Execute using 1 or more threads
-
-        with ThreadPool(num_threads) as thread_pool:
-            thread_pool.map(run_parser, parsers)
+        self._parse_library_clauses(code, tokens)
+        self._parse_entities(code, tokens)
+        self._parse_configurations(code, tokens)
+        self._parse_contexts(code, tokens)
+        self._parse_architectures(tokens)
+        self._parse_packages(tokens)
 
         # Finalize module on end of file if not already done
         for module in self.get_module_container().get():
@@ -166,189 +387,31 @@ class VHDLScanner(HDLScanner):
                                   (module.get_name()))
                 module.set_complete()
 
+    def _lib_match(self, library):
+        # Check with current library
+        return self.re_library_match.match(library)
+
     # ================================================
-    # Pre-processing methods
+    # Module building methods
     # ================================================
 
-    def _check_for_pragmas(self, line) -> bool:
-        '''
-        Check if line has the testbench pragma and
-        set the is_tb variable if found.
-        '''
-        # Check for testbench pragma
-        if re.search(RE_VHDL_TB, line):
-            return True
-        return False
-
-    #
-    # Cleaning methods - called from parent
-    #
-    # 1. empty out strings
-    # 2  locate TB pragma
-    # 3. remove comments
-    # 4. combine lines, should end wit ";"
-    #
-    def _clean_code(self, file_content_list) -> list:
+    def _parse_library_clauses(self, code, tokens):
         '''
-        Pre-cleaning code to ease tokenizing afterwards:
-         - 1 - check for pragmas
-         - 2 - remove comments (regular and block)
-         - 3 - remove all strings
+        Extract library dependencies and
+        module/use dependencies.
         '''
-        res = []
-        in_block_comment = False
-        append_line = None
-        for line in file_content_list:
-            line = line.strip()
-
-            if append_line is None:
-                append_line = line
-            else:
-                append_line += ' ' + line
-
-            if not in_block_comment:
-
-                # check for hdlregression pragmas
-                if self._check_for_pragmas(append_line) is True:
-                    append_line += append_line + ';'
-
-                # clear content in strings on this line, except testcases
-                if not re.search(self.testcase_string, append_line, flags=re.IGNORECASE):
-                    append_line = re.sub(
-                        '".*?"', '""', append_line, flags=re.IGNORECASE)
-
-                # remove comments line, except TB pragma
-                if not re.search(RE_VHDL_TB, append_line.lower()):
-                    append_line = re.sub(RE_VHDL_COMMENT_LINE, '', append_line)
-
-                # check if the block comment starts on this line
-                if re.findall(RE_VHDL_COMMENT_BLOCK_START_LINE, append_line):
-
-                    # check if block comment also finishes on this line
-                    if re.findall(RE_VHDL_COMMENT_BLOCK_START, append_line) and re.findall(RE_VHDL_COMMENT_BLOCK_END, append_line):
-                        self.logger.debug(
-                            '[BC_START_COMPLETE] %s' % (append_line))
-                        in_block_comment = False
-                        append_line = re.sub(
-                            RE_VHDL_COMMENT_BLOCK_START_LINE + RE_VHDL_COMMENT_BLOCK_END, '', append_line)
-                    else:
-                        self.logger.debug('[BC_START] %s' % (append_line))
-                        in_block_comment = True
-                        append_line = re.sub(
-                            RE_VHDL_COMMENT_BLOCK_START_LINE, '', append_line)
-
-            elif in_block_comment:
-                # check if the block comment ends on this line
-                if re.findall(RE_VHDL_COMMENT_BLOCK_END, append_line):
-                    self.logger.debug('[BC_END] %s' % (append_line))
-                    in_block_comment = False
-                    append_line = re.sub(
-                        RE_VHDL_COMMENT_BLOCK_END_LINE, '', append_line)
-
-                # still in a block comment -> empty the line
-                else:
-                    append_line = ''
-
-            if re.search(r';', append_line, flags=re.IGNORECASE):
-                res.append(append_line)
-                append_line = None
-
-        return res
-
-
-class BaseParser:
-
-    # regex flags
-    _ALL_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE
-
-    def __init__(self, master):
-        self.master = master
-        self.module = None
-        self.library_name = self.master.get_library().get_name()
-
-    def _lib_match(self, library):
-        # Check with current library
-        library_match = re.match(r'%s|work' % self.library_name,
-                                 library,
-                                 flags=re.IGNORECASE)
-        return library_match
-
-    def _alias_reference(self, code):
-        # alias AliasName [: DataType] is Name [Signature];
-        re_alias = re.compile(r'''
-                \balias
-                \s+[a-zA-Z_0-9]+            # alias name
-                (\s*\:\s*[a-zA-Z_\.0-9]+)?  # datatype
-                \s+is
-                \s+(?P<name>[a-zA-Z_\.0-9]+) # name
-                (\s+[a-zA-Z_\.0-9]+)?       # signature
-                \s*;
-        ''', flags=self._ALL_FLAGS)
-
-        for match in re.finditer(re_alias, code):
-            alias_name = match.group('name')
-
-            if '.' in alias_name:
-                alias_name = alias_name.split('.')
-                library = alias_name[0]
-                module = alias_name[1]
-
-                # Module in same library
-                if self._lib_match(library):  # library
-                    self.module.add_int_dep(module)
-                # Different library
-                else:
-                    self.module.add_ext_dep(library)
-
-
-class LibraryParser(BaseParser):
-    '''
-    Extract library dependencies and
-    module/use dependencies.
-    '''
-
-    def _parse(self, code):
-        # Match library clauses
-        re_lib = re.compile(r'''
-                            \blibrary
-                            \s+(?P<library>[a-zA-Z_,0-9\s*]+)
-                            \s*;
-                            ''',
-                            flags=self._ALL_FLAGS)
+        for match in tokens.get('library'):
+            library = match.group('library_name')
+            if library:
+                self.add_library_dep(library)
 
-        matches = re.finditer(re_lib, code)
+        for match in tokens.get('use'):
+            if match.group('use_library').lower() in (self.library_name, 'work'):
+                self.add_int_dep(match.group('use_name'))
+            else:
+                self.add_ext_unit_dep(match.group('use_library'), match.group('use_name'))
 
-        for match in matches:
-            library = match.group('library')
-            if library:
-                self.master.add_library_dep(library)
-        self._parse_use(code)
-        self._parse_context(code)
-
-    def _parse_use(self, code):
-        # Match use <lib>.<pkg>[.<suffix>];
-        re_use = re.compile(
-            r'\buse\s+(?P<lib>\w+)\.(?P<pkg>\w+)(?:\.\w+)?\s*;',
-            flags=re.IGNORECASE)
-    
-        for match in re_use.finditer(code):
-            lib = match.group('lib')
-            pkg = match.group('pkg')
-    
-            if lib.lower() in (self.library_name.lower(), 'work'):
-                self.master.add_int_dep(pkg)
-
-
-    def _parse_context(self, code):
-        re_context = re.compile(r'''
-            ^\s*                                   # optional leading spaces
-            (?P<pre>end\s+)?                       # optional "end"
-            context\s+
-            (?P<use>[a-zA-Z_][a-zA-Z_0-9]*\.[a-zA-Z_0-9\.]+)  # lib.pkg[.suffix]
-            \s*;
-            ''', flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE)
-
-        for match in re_context.finditer(code):
+        for match in _RE_CONTEXT_REFERENCE.finditer(code):
             if match.group('pre'):
                 continue  # skip "end context ..."
 
@@ -361,485 +424,313 @@ class LibraryParser(BaseParser):
             lib = parts[0]
             name = parts[1]  # this is typically the context/package name
 
-            if lib.lower() in (self.library_name.lower(), 'work'):
-                self.master.add_int_dep(name)
+            if lib.lower() in (self.library_name, 'work'):
+                self.add_int_dep(name)
             else:
-                pass  # optionally: self.master.add_ext_dep(name)
-
+                self.add_ext_unit_dep(lib, name)
 
-class ContextParser(BaseParser):
-    '''
-    Extract context modules with dependencies.
-    '''
-
-    def _parse(self, code):
-        re_start = re.compile(r'''
-                            \bcontext
-                            \s+(?P<context_name>[a-zA-Z_0-9]+)
-                            \s+is
-        ''', flags=self._ALL_FLAGS)
-
-        re_end = re.compile(r'''
-                            \bend
-                            (\s+context)?
-                            (\s+[a-zA-Z0-0\_]*)?
-                            \s*;
-        ''', flags=self._ALL_FLAGS)
-
-        start_matches = re.finditer(re_start, code)
+    def _parse_entities(self, code, tokens):
+        '''
+        Extract entity modules and generics.
+        '''
+        # Set previous end to start of file
+        prev_end = 0
 
-        for start_match in start_matches:
-            end_match = re_end.search(code, start_match.end())
+        for match in tokens.get('entity'):
+            is_tb = tokens.exists('tb_pragma', prev_end, match.start())
+            end_match = _RE_ENTITY_END.search(code, match.end())
 
-            name = start_match.group('context_name')
-            self.module = self.master.get_context_module(name)
+            module = self.get_entity_module(name=match.group('entity_name'))
+            module.add_int_dep(self.get_int_dep())
+            module.add_ext_dep(self.get_library_dep())
+            module.add_ext_unit_dep(self.get_ext_unit_dep())
+            if is_tb:
+                module.set_is_tb()
             if end_match:
-                self._parse_dependencies(code[start_match.end():end_match.start()])
+                self._parse_generics(module, code[match.end():end_match.start()])
+                prev_end = end_match.end()
             else:
-                self.logger.warning('Unable to detect context end.')
+                prev_end = match.end()
 
-    def _parse_dependencies(self, code):
-        # Match all `library <name>;` lines
-        re_lib = re.compile(r'\blibrary\s+(?P<library>\w+)\s*;', flags=re.IGNORECASE)
-        for match in re_lib.finditer(code):
-            lib = match.group('library')
-            if not self._lib_match(lib):
-                self.module.add_ext_dep(lib)
+    def _parse_generics(self, module, code):
+        '''
+        Extract entity generics.
+        '''
+        gc_start = _RE_GENERIC_START.search(code)
+        if gc_start:
+            for match in _RE_GENERIC.finditer(code, gc_start.end()):
+                if match.group('type').lower() not in ['in', 'out', 'inout', 'buffer' 'linkage']:
+                    module.add_generic(match.group('name'))
 
-        # Match all `use <library>.<package>[.<suffix>];` lines
-        re_use = re.compile(r'\buse\s+(?P<lib>\w+)\.(?P<name>\w+)(?:\.\w+)?\s*;', flags=re.IGNORECASE)
-        for match in re_use.finditer(code):
-            lib = match.group('lib')
-            name = match.group('name')
+    def _parse_configurations(self, code, tokens):
+        '''
+        Extract configuration modules with
+        dependencies.
+        '''
+        for match in tokens.get('configuration'):
+            end_match = _RE_CONFIGURATION_END.search(code, match.end())
 
-            if self._lib_match(lib):
-                self.module.add_int_dep(name)
+            module = self.get_configuration_module(match.group('configuration_name'))
+            module.add_int_dep(match.group('configuration_of'))
+            if end_match:
+                self._parse_configuration_dependencies(module, code[match.end():end_match.start()])
             else:
-                self.module.add_ext_dep(name)
-
-
-class ConfigurationParser(BaseParser):
-    '''
-    Exatract configuration modules with
-    dependencies.
-    '''
+                self.logger.warning('Unable to detect configuration end.')
 
-    def _parse(self, code):
-        # Match: configuration <nn> of <nn> is
-        re_start = re.compile(r'''
-                                \bconfiguration
-                                \s+(?P<config_name>\w+)
-                                \s+of
-                                \s+(?P<config_of>\w+)
-                                \s+is
-                                \s+
-                                ''', flags=self._ALL_FLAGS)
-
-        # Match: end [configuration] [<nn>];   -- exclude "end for;"
-        re_end = re.compile(r'''
-                            \bend
-                            (\s+configuration)?
-                            (?!\s+for\s*;)
-                            (\s+\w+)?
-                            \s*;
-                            ''', flags=self._ALL_FLAGS)
-
-        start_matches = re.finditer(re_start, code)
-
-        for start_match in start_matches:
-            end_match = re_end.search(code, start_match.end())
-
-            name = start_match.group('config_name')
-            self.module = self.master.get_configuration_module(name)
-            self.module.add_int_dep(start_match.group('config_of'))
-            self._parse_dependencies(code[start_match.end():end_match.start()])
-
-    def _parse_dependencies(self, code):
+    def _parse_configuration_dependencies(self, module, code):
         # Capture "use configuration ..." inside configuration bodies
-        re_use_cfg = re.compile(r'''
-            \buse
-            \s+configuration
-            \s+
-            (?:(?P<lib>\w+)\.)?       # optional library
-            (?P<conf>\w+)
-            \s*;
-        ''', flags=self._ALL_FLAGS)
-
-        for m in re_use_cfg.finditer(code):
-            lib = m.group('lib')
-            conf = m.group('conf')
-            if lib is None or re.match(r'%s|work' % self.module.get_library().get_name(),
-                                       lib, flags=re.IGNORECASE):
-                self.module.add_int_dep(conf)
+        for match in _RE_CONFIGURATION_USE.finditer(code):
+            lib = match.group('lib')
+            conf = match.group('conf')
+            if lib is None or self._lib_match(lib):
+                module.add_int_dep(conf)
             else:
                 # keep track that another library is needed
-                self.module.add_ext_dep(lib)
-
-        # Match "for all:", "for" and "use entity"
-        re_dep = re.compile(r'''
-                            ((\bfor\s+(all\s*:\s*)?)|(\buse\s+entity\s+))
-                            (?P<name>[a-zA-Z_0-9\(\)\.]+)
-                            ''', flags=self._ALL_FLAGS)
-
-        # Match dependency
-        re_dep_mod = re.compile(r'''
-                                (?P<library>[a-zA-Z_0-9]+\.)?
-                                (?P<entity>[a-zA-Z_0-9]+)
-                                (?P<arch>\([a-zA-Z_0-9]+\))?
-        ''', flags=re.IGNORECASE | re.VERBOSE | re.DOTALL)
-
-        matches = re.finditer(re_dep, code)
-        for match in matches:
-            item = match.group('name')
-            dependency = re.match(re_dep_mod, item)
+                module.add_ext_dep(lib)
+                module.add_ext_unit_dep('{}.{}'.format(lib, conf))
 
-            library = dependency.group('library')
+        for match in _RE_CONFIGURATION_DEP.finditer(code):
+            dependency = _RE_CONFIGURATION_DEP_MODULE.match(match.group('name'))
 
-            if library is not None:
-                library = str(library)
-                library_match = re.match(r'%s|work' % self.module.get_library().get_name(),
-                                         library,
-                                         flags=re.IGNORECASE)
-                if not library_match:
-                    library = library.replace('.', '')
-                    self.module.add_ext_dep(library)
+            library = dependency.group('library')
+            if library is not None and not self._lib_match(library):
+                module.add_ext_dep(library.replace('.', ''))
+                module.add_ext_unit_dep(library + dependency.group('entity'))
 
-            entity = dependency.group('entity')
-            self.module.add_int_dep(entity)
+            module.add_int_dep(dependency.group('entity'))
 
             arch = dependency.group('arch')
             if arch:
-                arch = arch.replace('(', '').replace(')', '')
-                # Check if same library
-                self.module.add_int_dep(arch)
-
+                module.add_int_dep(arch.replace('(', '').replace(')', ''))
 
-class EntityParser(BaseParser):
-    '''
-    Extract entity modules and generics.
-    '''
+    def _parse_contexts(self, code, tokens):
+        '''
+        Extract context modules with dependencies.
+        '''
+        for match in tokens.get('context'):
+            end_match = _RE_CONTEXT_END.search(code, match.end())
 
-    def _parse(self, code):
-        # testbench pragma
-        re_tb = re.compile(r'\s*--\s*hdlregression\s*:\s*tb\s*',
-                           flags=self._ALL_FLAGS)
-        # entity definition start
-        re_start = re.compile(r'''
-                        \bentity
-                        \s+
-                        (?P<name>\w+)
-                        \s+
-                        is\s+''', flags=self._ALL_FLAGS)
-        # entity definition end
-        re_end = re.compile(r'''
-                        (\b|\s*)
-                        end
-                        (\s+[a-zA-Z_0-9]+)? # entity/entity_name
-                        (\s+[a-zA-Z_0-9]+)? # entity/entity_name
-                        \s*;''', flags=self._ALL_FLAGS)
-
-        start_matches = re.finditer(re_start, code)
-        # Set previous end to start of file
-        end_match = re.match(r'^', code)
+            module = self.get_context_module(match.group('context_name'))
+            if end_match:
+                self._parse_context_dependencies(module, code[match.end():end_match.start()])
+            else:
+                self.logger.warning('Unable to detect context end.')
 
-        for start_match in start_matches:
-            is_tb = re.search(re_tb, code[end_match.end():start_match.start()])
-            entity_name = start_match.group('name')
-            end_match = re_end.search(code, start_match.end())
+    def _parse_context_dependencies(self, module, code):
+        # Match all `library <name>;` lines
+        for match in _RE_CONTEXT_LIBRARY.finditer(code):
+            lib = match.group('library')
+            if not self._lib_match(lib):
+                module.add_ext_dep(lib)
 
-            self.module = self.master.get_entity_module(name=entity_name)
-            self.module.add_int_dep(self.master.get_int_dep())
-            self.module.add_ext_dep(self.master.get_library_dep())
-            if is_tb:
-                self.module.set_is_tb()
-            if end_match:
-                self._generics(code[start_match.end():end_match.start()])
+        # Match all `use <library>.<package>[.<suffix>];` lines
+        for match in _RE_CONTEXT_USE.finditer(code):
+            if self._lib_match(match.group('lib')):
+                module.add_int_dep(match.group('name'))
+            else:
+                module.add_ext_dep(match.group('name'))
+                module.add_ext_unit_dep('{}.{}'.format(match.group('lib'), match.group('name')))
 
-    def _generics(self, code):
+    def _parse_architectures(self, tokens):
         '''
-        Extract entity generics.
+        Extract architecture modules, sequencer testcases
+        and instantiations.
         '''
-        gc_start = re.search(
-            r'(\b|\s+)generic\s*\(', code, flags=self._ALL_FLAGS)
-        if gc_start:
-            code = code[gc_start.end():]
+        body_pos = None
+        for match in tokens.get('architecture'):
+            module = self.get_architecture_module(name=match.group('architecture_name'),
+                                                  arch_of_name=match.group('architecture_of'))
+            module.add_int_dep(self.get_int_dep())
+            module.add_ext_dep(self.get_library_dep())
+            module.add_ext_unit_dep(self.get_ext_unit_dep())
+            module.add_int_dep(match.group('architecture_of'))
+
+            # Parse code following the first architecture only
+            # NOTE! Multiple architectures inside one file is legal, i.e.
+            #       can lead to problems when detecting testcases.
+            if body_pos is None:
+                body_pos = match.end()
+                for testcase_match in tokens.get('testcase', body_pos):
+                    self.add_testcase(str(testcase_match.group('testcase_name')))
+                self._parse_instantiations(module, tokens, body_pos)
 
-            matches = re.finditer(r'''
-                            \b
-                            (?P<name>\w+)
-                            \s*\:\s*
-                            (?P<type>[a-zA-Z_\-\(\)\.]+)
-                            ''', code, flags=self._ALL_FLAGS)
+            # Add sequencer testcases to module
+            for testcase in self.get_testcase():
+                module.add_testcase(testcase)
 
-            for match in matches:
-                if match.group('type').lower() not in ['in', 'out', 'inout', 'buffer' 'linkage']:
-                    self.module.add_generic(match.group('name'))
+    def _parse_instantiations(self, module, tokens, pos):
+        for match in tokens.get('entity_instance', pos):
+            self._add_dep_with_library(module, match.group('entity_instance_name'))
 
+        for match in tokens.get('use_entity', pos):
+            if self._lib_match(match.group('use_entity_library')):
+                module.add_int_dep(match.group('use_entity_name'))
+            else:
+                module.add_ext_dep(match.group('use_entity_library'))
+                module.add_ext_unit_dep('{}.{}'.format(match.group('use_entity_library'),
+                                                       match.group('use_entity_name')))
 
-class ArchitectureParser(BaseParser):
-    '''
-    Extract architecture modules and
-    run the TestcaseParser inside relevant code section.
-    '''
+        for match in tokens.get('configuration_instance', pos):
+            self._add_dep_with_library(module, match.group('configuration_instance_name'))
 
-    def _parse(self, code):
-        re_arch = re.compile(r'''
-                    \b
-                    architecture
-                    \s+
-                    (?P<name>\w+)
-                    \s+
-                    of
-                    \s+
-                    (?P<entity>\w+)
-                    \s+
-                    is
-                    ''', flags=self._ALL_FLAGS)
-
-        matches = re.finditer(re_arch, code)
-        search_code = None
-        for match in matches:
-
-            self.module = self.master.get_architecture_module(name=match.group('name'),
-                                                              arch_of_name=match.group('entity'))
-            self.module.add_int_dep(self.master.get_int_dep())
-            self.module.add_ext_dep(self.master.get_library_dep())
-            self.module.add_int_dep(match.group('entity'))
-
-            # Parse sub section of code only once
-            # NOTE! Multiple architectures inside one file is legal, i.e.
-            #       can lead to problems when detecting testcases.
-            if search_code is None:
-                search_code = code[match.end():]
-                # Parse sequencer testcases
-                testcase_parser = TestcaseParser(master=self.master)
-                testcase_parser._parse(search_code)
-                # Parse instantiations
-                self._instantiation_parse(search_code)
+        self._parse_alias(module, tokens, pos)
 
-            # Add sequencer testcases to module
-            for testcase in self.master.get_testcase():
-                self.module.add_testcase(testcase)
-
-    def _instantiation_parse(self, code):
-        # Parse instantiations in architecture part
-        self._entity_instantiation(code)
-        self._configuration_instantiation(code)
-        self._alias_reference(code)
-        self._use_configuration_in_arch(code)
-
-                
-    def _entity_instantiation(self, code):
-        re_entity = re.compile(r'''
-                            \b\w+                           # label
-                            \s*\:\s*entity                  # : entity keyword
-                            \s+(?P<name>[a-zA-Z_0-9\.]+)    # entity name
-                            (\s*\((?P<arch>\w+)\))?         # possible (architecture)
-                            (\s+|\s*;)                      # whitespace
-                            ''', flags=self._ALL_FLAGS)
-
-        re_use_entity = re.compile(r'''
-                            USE\s+ENTITY\s+                 # "USE ENTITY" keywords
-                            (?P<library>\w+)\.              # library name (e.g., "work")
-                            (?P<name>\w+)\s*                # entity name (e.g., "hdlc_LPF_DF_shift_adders")
-                            \((?P<arch>\w+)\)               # architecture (e.g., "rtl")
-                            ''', flags=self._ALL_FLAGS)
-
-        for match in re.finditer(re_entity, code):
-            self._process_match(match)
-
-        for match in re.finditer(re_use_entity, code):
-            library = match.group('library')
-            entity_name = match.group('name')
-            arch = match.group('arch')
-
-            # Handling internal or external dependencies
-            if self._lib_match(library):
-                self.module.add_int_dep(entity_name)
+        for match in tokens.get('use_configuration', pos):
+            lib = match.group('use_configuration_library')
+            if lib is None or self._lib_match(lib):
+                module.add_int_dep(match.group('use_configuration_name'))
             else:
-                self.module.add_ext_dep(library)
-    
-    def _process_match(self, match):
-        inst_name = match.group('name')
+                module.add_ext_dep(lib)
+                module.add_ext_unit_dep('{}.{}'.format(lib, match.group('use_configuration_name')))
 
+    def _add_dep_with_library(self, module, name):
         # With library
-        if '.' in inst_name:
-            inst_name = inst_name.split('.')
-            library = inst_name[0]
-            module = inst_name[1]
-
+        if '.' in name:
+            name = name.split('.')
+            library = name[0]
             # Module in same library
             if self._lib_match(library):
-                self.module.add_int_dep(module)
+                module.add_int_dep(name[1])
             # Different library
             else:
-                self.module.add_ext_dep(library)
+                module.add_ext_dep(library)
+                module.add_ext_unit_dep('{}.{}'.format(library, name[1]))
         # Without library
         else:
-            self.module.add_int_dep(inst_name)
-
-
-    def _configuration_instantiation(self, code):
-        # Configuration instantiations
-        re_configuration = re.compile(r'''
-            \b\w+                           # label
-            \s*:\s*configuration
-            \s+(?P<name>[a-zA-Z_0-9\.]+)    # configuration name (with optional lib.)
-            (?:\s+generic\s+map\s*\(.*?\))? # optional generic map
-            (?:\s+port\s+map\s*\(.*?\))?    # optional port map
-            \s*;                            # semicolon
-        ''', flags=self._ALL_FLAGS | re.DOTALL | re.VERBOSE)
-
-        for match in re.finditer(re_configuration, code):
-            conf_name = match.group('name')
-
-            # With library
-            if '.' in conf_name:
-                conf_name = conf_name.split('.')
-                library = conf_name[0]
-                configuration = conf_name[1]
-
-                # Module in same library
-                if self._lib_match(library):
-                    self.module.add_int_dep(configuration)
-                # Different library
-                else:
-                    self.module.add_ext_dep(library)
-            # Without library
-            else:
-                self.module.add_int_dep(conf_name)
+            module.add_int_dep(name)
 
-    def _use_configuration_in_arch(self, code):
-        re_use_cfg = re.compile(r'''
-            \buse
-            \s+configuration
-            \s+
-            (?:(?P<lib>\w+)\.)?
-            (?P<conf>\w+)
-            \s*;
-        ''', flags=re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE)
-
-        for m in re_use_cfg.finditer(code):
-            lib = m.group('lib')
-            conf = m.group('conf')
-            if lib is None or self._lib_match(lib):
-                self.module.add_int_dep(conf)
-            else:
-                self.module.add_ext_dep(lib)
-
-class TestcaseParser(BaseParser):
-    '''
-    Extract testcase defines from testbench sequencer,
-    run from ArchitectureParser.
-    '''
-
-    def _parse(self, code):
-        # Match testcases
-        re_tc = re.compile(r'''
-                            \s+
-                            (\(\s*)?                                    # possible bracket start
-                            %s\s*                                       # testcase generic string
-                            =
-                            \s*\"(?P<testcase>[a-zA-Z_\-0-9]+)\"\s*     # testcase name
-                            (\)\s*)?                                    # possible bracket end
-        ''' % self.master.testcase_string, flags=self._ALL_FLAGS)
-
-        matches = re.finditer(re_tc, code)
-        for match in matches:
-            self.master.add_testcase(str(match.group('testcase')))
-
-
-class PackageParser(BaseParser):
-    '''
-    Extract package modules.
-    '''
-
-    def _parse(self, code):
-        # Package declaration, excluding new instances
-        re_package_dec = re.compile(r'''
-                    \bpackage
-                    \s+(?P<name_dec>\w+)
-                    \s+is
-                    \s+
-                     (?!\s+new\s+)
-        ''', flags=self._ALL_FLAGS)
-
-        # Package body
-        re_package_bdy = re.compile(r'''
-                    \bpackage
-                    \s+body
-                    \s+(?P<name_bdy>\w+)
-                    \s+is
-                    \s+
-        ''', flags=self._ALL_FLAGS)
+    def _parse_alias(self, module, tokens, pos):
+        # alias AliasName [: DataType] is Name [Signature];
+        for match in tokens.get('alias', pos):
+            alias_name = match.group('alias_name')
+            if '.' in alias_name:
+                self._add_dep_with_library(module, alias_name)
 
+    def _parse_packages(self, tokens):
+        '''
+        Extract package modules.
+        '''
         # Package declaration section
-        for match in re.finditer(re_package_dec, code):
-            pkg_name = match.group('name_dec').lower()
-            # if pkg_name not in pkg_list:
-            self.module = self.master.get_package_module(name=pkg_name)
-            self.module.add_int_dep(self.master.get_int_dep())
-            self.module.add_ext_dep(self.master.get_library_dep())
-            pkg_module = self.module
+        for match in tokens.get('package'):
+            if match.lastgroup == 'new_package':
+                pkg_name = match.group('new_package_name').lower()
+                pos = match.end('new_package_is')
+            else:
+                pkg_name = match.group('package_name').lower()
+                pos = match.end()
+
+            module = self.get_package_module(name=pkg_name)
+            module.add_int_dep(self.get_int_dep())
+            module.add_ext_dep(self.get_library_dep())
+            module.add_ext_unit_dep(self.get_ext_unit_dep())
 
-            self._alias_reference(code[match.end():])
+            self._parse_alias(module, tokens, pos)
 
-            new_pkg_list = self._new_package_inst(code[match.end():])
-            for new_pkg_module in new_pkg_list:
-                pkg_module.add_int_dep(new_pkg_module.get_name())
+            for new_pkg_module in self._parse_new_packages(tokens, pos):
+                module.add_int_dep(new_pkg_module.get_name())
 
         # Package body section
-        for match in re.finditer(re_package_bdy, code):
-            pkg_name = match.group('name_bdy').lower()
+        for match in tokens.get('package_body'):
+            pkg_name = match.group('package_body_name').lower()
 
-            self.module = self.master.get_package_body_module(name=pkg_name)
-            self.module.add_int_dep(pkg_name)
-            self.module.add_int_dep(self.master.get_int_dep())
-            self.module.add_ext_dep(self.master.get_library_dep())
-            pkg_body_module = self.module
+            module = self.get_package_body_module(name=pkg_name)
+            module.add_int_dep(pkg_name)
+            module.add_int_dep(self.get_int_dep())
+            module.add_ext_dep(self.get_library_dep())
+            module.add_ext_unit_dep(self.get_ext_unit_dep())
 
-            self._alias_reference(code[match.end():])
+            self._parse_alias(module, tokens, match.end())
 
-            new_pkg_list = self._new_package_inst(code[match.end():])
-            for new_pkg_module in new_pkg_list:
-                pkg_body_module.add_int_dep(new_pkg_module.get_name())
+            for new_pkg_module in self._parse_new_packages(tokens, match.end()):
+                module.add_int_dep(new_pkg_module.get_name())
 
         # Search for new package instances
-        self._new_package_inst(code)
-
-    def _new_package_inst(self, code) -> list:
-        # New package instantiation
-        _RE_NEW_PACKAGE = re.compile(r'''
-            \bpackage
-            \s+
-            (?P<new_pkg_name>[a-zA-Z_0-9]+)
-            \s+is
-            \s+new
-            \s+
-            (?P<library>[a-zA-Z_0-9]+)
-            \.
-            (?P<name>[a-zA-Z_0-9]+)
-            \s+
-        ''', flags=self._ALL_FLAGS)
+        self._parse_new_packages(tokens)
 
+    def _parse_new_packages(self, tokens, pos=0) -> list:
         modules = []
 
         # New package instantiations
-        for match in re.finditer(_RE_NEW_PACKAGE, code):
-            new_pkg = match.group('new_pkg_name')
-            library = match.group('library')
-            package = match.group('name')
+        for match in tokens.get('new_package', pos):
+            library = match.group('new_package_library')
 
-            self.module = self.master.get_package_module(name=new_pkg)
+            module = self.get_package_module(name=match.group('new_package_name'))
             # Module in same library
             if self._lib_match(library):
-                self.module.add_int_dep(package)
-                self.module.add_int_dep(self.master.get_int_dep())
-                self.module.add_ext_dep(self.master.get_library_dep())
-                modules.append(self.module)
+                module.add_int_dep(match.group('new_package_of'))
+                module.add_int_dep(self.get_int_dep())
+                module.add_ext_dep(self.get_library_dep())
+                module.add_ext_unit_dep(self.get_ext_unit_dep())
+                modules.append(module)
 
             # Different library
             else:
-                self.module.add_ext_dep(library)
+                module.add_ext_dep(library)
+                module.add_ext_unit_dep('{}.{}'.format(library, match.group('new_package_of')))
 
         return modules
+
+    # ================================================
+    # Pre-processing methods
+    # ================================================
+
+    def _clean_code(self, file_content_list, skip_bodies=False):
+        self.in_entity_declaration = False
+        return super()._clean_code(file_content_list, skip_bodies)
+
+    def _skip_statement(self, code) -> bool:
+        '''
+        Statements in entity declarations and statements starting with
+        a design unit, context clause, alias, configuration item or
+        instantiation are kept, i.e. other statements in bodies are
+        skipped.
+        '''
+        if _RE_ENTITY_DECLARATION.match(code):
+            self.in_entity_declaration = True
+            return False
+        if self.in_entity_declaration:
+            if _RE_END_STATEMENT.match(code):
+                self.in_entity_declaration = False
+            return False
+        return _RE_KEEP_STATEMENT.match(code) is None
+
+    def _is_header_end(self, code) -> bool:
+        return _RE_HEADER_END.search(code) is not None
+
+    def _is_statement_end(self, code) -> bool:
+        '''
+        Cleaned statements end with ";".
+        '''
+        return ';' in code
+
+
+class VHDLTokens:
+    '''
+    Tokens found by the lexer, stored by kind in the
+    order they appear in the code.
+    '''
+
+    def __init__(self):
+        self.token_dict = {}
+        self.start_dict = {}
+
+    def add(self, kind, match):
+        self.token_dict.setdefault(kind, []).append(match)
+        self.start_dict.setdefault(kind, []).append(match.start())
+
+    def get(self, kind, pos=0) -> list:
+        '''
+        Returns the tokens of a kind starting at or after pos.
+        '''
+        token_list = self.token_dict.get(kind, [])
+        if pos == 0 or not token_list:
+            return token_list
+        return token_list[bisect_left(self.start_dict[kind], pos):]
+
+    def exists(self, kind, start, end) -> bool:
+        '''
+        Returns True if a token of a kind starts in [start, end).
+        '''
+        start_list = self.start_dict.get(kind, [])
+        idx = bisect_left(start_list, start)
+        return idx < len(start_list) and start_list[idx] < end
@@ -16,6 +16,7 @@
 import os
 import platform
 import datetime
+import shutil
 import subprocess
 from abc import ABC, abstractmethod
 
@@ -52,10 +53,26 @@ class HDLRegressionSettings:
         self.run_success = None
         self.sim_success = False
         self.sim_time = None
+        self.test_duration_dict = {}
+        self.test_verdict_dict = {}
         self.threading = False
         self.num_threads = 0
+        self.compile_threads = 1
+        self.compile_batch = False
+        self.compile_cache_path = None
+        self.compile_cache_size = 5000
+        self.scan_processes = 0
+        self.scan_cache = True
+        self.scan_large_file_size = 50
         self.no_sim = False
         self.no_compile = False
+        self.elaboration_cache = False
+        self.jit_time_limit = None
+        self.ghdl_backend = None
+        self.simulator_workers = False
+        self.simulator_worker_timeout = None
+        self.verdict_cache = False
+        self.force_simulation = False
         self.show_err_warn_output = False
         self.use_log_color = True
 
@@ -85,6 +102,7 @@ class HDLRegressionSettings:
         self.list_testcase = False
         self.export_testcases_json_path = None
         self.list_compile_order = False
+        self.list_test_selection = False
         self.list_testgroup = False
         self.list_dependencies = False
 
@@ -98,8 +116,8 @@ class HDLRegressionSettings:
         # Initialize a available simulator settings obj
         self.simulator_cli_select = False
         self.simulator_detector = SimulatorDetector()
-        self.simulator_info = self.simulator_detector.get_simulators_info()
-        self.simulator_settings = self.simulator_detector.get_simulator_settings_object(self.simulator_info.get("simulator_name"))
+        self.simulator_settings = self.simulator_detector.get_simulator_settings_object(
+            self.simulator_detector.get_default_simulator_name())
 
         self.libraries = []
 
@@ -122,7 +140,7 @@ class HDLRegressionSettings:
 
     def get_python_exec(self) -> str:
         if self.python_exec is None:
-            self.python_exec = self.detect_python_exec()
+            self.detect_python_exec()
         return self.python_exec
 
     def set_return_code(self, return_code: int):
@@ -225,6 +243,78 @@ class HDLRegressionSettings:
     def get_num_threads(self) -> int:
         return self.num_threads
 
+    def set_compile_threads(self, num_threads) -> None:
+        """
+        Maximum number of libraries compiled concurrently.
+        """
+        self.compile_threads = max(1, int(num_threads))
+
+    def get_compile_threads(self) -> int:
+        return self.compile_threads
+
+    def set_compile_batch(self, enable=True) -> None:
+        """
+        Compile consecutive files with identical compile options
+        in one compiler call.
+        """
+        self.compile_batch = enable
+
+    def get_compile_batch(self) -> bool:
+        return self.compile_batch
+
+    def set_compile_cache_path(self, path) -> None:
+        """
+        Folder for compiled libraries shared by several workspaces,
+        the compile cache is disabled when None.
+        """
+        self.compile_cache_path = os.path.abspath(path) if path else None
+
+    def get_compile_cache_path(self) -> str:
+        return getattr(self, "compile_cache_path", None)
+
+    def set_compile_cache_size(self, size_mb) -> None:
+        self.compile_cache_size = int(size_mb)
+
+    def get_compile_cache_size(self) -> int:
+        return getattr(self, "compile_cache_size", 5000)
+
+    def set_scan_processes(self, num_processes) -> None:
+        """
+        Number of processes used for scanning changed files,
+        files are scanned by the library threads when 0.
+        """
+        self.scan_processes = max(0, int(num_processes))
+
+    def get_scan_processes(self) -> int:
+        return getattr(self, "scan_processes", 0)
+
+    def set_scan_cache(self, scan_cache) -> None:
+        """
+        Scan cache folder, i.e. a folder shared by several workspaces,
+        True for a scan cache in the output folder or False to disable.
+        """
+        if isinstance(scan_cache, str):
+            self.scan_cache = os.path.abspath(scan_cache)
+        else:
+            self.scan_cache = bool(scan_cache)
+
+    def get_scan_cache_path(self) -> str:
+        scan_cache = getattr(self, "scan_cache", True)
+        if scan_cache is True:
+            return os.path.join(self.get_output_path(), "scan_cache")
+        return scan_cache or None
+
+    def set_scan_large_file_size(self, size_mb) -> None:
+        """
+        VHDL files larger than this size (MB) without a testbench are
+        scanned for design unit headers and dependencies only,
+        disabled when 0.
+        """
+        self.scan_large_file_size = max(0, float(size_mb))
+
+    def get_scan_large_file_size(self) -> float:
+        return getattr(self, "scan_large_file_size", 50)
+
     # ----------------------------------
     # Running
     # ----------------------------------
@@ -266,6 +356,41 @@ class HDLRegressionSettings:
     def get_sim_time(self) -> str:
         return self.sim_time
 
+    def set_test_duration(self, test_key, duration):
+        """
+        Store the wall time (in milliseconds) of the last run of a test.
+        """
+        self.test_duration_dict[test_key] = duration
+
+    def get_test_duration(self, test_key) -> int:
+        """
+        Returns the last recorded wall time (in milliseconds) of a test,
+        or None if the test has not been run before.
+        """
+        return self.test_duration_dict.get(test_key)
+
+    def get_test_duration_dict(self) -> dict:
+        return self.test_duration_dict
+
+    def set_test_verdict(self, test_key, verdict_hash):
+        """
+        Store the hash of the inputs of a passing test, or remove
+        it when the test did not pass.
+        """
+        if not hasattr(self, "test_verdict_dict"):
+            self.test_verdict_dict = {}
+        if verdict_hash is None:
+            self.test_verdict_dict.pop(test_key, None)
+        else:
+            self.test_verdict_dict[test_key] = verdict_hash
+
+    def get_test_verdict(self, test_key) -> str:
+        """
+        Returns the hash of the inputs of the last passing run of
+        a test, or None if the test has not passed.
+        """
+        return getattr(self, "test_verdict_dict", {}).get(test_key)
+
     def set_output_path(self, output_path):
         self.output_path = output_path
 
@@ -278,6 +403,9 @@ class HDLRegressionSettings:
     def get_test_path(self) -> str:
         return os.path.join(self.get_output_path(), "test")
 
+    def get_elaboration_path(self) -> str:
+        return os.path.join(self.get_output_path(), "elaboration")
+
     def set_library_name(self, library_name):
         self.library_name = library_name
 
@@ -341,6 +469,12 @@ class HDLRegressionSettings:
     def get_list_compile_order(self) -> bool:
         return self.list_compile_order
 
+    def set_list_test_selection(self, list_test_selection):
+        self.list_test_selection = list_test_selection
+
+    def get_list_test_selection(self) -> bool:
+        return getattr(self, "list_test_selection", False)
+
     def set_list_dependencies(self, enable=True):
         self.list_dependencies = enable
 
@@ -455,7 +589,7 @@ class HDLRegressionSettings:
         return self.simulator_settings
 
     def get_simulators_info(self) -> dict:
-        return self.simulator_info
+        return self.simulator_detector.get_simulators_info()
 
     def set_simulator_name(self, simulator_name, cli=False):
         if cli is True or self.simulator_cli_select is False:
@@ -529,6 +663,66 @@ class HDLRegressionSettings:
     def get_no_compile(self) -> bool:
         return self.no_compile
 
+    def set_elaboration_cache(self, enable=True):
+        self.elaboration_cache = enable
+
+    def get_elaboration_cache(self) -> bool:
+        return self.elaboration_cache
+
+    def set_jit_time_limit(self, time_limit):
+        """
+        Tests with a previous run time (in seconds) below the limit
+        are elaborated using JIT instead of the elaboration cache.
+        """
+        self.jit_time_limit = time_limit
+
+    def get_jit_time_limit(self):
+        return self.jit_time_limit
+
+    def set_ghdl_backend(self, backend):
+        """
+        GHDL code generator backend, i.e. mcode, llvm or gcc, None to
+        detect it from ghdl --version.
+        """
+        self.ghdl_backend = backend
+
+    def get_ghdl_backend(self):
+        return getattr(self, "ghdl_backend", None)
+
+    def set_simulator_workers(self, enable=True):
+        """
+        Run tests on persistent simulator processes, one per thread.
+        """
+        self.simulator_workers = enable
+
+    def get_simulator_workers(self) -> bool:
+        return self.simulator_workers
+
+    def set_simulator_worker_timeout(self, timeout):
+        """
+        Seconds a test may run on a simulator worker before the worker
+        is killed and replaced, None for no limit.
+        """
+        self.simulator_worker_timeout = timeout
+
+    def get_simulator_worker_timeout(self):
+        return getattr(self, "simulator_worker_timeout", None)
+
+    def set_verdict_cache(self, enable=True):
+        """
+        Skip tests that passed with the same inputs in a previous run.
+        """
+        self.verdict_cache = enable
+
+    def get_verdict_cache(self) -> bool:
+        return getattr(self, "verdict_cache", False)
+
+    def set_force_simulation(self, force_simulation):
+        self.force_simulation = force_simulation
+
+    def get_force_simulation(self) -> bool:
+        return getattr(self, "force_simulation", False)
+
     def set_run_all(self, full_regression):
         self.full_regression = full_regression
 
@@ -590,14 +784,37 @@ class SimulatorDetector:
     ID_NVC_SIMULATOR = ["nvc", "NVC"]
     ID_VIVADO_SIMULATOR = ["vivado", "VIVADO"]
 
-
-    def __init__(self):
-        self.simulator_info = self.get_simulators_info()
+    # Simulator call, version argument and name in version output, in
+    # the order the default simulator is selected
+    SIMULATOR_CALLS = {
+        "MODELSIM": ("vsim", "-version", None),
+        "NVC": ("nvc", "--version", None),
+        "GHDL": ("ghdl", "--version", None),
+        "RIVIERA-PRO": ("vsimsa", "-version", "riviera"),
+        "ACTIVE-HDL": ("vsim", "-version", "active-hdl"),
+        "VIVADO": ("xsim", "--version", "vivado"),
+    }
+
+    # Simulators found installed, shared by all detectors of this run as
+    # each detection starts the simulator
+    installed_dict = {}
+
+    @classmethod
+    def is_installed(cls, simulator_name) -> bool:
+        """Returns True if the simulator is installed, detected once per run."""
+        installed = cls.installed_dict.get(simulator_name)
+        if installed is None:
+            installed = cls.is_simulator_installed(*cls.SIMULATOR_CALLS[simulator_name])
+            cls.installed_dict[simulator_name] = installed
+        return installed
 
     @staticmethod
     def is_simulator_installed(
         simulator_call: str, version_call: str = "--version", simulator_name: str = None
     ) -> bool:
+        # Do not start a process for a simulator not in PATH
+        if shutil.which(simulator_call) is None:
+            return False
         try:
             # Capturing the output instead of sending it to DEVNULL
             result = subprocess.run(
@@ -618,51 +835,22 @@ class SimulatorDetector:
         except (subprocess.CalledProcessError, FileNotFoundError):
             return False
 
-    def get_simulators_info(self) -> dict:
-        platform_info = platform.system()
-        modelsim_installed = self.is_simulator_installed(
-            simulator_call="vsim", version_call="-version"
-        )
-        ghdl_installed = self.is_simulator_installed(
-            simulator_call="ghdl", version_call="--version"
-        )
-        nvc_installed = self.is_simulator_installed(
-            simulator_call="nvc", version_call="--version"
-        )
-        riviera_pro_installed = self.is_simulator_installed(
-            simulator_call="vsimsa", version_call="-version", simulator_name="riviera"
-        )
-        active_hdl_installed = self.is_simulator_installed(
-            simulator_call="vsim", version_call="-version", simulator_name="active-hdl")
-        vivado_installed = self.is_simulator_installed(
-            simulator_call="xsim", version_call="--version", simulator_name="vivado"
-        )
+    def get_default_simulator_name(self) -> str:
+        """
+        Returns the first installed simulator in SIMULATOR_CALLS order,
+        without detecting the simulators after it.
+        """
+        for simulator_name in self.SIMULATOR_CALLS:
+            if self.is_installed(simulator_name):
+                return simulator_name
+        return ""
 
-        # Determine which simulator is currently set as default
-        simulator = ""
-        if modelsim_installed:
-            simulator = "MODELSIM"
-        elif nvc_installed:
-            simulator = "NVC"
-        elif ghdl_installed:
-            simulator = "GHDL"
-        elif riviera_pro_installed:
-            simulator = "RIVIERA-PRO"
-        elif active_hdl_installed:
-            simulator = "ACTIVE-HDL"
-        elif vivado_installed:
-            simulator = "VIVADO"
-
-        return {
-            "platform": platform_info,
-            "MODELSIM": modelsim_installed,
-            "NVC": nvc_installed,
-            "GHDL": ghdl_installed,
-            "RIVIERA-PRO": riviera_pro_installed,
-            "ACTIVE-HDL": active_hdl_installed,
-            "VIVADO": vivado_installed,
-            "simulator_name": simulator,
-        }
+    def get_simulators_info(self) -> dict:
+        simulators_info = {"platform": platform.system()}
+        for simulator_name in self.SIMULATOR_CALLS:
+            simulators_info[simulator_name] = self.is_installed(simulator_name)
+        simulators_info["simulator_name"] = self.get_default_simulator_name()
+        return simulators_info
 
     def _validate_simulator_name(self, simulator_name) -> str:
         if simulator_name in self.ID_MODELSIM_SIMULATOR:
@@ -685,7 +873,7 @@ class SimulatorDetector:
         
     def _validate_simulator_installed(self, simulator_name) -> None:
         """Check with simulator info dict if the simulator name is found/installed"""
-        if self.simulator_info.get(simulator_name) is False:
+        if simulator_name in self.SIMULATOR_CALLS and not self.is_installed(simulator_name):
             raise UnavailableSimulatorError("Simulator {} not found.".format(simulator_name))
     
     def get_simulator_settings_object(self, simulator_name) -> "SimulatorSettings":
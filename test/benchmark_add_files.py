@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+"""
+Benchmark of adding many files to a library.
+
+Usage:
+    python3 benchmark_add_files.py [num_files ...]
+
+The files are added one add_file() call at a time, as done by a
+regression script looping over a file list. The first run adds new
+files, the second run adds the same files to the library loaded from
+disk, as done when a regression script is run again.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hdlregression.construct.hdllibrary import HDLLibrary
+
+
+class BenchmarkSettings:
+    """
+    Settings used when adding files, without simulator detection.
+    """
+
+    def get_script_path(self) -> str:
+        return ''
+
+    def get_testcase_identifier_name(self) -> str:
+        return 'gc_testcase'
+
+    def get_logger_level(self) -> str:
+        return 'warning'
+
+    def get_is_gui_mode(self) -> bool:
+        return False
+
+    def get_use_log_color(self) -> bool:
+        return False
+
+    def get_num_threads(self) -> int:
+        return 0
+
+
+def create_files(path, num_files) -> list:
+    """
+    Creates num_files empty VHDL files and returns their names.
+    """
+    filename_list = []
+    for idx in range(num_files):
+        filename = os.path.join(path, 'file_{}.vhd'.format(idx))
+        open(filename, 'w').close()
+        filename_list.append(filename)
+    # As a checked out source tree, i.e. not modified while the files are added
+    old_time = time.time() - 60
+    os.utime(path, (old_time, old_time))
+    return filename_list
+
+
+def add_files(library, filename_list) -> float:
+    start_time = time.perf_counter()
+    for filename in filename_list:
+        library.add_file(filename=filename, hdl_version='2008', com_options=None,
+                         parse_file=True, code_coverage=False, netlist_instance=None)
+    library.update_file_list()
+    return time.perf_counter() - start_time
+
+
+def benchmark(num_files) -> tuple:
+    """
+    Returns the time of adding num_files new files, the time of adding
+    them again to the reloaded library and the pickled library size.
+    """
+    project = SimpleNamespace(settings=BenchmarkSettings())
+    with tempfile.TemporaryDirectory() as path:
+        filename_list = create_files(path, num_files)
+
+        library = HDLLibrary(name='bench_lib', project=project)
+        first_time = add_files(library, filename_list)
+
+        data = pickle.dumps(library)
+        library = pickle.loads(data)
+        rerun_time = add_files(library, filename_list)
+    return first_time, rerun_time, len(data)
+
+
+if __name__ == '__main__':
+    num_files_list = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 10000]
+    print('{:>8} {:>10} {:>10} {:>12}'.format('files', 'add [s]', 'rerun [s]', 'pickle [kB]'))
+    for num_files in num_files_list:
+        first_time, rerun_time, size = benchmark(num_files)
+        print('{:>8} {:>10.3f} {:>10.3f} {:>12.1f}'.format(num_files, first_time, rerun_time, size / 1024))
@@ -0,0 +1,262 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+"""
+Benchmark of loading and saving the project in runs without changes,
+with the project database and with the pickled project files used by
+earlier versions.
+
+Usage:
+    python3 benchmark_project_db.py [num_files]
+
+Each run is a new Python process creating the HDLRegression object,
+i.e. loading the project, adding the files of a generated project
+(default 2000 files), preparing the libraries and selecting the tests
+to run as done by start(), and saving the project. Files are not
+compiled, they are marked as compiled in the first run. The following
+runs have no changes. The pickled project files are saved and loaded
+as done by earlier versions, i.e. every file and module is pickled
+and unpickled in every run.
+
+Exits with 1 if the median time of loading, running and saving the
+project without changes is not lower with the project database.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Files of each group in the generated project, where each group has
+# a package, entities using it and a testbench using the entities
+GROUP_SIZE = 20
+
+COMMON_PACKAGE = """
+package common_pkg is
+  constant C_WIDTH : natural := 8;
+end package common_pkg;
+"""
+
+GROUP_PACKAGE = """
+library common_lib;
+use common_lib.common_pkg.all;
+
+package group_{group}_pkg is
+  constant C_GROUP : natural := {group};
+end package group_{group}_pkg;
+"""
+
+ENTITY = """
+library common_lib;
+use common_lib.common_pkg.all;
+use work.group_{group}_pkg.all;
+
+entity group_{group}_unit_{idx} is
+  port (clk : in bit);
+end entity group_{group}_unit_{idx};
+
+architecture rtl of group_{group}_unit_{idx} is
+begin
+end architecture rtl;
+"""
+
+TESTBENCH = """
+-- hdlregression:tb
+use work.group_{group}_pkg.all;
+
+entity group_{group}_tb is
+  generic (GC_TESTCASE : string := "");
+end entity group_{group}_tb;
+
+architecture sim of group_{group}_tb is
+  signal clk : bit;
+begin
+{instances}
+  p_main : process
+  begin
+    if GC_TESTCASE = "tc_write" then
+      report "write";
+    elsif GC_TESTCASE = "tc_read" then
+      report "read";
+    end if;
+    wait;
+  end process;
+end architecture sim;
+"""
+
+INSTANCE = "  i_unit_{idx} : entity work.group_{group}_unit_{idx} port map (clk => clk);\n"
+
+RUN_SCRIPT = '''
+import json, os, pickle, sys, time
+sys.path.insert(0, {repo_path!r})
+
+from hdlregression import HDLRegression
+from hdlregression.construct.container import Container
+
+
+def save_pickle_files(self, reset=True):
+    """
+    Saves the project as earlier versions did, i.e. one pickled file per container.
+    """
+    settings_copy = __import__('copy').deepcopy(self.settings)
+    if reset:
+        settings_copy = self.settings_config.unset_argument_settings(settings_copy)
+    object_dict = {{
+        'library.dat': self.library_container,
+        'generic.dat': self.generic_container,
+        'testgroup.dat': self.testgroup_container,
+        'testgroup_collection.dat': self.testgroup_collection_container,
+        'settings.dat': settings_copy,
+        'testcase.dat': self.runner.get_re_run_test_obj_list(),
+        'simulator.dat': settings_copy.get_simulator_settings(),
+    }}
+    for filename, obj in object_dict.items():
+        with open(os.path.join(os.getcwd(), 'hdlregression', filename), 'wb') as dump_file:
+            pickle.dump(obj, dump_file, pickle.HIGHEST_PROTOCOL)
+
+
+def load_pickle_files(self, output_path):
+    """
+    Loads the project as earlier versions did.
+    """
+    def load(default, filename):
+        try:
+            with open(os.path.join(os.getcwd(), output_path, filename), 'rb') as load_file:
+                return pickle.load(load_file)
+        except OSError:
+            return default
+
+    from hdlregression.settings import HDLRegressionSettings
+    self.settings = load(HDLRegressionSettings(), 'settings.dat')
+    self.settings.set_output_path(output_path)
+    self.library_container = load(Container('library'), 'library.dat')
+    self.generic_container = Container('generic')
+    self.testgroup_container = Container('testgroup')
+    self.testgroup_collection_container = Container('testgroup_collection')
+    self.re_run_tc_list = load([], 'testcase.dat')
+    self.cached_simulator_settings = load(self.cached_simulator_settings, 'simulator.dat')
+    self.settings.set_return_code(0)
+    self.settings.set_run_success(True)
+
+
+if {use_pickle!r}:
+    HDLRegression._save_project_to_disk = save_pickle_files
+    HDLRegression._load_project_from_disk = load_pickle_files
+
+load_time = [0.0]
+load_project = HDLRegression._load_project_from_disk
+def timed_load_project(self, output_path):
+    start_time = time.perf_counter()
+    load_project(self, output_path)
+    load_time[0] = time.perf_counter() - start_time
+HDLRegression._load_project_from_disk = timed_load_project
+
+hr = HDLRegression(simulator='GHDL')
+hr.add_files(os.path.abspath('src/common/*.vhd'), 'common_lib')
+hr.add_files(os.path.abspath('src/bench/*.vhd'), 'bench_lib')
+
+start_time = time.perf_counter()
+hr._prepare_libraries()
+hr._setup_simulation_runner()
+hr._remove_empty_libraries()
+hr.runner.prepare_test_modules_and_objects(hr.re_run_tc_list)
+num_tests = len(hr.runner.testbuilder.get_list_of_tests_to_run())
+# Files are compiled in the first run
+for library in hr._get_library_container().get():
+    for hdlfile in library.get_hdlfile_list():
+        if hdlfile.get_need_compile():
+            hdlfile.update_compile_time()
+run_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+hr._save_project_to_disk(reset=True)
+save_time = time.perf_counter() - start_time
+
+print(json.dumps({{
+    'load_time': load_time[0],
+    'run_time': run_time,
+    'save_time': save_time,
+    'num_tests': num_tests,
+}}))
+'''
+
+
+def write_project(path, num_files) -> None:
+    """
+    Writes the sources of the generated project to path/src.
+    """
+    os.makedirs(os.path.join(path, 'src', 'common'))
+    os.makedirs(os.path.join(path, 'src', 'bench'))
+    with open(os.path.join(path, 'src', 'common', 'common_pkg.vhd'), 'w') as write_file:
+        write_file.write(COMMON_PACKAGE)
+    for group in range(max(1, num_files // GROUP_SIZE)):
+        group_path = os.path.join(path, 'src', 'bench', 'group_{}'.format(group))
+        with open(group_path + '_pkg.vhd', 'w') as write_file:
+            write_file.write(GROUP_PACKAGE.format(group=group))
+        num_units = GROUP_SIZE - 2
+        for idx in range(num_units):
+            with open(group_path + '_unit_{}.vhd'.format(idx), 'w') as write_file:
+                write_file.write(ENTITY.format(group=group, idx=idx))
+        instances = ''.join(INSTANCE.format(group=group, idx=idx) for idx in range(num_units))
+        with open(group_path + '_tb.vhd', 'w') as write_file:
+            write_file.write(TESTBENCH.format(group=group, instances=instances))
+
+
+def run(path, use_pickle) -> dict:
+    """
+    Runs the project in a new process from path and returns its measurements.
+    """
+    script = RUN_SCRIPT.format(repo_path=os.path.abspath(REPO_PATH), use_pickle=use_pickle)
+    result = subprocess.run([sys.executable, '-c', script], cwd=path,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        raise RuntimeError('Run failed:\n' + result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(num_files, use_pickle, repeat=5) -> list:
+    """
+    Returns the measurements of repeat runs, the first one
+    creating the project.
+    """
+    with tempfile.TemporaryDirectory() as path:
+        write_project(path, num_files)
+        return [run(path, use_pickle) for _ in range(repeat)]
+
+
+def get_median(result_list, name) -> float:
+    # The first run creates the project
+    return statistics.median(result[name] for result in result_list[1:]) * 1000
+
+
+if __name__ == '__main__':
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print('{:>10} {:>10} {:>10} {:>10} {:>10}'.format('project', 'load [ms]', 'run [ms]', 'save [ms]',
+                                                      'total [ms]'))
+    total_dict = {}
+    for (name, use_pickle) in [('pickle', True), ('database', False)]:
+        result_list = benchmark(num_files, use_pickle)
+        times = [get_median(result_list, time_name) for time_name in ['load_time', 'run_time', 'save_time']]
+        total_dict[name] = sum(times)
+        print('{:>10} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f}'.format(name, *times, total_dict[name]))
+
+    print('Median time without changes, {} files: database {:.1f} ms, pickle {:.1f} ms'.format(
+        num_files, total_dict['database'], total_dict['pickle']))
+    sys.exit(1 if total_dict['database'] >= total_dict['pickle'] else 0)
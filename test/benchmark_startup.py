@@ -0,0 +1,170 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+"""
+Benchmark of HDLRegression startup, as done by a regression script
+called with a listing argument, e.g. by an IDE integration.
+
+Usage:
+    python3 benchmark_startup.py [budget_ms] [argument ...]
+
+Each run is a new Python process importing HDLRegression, creating the
+HDLRegression object, adding the files of a small generated project and
+calling start() with the given arguments (default "-ltc"), i.e. the
+listing call is timed end to end. The first run scans the files, the
+following runs restore them from the scan cache, as listing calls do not
+save the project. The number of started processes, i.e. simulator
+detection calls, and the runner and reporter modules imported are
+listed. Exits with 1 if the median listing time is above the budget
+(default 130 ms, the median was about 90 ms when the budget was set),
+or if runner or reporter modules are imported before they are used.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules only imported when running simulations or writing reports
+LAZY_MODULES = [
+    'hdlregression.run.runner_modelsim',
+    'hdlregression.run.runner_aldec',
+    'hdlregression.run.vivado_runner',
+    'hdlregression.run.tcl_runner',
+    'hdlregression.report.xmlreporter',
+    'hdlregression.report.htmlreporter',
+    'hdlregression.report.jsonreporter',
+    'hdlregression.report.csvreporter',
+]
+
+# Generated project: testbenches with testcases and a shared package
+NUM_TESTBENCHES = 20
+
+PACKAGE = """
+package bench_pkg is
+  constant C_WIDTH : natural := 8;
+end package bench_pkg;
+"""
+
+TESTBENCH = """
+-- hdlregression:tb
+use work.bench_pkg.all;
+
+entity bench_{idx}_tb is
+  generic (GC_TESTCASE : string := "");
+end entity bench_{idx}_tb;
+
+architecture sim of bench_{idx}_tb is
+begin
+  p_main : process
+  begin
+    if GC_TESTCASE = "tc_write" then
+      report "write";
+    elsif GC_TESTCASE = "tc_read" then
+      report "read";
+    end if;
+    wait;
+  end process;
+end architecture sim;
+"""
+
+STARTUP_SCRIPT = '''
+import json, os, subprocess, sys, time
+sys.path.insert(0, {repo_path!r})
+
+num_processes = [0]
+popen_init = subprocess.Popen.__init__
+def count_popen_init(self, *args, **kwargs):
+    num_processes[0] += 1
+    popen_init(self, *args, **kwargs)
+subprocess.Popen.__init__ = count_popen_init
+
+start_time = time.perf_counter()
+from hdlregression import HDLRegression
+import_time = time.perf_counter() - start_time
+hr = HDLRegression()
+startup_time = time.perf_counter() - start_time
+hr.add_files(os.path.abspath('src/*.vhd'), 'bench_lib')
+hr.start()
+list_time = time.perf_counter() - start_time
+print(json.dumps({{
+    'import_time': import_time,
+    'startup_time': startup_time,
+    'list_time': list_time,
+    'num_processes': num_processes[0],
+    'lazy_modules': [name for name in {lazy_modules!r} if name in sys.modules],
+}}))
+'''
+
+
+def run_startup(path, argument_list) -> dict:
+    """
+    Runs the startup script in a new process from path and returns
+    its measurements.
+    """
+    script = STARTUP_SCRIPT.format(repo_path=os.path.abspath(REPO_PATH), lazy_modules=LAZY_MODULES)
+    result = subprocess.run([sys.executable, '-c', script] + argument_list, cwd=path,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        raise RuntimeError('Startup failed:\n' + result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def write_project(path) -> None:
+    """
+    Writes the sources of the generated project to path/src.
+    """
+    src_path = os.path.join(path, 'src')
+    os.makedirs(src_path)
+    with open(os.path.join(src_path, 'bench_pkg.vhd'), 'w') as write_file:
+        write_file.write(PACKAGE)
+    for idx in range(NUM_TESTBENCHES):
+        with open(os.path.join(src_path, 'bench_{}_tb.vhd'.format(idx)), 'w') as write_file:
+            write_file.write(TESTBENCH.format(idx=idx))
+
+
+def benchmark(argument_list, repeat=5) -> list:
+    """
+    Returns the measurements of repeat listing calls, the first one
+    without scanned files.
+    """
+    with tempfile.TemporaryDirectory() as path:
+        write_project(path)
+        return [run_startup(path, argument_list) for _ in range(repeat)]
+
+
+if __name__ == '__main__':
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 130.0
+    argument_list = sys.argv[2:] or ['-ltc']
+    result_list = benchmark(argument_list)
+
+    print('{:>4} {:>12} {:>12} {:>10} {:>10}'.format('run', 'import [ms]', 'startup [ms]', 'list [ms]',
+                                                     'processes'))
+    for idx, result in enumerate(result_list):
+        print('{:>4} {:>12.1f} {:>12.1f} {:>10.1f} {:>10}'.format(idx, result['import_time'] * 1000,
+                                                                 result['startup_time'] * 1000,
+                                                                 result['list_time'] * 1000,
+                                                                 result['num_processes']))
+
+    list_ms = statistics.median(result['list_time'] for result in result_list) * 1000
+    lazy_modules = sorted(set(name for result in result_list for name in result['lazy_modules']))
+    print('Median listing time: {:.1f} ms, budget: {:.1f} ms'.format(list_ms, budget_ms))
+    if lazy_modules:
+        print('Imported at startup: {}'.format(', '.join(lazy_modules)))
+    sys.exit(1 if list_ms > budget_ms or lazy_modules else 0)
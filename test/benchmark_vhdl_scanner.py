@@ -0,0 +1,160 @@
+#
+# Copyright (c) 2022 by HDLRegression Authors.  All rights reserved.
+# Licensed under the MIT License; you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at https://opensource.org/licenses/MIT.
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+# an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+#
+# HDLRegression AND ANY PART THEREOF ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS
+# OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH UVVM OR THE USE OR OTHER DEALINGS IN HDLRegression.
+#
+
+"""
+Benchmark of the VHDL scanner on large generated files.
+
+Usage:
+    python3 benchmark_vhdl_scanner.py [num_units ...]
+
+Each unit is a package, package body, entity with generics,
+architecture with instantiations, configuration and context,
+i.e. the generated file has roughly 45 lines per unit.
+"""
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hdlregression.construct.hdllibrary import HDLLibrary
+from hdlregression.scan.vhdlscanner import VHDLScanner
+
+
+def generate_vhdl(num_units) -> list:
+    """
+    Returns the lines of a generated VHDL file with num_units units.
+    """
+    lines = []
+    for idx in range(num_units):
+        lines += [
+            'library ieee;',
+            'use ieee.std_logic_1164.all;',
+            'use work.pkg_{}.all;'.format(max(idx - 1, 0)),
+            '',
+            '-- Package number {}'.format(idx),
+            'package pkg_{} is'.format(idx),
+            '  constant C_WIDTH_{} : natural := {};'.format(idx, idx % 32 + 1),
+            'end package pkg_{};'.format(idx),
+            '',
+            'package body pkg_{} is'.format(idx),
+            'end package body pkg_{};'.format(idx),
+            '',
+        ]
+        if idx % 50 == 0:
+            lines += ['package new_pkg_{} is new work.generic_pkg generic map (G_WIDTH => 8);'.format(idx)]
+        if idx % 10 == 0:
+            lines += ['-- hdlregression:tb']
+        lines += [
+            'entity ent_{} is'.format(idx),
+            '  generic (',
+            '    GC_TESTCASE : string := "";',
+            '    G_WIDTH     : natural := 8',
+            '  );',
+            '  port (',
+            '    clk  : in  std_logic;',
+            '    dout : out std_logic_vector(G_WIDTH - 1 downto 0)',
+            '  );',
+            'end entity ent_{};'.format(idx),
+            '',
+            'architecture rtl of ent_{} is'.format(idx),
+            '  alias width_{} is work.pkg_{}.C_WIDTH_{};'.format(idx, idx, idx),
+            '  /* block comment',
+            '     over two lines */',
+            'begin',
+            '  i_dut : entity work.ent_{}(rtl)'.format(idx + 1),
+            '    port map (clk => clk, dout => dout);',
+            '  i_cfg : configuration work.cfg_{};'.format(idx + 1),
+            '  p_main : process',
+            '  begin',
+            '    if GC_TESTCASE = "tc_{}" then'.format(idx),
+            '      report "Running testcase";',
+            '    end if;',
+            '    wait;',
+            '  end process;',
+            'end architecture rtl;',
+            '',
+            'configuration cfg_{} of ent_{} is'.format(idx, idx),
+            '  for rtl',
+            '    for i_dut : ent_{}'.format(idx + 1),
+            '      use entity work.ent_{}(rtl);'.format(idx + 1),
+            '    end for;',
+            '  end for;',
+            'end configuration cfg_{};'.format(idx),
+            '',
+            'context ctx_{} is'.format(idx),
+            '  library ieee;',
+            '  use ieee.numeric_std.all;',
+            '  use work.pkg_{}.all;'.format(idx),
+            'end context;',
+            '',
+        ]
+    return [line + '\n' for line in lines]
+
+
+class BenchmarkSettings:
+    """
+    Settings used by the scanner, without simulator detection.
+    """
+
+    def get_testcase_identifier_name(self) -> str:
+        return 'gc_testcase'
+
+    def get_logger_level(self) -> str:
+        return 'warning'
+
+    def get_num_threads(self) -> int:
+        return 0
+
+    def get_is_gui_mode(self) -> bool:
+        return False
+
+    def get_use_log_color(self) -> bool:
+        return False
+
+
+def get_scanner(filename='benchmark.vhd') -> VHDLScanner:
+    project = SimpleNamespace(settings=BenchmarkSettings())
+    library = HDLLibrary(name='bench_lib', project=project)
+    hdlfile = SimpleNamespace(get_filename_with_path=lambda: filename)
+    return VHDLScanner(project=project, library=library, filename=filename, hdlfile=hdlfile)
+
+
+def benchmark(num_units, repeat=3) -> tuple:
+    """
+    Returns the number of lines, number of modules and best
+    scan time of a generated file with num_units units.
+    """
+    file_content_list = generate_vhdl(num_units)
+    best_time = None
+    num_modules = 0
+    for _ in range(repeat):
+        scanner = get_scanner()
+        start_time = time.perf_counter()
+        scanner.scan(file_content_list)
+        scan_time = time.perf_counter() - start_time
+        best_time = scan_time if best_time is None else min(best_time, scan_time)
+        num_modules = len(scanner.get_module_container().get())
+    return len(file_content_list), num_modules, best_time
+
+
+if __name__ == '__main__':
+    unit_list = [int(arg) for arg in sys.argv[1:]] or [10, 100, 500, 1000]
+    print('{:>8} {:>8} {:>8} {:>10}'.format('units', 'lines', 'modules', 'time [s]'))
+    for num_units in unit_list:
+        num_lines, num_modules, scan_time = benchmark(num_units)
+        print('{:>8} {:>8} {:>8} {:>10.3f}'.format(num_units, num_lines, num_modules, scan_time))
@@ -34,3 +34,92 @@ def precompiled_path():
 @pytest.fixture(scope="session")
 def design_path():
     return os.path.abspath("../design")
+
+
+STUB_SIMULATOR = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/$(basename "$0").log"
+prev=""
+for arg in "$@"; do
+  case "$arg" in
+    --work=*:*) mkdir -p "${{arg#*:}}" && touch "${{arg#*:}}/_NVC_LIB" "${{arg#*:}}/STUB.UNIT";;
+  esac
+  if [ "$prev" = "--snapshot" ]; then
+    mkdir -p "xsim.dir/$arg"
+  fi
+  if [ -f "$arg" ] && grep -q "stub compile error" "$arg"; then
+    exit 1
+  fi
+  prev="$arg"
+done
+if [ "$(basename "$0")" = "vlib" ]; then
+  mkdir -p "$1"
+fi
+case "$1" in
+  --version|-version) printf "{version}";;
+  *) echo "stub test done";;
+esac
+"""
+
+
+def install_stub_simulator(tmp_path, monkeypatch, executable, version) -> "function":
+    """
+    Runs the regression in tmp_path with a simulator stub that logs every
+    call and passes every test with "stub test done". Files containing
+    "stub compile error" fail to compile, and vlib creates the library.
+    Returns a function reading and clearing the logged calls.
+    """
+    if os.name == "nt":
+        pytest.skip("simulator stub is a shell script")
+    import hdlregression.hdlregression
+    from hdlregression.settings import SimulatorDetector
+
+    bin_path = tmp_path / "bin"
+    bin_path.mkdir(exist_ok=True)
+    stub = bin_path / executable
+    stub.write_text(STUB_SIMULATOR.format(version=version))
+    stub.chmod(0o755)
+    calls_log = bin_path / (executable + ".log")
+    monkeypatch.setenv("PATH", str(bin_path) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setattr(SimulatorDetector, "installed_dict", {})
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(hdlregression.hdlregression, "sim_path", str(tmp_path))
+
+    def get_calls() -> list:
+        if not calls_log.exists():
+            return []
+        calls = [call for call in calls_log.read_text().splitlines() if call not in ["--version", "-version"]]
+        calls_log.unlink()
+        return calls
+
+    return get_calls
+
+
+@pytest.fixture
+def stub_ghdl(tmp_path, monkeypatch):
+    return install_stub_simulator(
+        tmp_path,
+        monkeypatch,
+        "ghdl",
+        "GHDL 3.0.0 (stub) [Dunoon edition]\\n mcode code generator\\n",
+    )
+
+
+@pytest.fixture
+def stub_nvc(tmp_path, monkeypatch):
+    return install_stub_simulator(tmp_path, monkeypatch, "nvc", "nvc 1.10.0 (stub)\\n")
+
+
+@pytest.fixture
+def stub_vivado(tmp_path, monkeypatch):
+    for executable in ["xvhdl", "xvlog", "xelab"]:
+        install_stub_simulator(tmp_path, monkeypatch, executable, "")
+    return install_stub_simulator(tmp_path, monkeypatch, "xsim", "Vivado Simulator v2023.1 (stub)\\n")
+
+
+@pytest.fixture
+def stub_modelsim(tmp_path, monkeypatch):
+    for executable in ["vlib", "vmap", "vcom", "vlog", "vopt"]:
+        install_stub_simulator(tmp_path, monkeypatch, executable, "")
+    return install_stub_simulator(
+        tmp_path, monkeypatch, "vsim", "Model Technology ModelSim SE-64 vsim 2020.1 (stub)\\n"
+    )
@@ -0,0 +1,109 @@
+# ================================================================================================================================
+#  Copyright 2021 Bitvis
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0 and in the provided LICENSE.TXT.
+#
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+#  an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and limitations under the License.
+# ================================================================================================================================
+#  Note : Any functionality not explicitly described in the documentation is subject to change at any time
+# --------------------------------------------------------------------------------------------------------------------------------
+
+"""
+Minimal fakes for unit testing runner helpers without a project.
+Dependency handling is tested on real projects in test_dependency.py.
+"""
+
+
+class FakeSettings:
+    def __init__(self, durations=None):
+        self._durations = durations or {}
+
+    def get_test_duration(self, test_key):
+        return self._durations.get(test_key)
+
+    def get_is_gui_mode(self):
+        return False
+
+    def get_use_log_color(self):
+        return False
+
+    def get_sim_options(self):
+        return []
+
+    def get_elaboration_options(self):
+        return []
+
+    def get_runtime_options(self):
+        return []
+
+    def get_global_options(self):
+        return []
+
+    def get_result_check_str(self):
+        return None
+
+    def get_sim_path(self):
+        return "."
+
+
+class FakeProject:
+    def __init__(self, durations=None):
+        self.settings = FakeSettings(durations)
+
+
+class FakeRunner:
+    def __init__(self, durations=None):
+        self.project = FakeProject(durations)
+
+
+class FakeTest:
+    def __init__(self, key, group=None, gc_str=""):
+        self._key = key
+        self._group = group
+        self._gc_str = gc_str
+
+    def get_duration_key(self):
+        return self._key
+
+    def get_duration_group_key(self):
+        return self._group
+
+    def get_gc_str(self):
+        return self._gc_str
+
+    def get_netlist_timing(self):
+        return None
+
+    def get_id_number(self):
+        return 1
+
+
+class FakeHdlLibrary:
+    def __init__(self, lib_deps=None):
+        self.files = []
+        self._lib_deps = lib_deps or []
+
+    def get_lib_obj_dep(self):
+        return self._lib_deps
+
+    def get_hdlfile_list(self):
+        return self.files
+
+
+class FakeHdlFile:
+    def __init__(self, name, library=None, digest=None):
+        self._name = name
+        self.digest = digest
+        if library is not None:
+            library.files.append(self)
+
+    def get_filename_with_path(self):
+        return "/src/" + self._name
+
+    def get_current_digest(self):
+        return self.digest
+
+    def _get_com_options(self, simulator):
+        return ["-2008"]
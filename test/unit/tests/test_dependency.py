@@ -0,0 +1,701 @@
+# ================================================================================================================================
+#  Copyright 2021 Bitvis
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0 and in the provided LICENSE.TXT.
+#
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+#  an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and limitations under the License.
+# ================================================================================================================================
+#  Note : Any functionality not explicitly described in the documentation is subject to change at any time
+# --------------------------------------------------------------------------------------------------------------------------------
+
+import sys
+import os
+
+from hdlregression import HDLRegression
+from hdlregression.hdlregression_pkg import (
+    organize_libraries_by_dependency,
+    request_libraries_prepare,
+)
+
+
+if len(sys.argv) >= 2:
+    """
+    Remove pytest from argument list
+    """
+    sys.argv.pop(1)
+
+
+A_PKG = """
+package a_pkg is
+  constant C_WIDTH : integer := 16;
+end package a_pkg;
+"""
+
+A_OTHER_PKG = """
+package a_other_pkg is
+  constant C_DEPTH : integer := 4;
+end package a_other_pkg;
+"""
+
+A_ENT = """
+entity a_ent is
+end entity a_ent;
+
+architecture rtl of a_ent is
+begin
+end architecture rtl;
+"""
+
+B_ENT = """
+library liba;
+use liba.a_pkg.all;
+
+entity b_ent is
+end entity b_ent;
+
+architecture rtl of b_ent is
+begin
+end architecture rtl;
+"""
+
+B_ENT_TB = """
+-- hdlregression:tb
+entity b_ent_tb is
+end entity b_ent_tb;
+
+architecture sim of b_ent_tb is
+begin
+  i_b : entity work.b_ent;
+end architecture sim;
+"""
+
+B_OTHER_TB = """
+-- hdlregression:tb
+library liba;
+use liba.a_other_pkg.all;
+
+entity b_other_tb is
+end entity b_other_tb;
+
+architecture sim of b_other_tb is
+begin
+end architecture sim;
+"""
+
+B_TB = """
+-- hdlregression:tb
+library liba;
+use liba.a_pkg.all;
+
+entity b_tb is
+end entity b_tb;
+
+architecture sim of b_tb is
+  component a_ent is
+  end component a_ent;
+begin
+  i_a : a_ent;
+end architecture sim;
+"""
+
+B_COMP_TB = """
+-- hdlregression:tb
+entity b_comp_tb is
+end entity b_comp_tb;
+
+architecture sim of b_comp_tb is
+  component a_ent is
+  end component a_ent;
+begin
+  i_a : a_ent;
+end architecture sim;
+"""
+
+
+def write_sources(sources) -> dict:
+    """
+    Writes {filename: content} to src/ and returns {filename: path}.
+    """
+    os.makedirs("src", exist_ok=True)
+    paths = {}
+    for filename, content in sources.items():
+        paths[filename] = os.path.abspath(os.path.join("src", filename))
+        with open(paths[filename], "w") as write_file:
+            write_file.write(content)
+    return paths
+
+
+def change_source(path):
+    with open(path, "a") as write_file:
+        write_file.write("-- changed\n")
+
+
+def get_analyzed_files(calls) -> list:
+    return [os.path.basename(call.split()[-1]) for call in calls if call.startswith("-a ")]
+
+
+def get_run_tests(calls) -> list:
+    return [call.split()[-2] for call in calls if call.startswith("--elab-run ")]
+
+
+def get_selection_reasons(hr) -> dict:
+    return {
+        test.get_name(): test.get_selection_reason()
+        for test in hr.runner.testbuilder.get_list_of_tests_to_run()
+    }
+
+
+def create_regression(lib_dep=None) -> HDLRegression:
+    hr = HDLRegression(simulator="ghdl")
+    hr.add_files(os.path.abspath("src/a_*.vhd"), "liba")
+    hr.add_files(os.path.abspath("src/b_*.vhd"), "libb")
+    if lib_dep:
+        hr.set_dependency("libb", lib_dep)
+    hr.set_result_check_string("stub test done")
+    return hr
+
+
+def run_regression(lib_dep=None) -> int:
+    return create_regression(lib_dep).start()
+
+
+def test_set_dependency_recompiles_files_referring_to_library(stub_ghdl):
+    paths = write_sources(
+        {"a_pkg.vhd": A_PKG, "a_ent.vhd": A_ENT, "b_tb.vhd": B_TB, "b_comp_tb.vhd": B_COMP_TB}
+    )
+
+    assert run_regression(lib_dep=["liba"]) == 0
+    calls = stub_ghdl()
+    assert sorted(get_analyzed_files(calls)) == [
+        "a_ent.vhd",
+        "a_pkg.vhd",
+        "b_comp_tb.vhd",
+        "b_tb.vhd",
+    ]
+    assert sorted(get_run_tests(calls)) == ["b_comp_tb", "b_tb"]
+
+    # libb binds a_ent by component name, the set dependency recompiles
+    # the libb files referring to liba and re-runs the tests of libb.
+    change_source(paths["a_ent.vhd"])
+    hr = create_regression(lib_dep=["liba"])
+    assert hr.start() == 0
+    calls = stub_ghdl()
+    assert get_analyzed_files(calls) == ["a_ent.vhd", "b_tb.vhd"]
+    assert sorted(get_run_tests(calls)) == ["b_comp_tb", "b_tb"]
+    assert get_selection_reasons(hr) == {
+        "b_comp_tb": "depends on changed: a_ent",
+        "b_tb": "depends on changed: a_ent",
+    }
+
+
+def test_changed_package_recompiles_files_using_it(stub_ghdl):
+    paths = write_sources(
+        {
+            "a_pkg.vhd": A_PKG,
+            "a_other_pkg.vhd": A_OTHER_PKG,
+            "b_ent.vhd": B_ENT,
+            "b_ent_tb.vhd": B_ENT_TB,
+        }
+    )
+
+    assert run_regression() == 0
+    assert sorted(get_analyzed_files(stub_ghdl())) == [
+        "a_other_pkg.vhd",
+        "a_pkg.vhd",
+        "b_ent.vhd",
+        "b_ent_tb.vhd",
+    ]
+
+    # b_ent does not use a_other_pkg, no test is run
+    change_source(paths["a_other_pkg.vhd"])
+    assert run_regression() == 1
+    calls = stub_ghdl()
+    assert get_analyzed_files(calls) == ["a_other_pkg.vhd"]
+    assert get_run_tests(calls) == []
+
+    # b_ent uses liba.a_pkg, b_ent_tb uses b_ent
+    change_source(paths["a_pkg.vhd"])
+    assert run_regression() == 0
+    calls = stub_ghdl()
+    assert get_analyzed_files(calls) == ["a_pkg.vhd", "b_ent.vhd", "b_ent_tb.vhd"]
+    assert get_run_tests(calls) == ["b_ent_tb"]
+
+
+def test_compile_error_only_recompiles_failed_files(stub_ghdl):
+    paths = write_sources(
+        {
+            "a_pkg.vhd": A_PKG,
+            "a_other_pkg.vhd": A_OTHER_PKG,
+            "b_ent.vhd": B_ENT,
+            "b_ent_tb.vhd": B_ENT_TB,
+        }
+    )
+    assert run_regression() == 0
+    stub_ghdl()
+
+    change_source(paths["a_other_pkg.vhd"])
+    with open(paths["a_other_pkg.vhd"], "a") as write_file:
+        write_file.write("-- stub compile error\n")
+    # Compile only, as from the simulator GUI, saves the failed compile
+    assert create_regression()._start_gui() != 0
+    assert get_analyzed_files(stub_ghdl()) == ["a_other_pkg.vhd"]
+
+    # The libraries keep their compiled units, only the fixed file is compiled
+    write_sources({"a_other_pkg.vhd": A_OTHER_PKG + "-- fixed\n"})
+    assert create_regression()._start_gui() == 0
+    assert get_analyzed_files(stub_ghdl()) == ["a_other_pkg.vhd"]
+
+
+def test_only_tests_depending_on_changed_files_are_run(stub_ghdl):
+    paths = write_sources(
+        {
+            "a_pkg.vhd": A_PKG,
+            "a_other_pkg.vhd": A_OTHER_PKG,
+            "b_ent.vhd": B_ENT,
+            "b_ent_tb.vhd": B_ENT_TB,
+            "b_other_tb.vhd": B_OTHER_TB,
+        }
+    )
+
+    assert run_regression() == 0
+    assert sorted(get_run_tests(stub_ghdl())) == ["b_ent_tb", "b_other_tb"]
+
+    change_source(paths["a_pkg.vhd"])
+    hr = create_regression()
+    assert hr.start() == 0
+    assert get_run_tests(stub_ghdl()) == ["b_ent_tb"]
+    assert list(get_selection_reasons(hr).values()) == [
+        "depends on changed: a_pkg, b_ent"
+    ]
+
+    change_source(paths["b_other_tb.vhd"])
+    hr = create_regression()
+    assert hr.start() == 0
+    assert get_run_tests(stub_ghdl()) == ["b_other_tb"]
+    assert list(get_selection_reasons(hr).values()) == [
+        "testbench changed: b_other_tb"
+    ]
+
+
+B_GEN_TB = """
+-- hdlregression:tb
+entity b_gen_tb is
+  generic (GC_WIDTH : natural := 8);
+end entity b_gen_tb;
+
+architecture sim of b_gen_tb is
+begin
+end architecture sim;
+"""
+
+
+def test_nvc_snapshots_are_kept_per_dependencies_and_generics(stub_nvc, monkeypatch):
+    def get_work_paths(calls, step) -> list:
+        return sorted(
+            arg.partition(":")[2]
+            for call in calls
+            if step in call.split()
+            for arg in call.split()
+            if arg.startswith("--work=")
+        )
+
+    def run_nvc_regression() -> int:
+        hr = HDLRegression(simulator="nvc")
+        hr.add_files(os.path.abspath("src/b_*.vhd"), "libb")
+        hr.add_generics("b_gen_tb", generics=["GC_WIDTH", 8])
+        hr.add_generics("b_gen_tb", generics=["GC_WIDTH", 16])
+        hr.set_result_check_string("stub test done")
+        return hr.start(elaboration_cache=True, threading=True)
+
+    paths = write_sources({"b_gen_tb.vhd": B_GEN_TB})
+    assert run_nvc_regression() == 0
+    calls = stub_nvc()
+    # One snapshot, i.e. copy of the work library, per generic value
+    snapshot_list = get_work_paths(calls, "-e")
+    assert len(set(snapshot_list)) == 2
+    assert get_work_paths(calls, "-r") == snapshot_list
+    # Analysed units are linked into the snapshots, the library index is copied
+    (library_path,) = set(get_work_paths(calls, "-a"))
+    for snapshot in snapshot_list:
+        assert os.path.samefile(
+            os.path.join(snapshot, "STUB.UNIT"), os.path.join(library_path, "STUB.UNIT")
+        )
+        assert not os.path.samefile(
+            os.path.join(snapshot, "_NVC_LIB"), os.path.join(library_path, "_NVC_LIB")
+        )
+
+    # Snapshots are reused
+    monkeypatch.setattr(sys, "argv", [sys.argv[0], "-fr"])
+    assert run_nvc_regression() == 0
+    calls = stub_nvc()
+    assert get_work_paths(calls, "-e") == []
+    assert get_work_paths(calls, "-r") == snapshot_list
+
+    # Snapshots of the previous testbench version are removed
+    change_source(paths["b_gen_tb.vhd"])
+    assert run_nvc_regression() == 0
+    calls = stub_nvc()
+    new_snapshot_list = get_work_paths(calls, "-e")
+    assert len(set(new_snapshot_list)) == 2
+    assert not set(new_snapshot_list) & set(snapshot_list)
+    assert not any(os.path.exists(snapshot) for snapshot in snapshot_list)
+
+
+def test_modelsim_tests_load_shared_optimized_design(stub_modelsim, tmp_path, monkeypatch):
+    vopt_log = tmp_path / "bin" / "vopt.log"
+
+    def get_vopt_calls() -> list:
+        if not vopt_log.exists():
+            return []
+        calls = vopt_log.read_text().splitlines()
+        vopt_log.unlink()
+        return calls
+
+    def get_run_do_calls(hr) -> list:
+        vsim_calls = []
+        for test in hr.runner.testbuilder.get_list_of_tests_to_run():
+            with open(os.path.join(test.get_test_path(), "run.do")) as read_file:
+                vsim_calls += [line for line in read_file if "vsim " in line]
+        return vsim_calls
+
+    def run_modelsim_regression(**kwargs) -> HDLRegression:
+        hr = HDLRegression(simulator="modelsim")
+        hr.add_files(os.path.abspath("src/b_*.vhd"), "libb")
+        hr.add_generics("b_gen_tb", generics=["GC_WIDTH", 8])
+        hr.add_generics("b_gen_tb", generics=["GC_WIDTH", 16])
+        hr.set_result_check_string("stub test done")
+        if kwargs.pop("code_coverage", False):
+            hr.set_code_coverage("bcst", "code_coverage.ucdb")
+        if kwargs.pop("netlist", False):
+            hr.add_files(os.path.abspath("src/b_gen_tb.sdf"), "libb", netlist_inst="/b_gen_tb")
+        assert hr.start(elaboration_cache=True, **kwargs) == 0
+        return hr
+
+    write_sources({"b_gen_tb.vhd": B_GEN_TB, "b_gen_tb.sdf": ""})
+
+    # One optimized design for both generic values
+    hr = run_modelsim_regression()
+    (vopt_call,) = get_vopt_calls()
+    vopt_args = vopt_call.split()
+    assert vopt_args[vopt_args.index("-work") + 1] == "libb"
+    assert "libb.b_gen_tb(sim)" in vopt_args
+    assert vopt_args[vopt_args.index("-o") + 1] == "b_gen_tb_sim_opt"
+    assert "-floatgenerics+b_gen_tb." in vopt_args
+    vsim_calls = get_run_do_calls(hr)
+    assert len(vsim_calls) == 2
+    assert all(" libb.b_gen_tb_sim_opt " in call for call in vsim_calls)
+
+    # The optimized design is reused with unchanged dependencies
+    monkeypatch.setattr(sys, "argv", [sys.argv[0], "-fr"])
+    hr = run_modelsim_regression()
+    assert get_vopt_calls() == []
+    assert all(" libb.b_gen_tb_sim_opt " in call for call in get_run_do_calls(hr))
+
+    # Code coverage and netlist timing are set up by vsim
+    for kwargs in [{"code_coverage": True}, {"netlist": True}]:
+        hr = run_modelsim_regression(**kwargs)
+        assert get_vopt_calls() == []
+        vsim_calls = get_run_do_calls(hr)
+        assert vsim_calls and not any("_opt" in call for call in vsim_calls)
+
+
+B_ARCH_TB = """
+-- hdlregression:tb
+entity b_arch_tb is
+end entity b_arch_tb;
+
+architecture sim_a of b_arch_tb is
+begin
+end architecture sim_a;
+
+architecture sim_b of b_arch_tb is
+begin
+end architecture sim_b;
+"""
+
+
+def test_vivado_tests_run_own_snapshot_of_their_architecture(stub_vivado, tmp_path):
+    write_sources({"b_arch_tb.vhd": B_ARCH_TB})
+    hr = HDLRegression(simulator="vivado")
+    hr.add_files(os.path.abspath("src/b_*.vhd"), "libb")
+    hr.set_result_check_string("stub test done")
+    assert hr.start(threading=True) == 0
+
+    xelab_calls = (tmp_path / "bin" / "xelab.log").read_text().splitlines()
+    assert sorted(call.split()[-1] for call in xelab_calls) == [
+        "libb.b_arch_tb(sim_a)",
+        "libb.b_arch_tb(sim_b)",
+    ]
+    for test in hr.runner.testbuilder.get_list_of_tests_to_run():
+        test_xsim_dir = os.path.join(test.get_test_path(), "xsim.dir")
+        assert not os.path.islink(test_xsim_dir)
+        assert os.listdir(test_xsim_dir) == [
+            "b_arch_tb_{}".format(test.get_arch().get_name())
+        ]
+
+
+PKG = """
+package My_Pkg is
+end package My_Pkg;
+
+package body my_pkg is
+end package body my_pkg;
+"""
+
+LEAF_A = """
+use work.my_pkg.all;
+
+entity leaf_a is
+end entity leaf_a;
+
+architecture rtl of leaf_a is
+begin
+end architecture rtl;
+"""
+
+LEAF_B = LEAF_A.replace("leaf_a", "leaf_b")
+
+UTIL = """
+entity util is
+end entity util;
+
+architecture rtl of util is
+begin
+end architecture rtl;
+"""
+
+TOP = """
+entity top is
+end entity top;
+
+architecture rtl of top is
+begin
+  i_a : entity work.leaf_a;
+  i_b : entity work.leaf_b;
+  i_u : entity work.util;
+end architecture rtl;
+"""
+
+TB = """
+use work.MY_PKG.all;
+use work.unknown_a.all;
+use work.unknown_b.all;
+
+entity tb is
+end entity tb;
+
+architecture sim_a of TB is
+begin
+end architecture sim_a;
+
+architecture sim_b of tb is
+begin
+end architecture sim_b;
+"""
+
+
+def create_project(library_sources) -> HDLRegression:
+    """
+    Writes {library: {filename: content}} to src/ and returns a project
+    with the libraries scanned, connected and ordered by dependency.
+    """
+    hr = HDLRegression(simulator="ghdl")
+    for library_name, sources in library_sources.items():
+        for path in write_sources(sources).values():
+            hr.add_files(path, library_name)
+    request_libraries_prepare(project=hr)
+    organize_libraries_by_dependency(project=hr)
+    return hr
+
+
+def get_hdlfiles(hr) -> dict:
+    return {
+        hdlfile.get_name(): hdlfile
+        for library in hr.library_container.get()
+        for hdlfile in library.get_hdlfile_list()
+    }
+
+
+def get_names(object_list) -> list:
+    return [obj.get_name() for obj in object_list]
+
+
+def test_library_module_graph_is_connected_by_name(stub_ghdl):
+    hr = create_project({"lib": {"pkg.vhd": PKG, "tb.vhd": TB}})
+    hdlfiles = get_hdlfiles(hr)
+    (pkg, pkg_body) = hdlfiles["pkg"].get_modules()
+    (tb, arch_a, arch_b) = hdlfiles["tb"].get_modules()
+
+    # Every unknown module is removed, also consecutive ones
+    assert tb.get_int_dep() == ["my_pkg"]
+    # A package and its body share the name
+    assert tb.get_this_depend_of() == [pkg, pkg_body]
+    assert pkg.get_depend_of_this() == [pkg_body, tb]
+    assert tb.get_architecture() == [arch_a, arch_b]
+    assert arch_a.get_this_depend_of() == [tb]
+    assert hdlfiles["tb"].get_hdlfile_this_dep_on() == [hdlfiles["pkg"], hdlfiles["tb"]]
+    assert hdlfiles["pkg"].get_hdlfile_dep_on_this() == [hdlfiles["pkg"], hdlfiles["tb"]]
+
+
+def test_library_compile_levels(stub_ghdl):
+    hr = create_project(
+        {
+            "lib": {
+                "pkg.vhd": PKG,
+                "leaf_a.vhd": LEAF_A,
+                "leaf_b.vhd": LEAF_B,
+                "util.vhd": UTIL,
+                "top.vhd": TOP,
+            }
+        }
+    )
+    (lib,) = hr.library_container.get()
+
+    assert get_names(lib.get_compile_order_list()) == ["pkg", "util", "leaf_a", "leaf_b", "top"]
+    assert [get_names(level) for level in lib.lib_hdlfile_compile_level_list] == [
+        ["pkg", "util"],
+        ["leaf_a", "leaf_b"],
+        ["top"],
+    ]
+
+
+IP_PKG = """
+package ip_pkg is
+end package ip_pkg;
+"""
+
+IP_CORE = """
+entity ip_core is
+end entity ip_core;
+
+architecture rtl of ip_core is
+begin
+end architecture rtl;
+"""
+
+DESIGN_PKG = """
+library ip_lib;
+use IP_LIB.IP_PKG.all;
+
+package design_pkg is
+end package design_pkg;
+"""
+
+DESIGN_TOP = """
+library ip_lib;
+use ip_lib.ip_pkg.all;
+
+entity design_top is
+end entity design_top;
+
+architecture rtl of design_top is
+begin
+  i_core : entity ip_lib.ip_core;
+end architecture rtl;
+"""
+
+DESIGN_COMP = """
+library ip_lib;
+
+entity design_comp is
+end entity design_comp;
+
+architecture rtl of design_comp is
+  component ip_core is
+  end component ip_core;
+begin
+  i_core : ip_core;
+end architecture rtl;
+"""
+
+
+def test_files_are_connected_and_compiled_across_libraries(stub_ghdl):
+    import threading
+
+    hr = create_project(
+        {
+            "ip_lib": {"ip_pkg.vhd": IP_PKG, "ip_core.vhd": IP_CORE},
+            "design_lib": {
+                "design_pkg.vhd": DESIGN_PKG,
+                "design_top.vhd": DESIGN_TOP,
+                "design_comp.vhd": DESIGN_COMP,
+            },
+        }
+    )
+    hdlfiles = get_hdlfiles(hr)
+    (ip_pkg, ip_core) = (hdlfiles["ip_pkg"], hdlfiles["ip_core"])
+    (design_pkg, design_top) = (hdlfiles["design_pkg"], hdlfiles["design_top"])
+
+    assert design_pkg.get_hdlfile_this_dep_on() == [ip_pkg]
+    assert design_top.get_hdlfile_this_dep_on() == [design_top, ip_pkg, ip_core]
+    assert ip_pkg.get_hdlfile_dep_on_this() == [design_pkg, design_top]
+
+    runner = hr._get_runner_object("GHDL")
+    assert runner._get_compile_dependencies(design_pkg) == ([ip_pkg], set())
+    # Library references without a design unit wait for the library
+    assert runner._get_compile_dependencies(hdlfiles["design_comp"]) == ([], {"ip_lib"})
+
+    # design_pkg only waits for ip_pkg, not for all of ip_lib
+    runner.compile_event_dict = runner._get_compile_event_dict(hr.library_container.get())
+    runner._set_compile_done([ip_pkg])
+    waiter = threading.Thread(
+        target=runner._wait_for_compile_dependencies, args=([design_pkg],)
+    )
+    waiter.start()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert not runner.compile_event_dict["ip_lib"][1].is_set()
+    # ip_lib files never wait for design_lib, which is later in order
+    assert runner._wait_for_compile_dependencies([ip_core]) is None
+
+
+EXT_PKG = """
+package ext_pkg is
+end package ext_pkg;
+"""
+
+DUT = UTIL.replace("util", "dut")
+
+UNUSED = UTIL.replace("util", "unused")
+
+DUT_TB = """
+-- hdlregression:tb
+library ext_lib;
+
+entity dut_tb is
+end entity dut_tb;
+
+architecture sim of dut_tb is
+begin
+  i_dut : entity work.dut;
+end architecture sim;
+"""
+
+
+def test_elaboration_hash_follows_dependency_closure(stub_ghdl):
+    write_sources(
+        {"ext_pkg.vhd": EXT_PKG, "dut.vhd": DUT, "unused.vhd": UNUSED, "dut_tb.vhd": DUT_TB}
+    )
+    hr = HDLRegression(simulator="ghdl")
+    hr.add_files(os.path.abspath("src/ext_pkg.vhd"), "ext_lib")
+    hr.add_files(os.path.abspath("src/dut*.vhd"), "tb_lib")
+    hr.add_files(os.path.abspath("src/unused.vhd"), "tb_lib")
+    hr.set_result_check_string("stub test done")
+    assert hr.start() == 0
+    (test,) = hr.runner.testbuilder.get_list_of_tests_to_run()
+    hdlfiles = get_hdlfiles(hr)
+
+    # The testbench, its files and every file of the libraries it refers to
+    dep_files = hr.runner._get_test_dependency_files(test)
+    assert sorted(get_names(dep_files)) == ["dut", "dut_tb", "ext_pkg"]
+
+    elab_hash = hr.runner._get_elaboration_hash(test, ["-e"])
+    # Recompiling a file outside the closure keeps the hash
+    hdlfiles["unused"].compile_time += 1
+    assert hr.runner._get_elaboration_hash(test, ["-e"]) == elab_hash
+    # Recompiling a dependency, or changing options, invalidates it
+    assert hr.runner._get_elaboration_hash(test, ["-e", "-O2"]) != elab_hash
+    hdlfiles["ext_pkg"].compile_time += 1
+    assert hr.runner._get_elaboration_hash(test, ["-e"]) != elab_hash
@@ -277,3 +277,39 @@ def test_add_system_verilog_file_filetype(sim_env, tb_path):
     library = hr._get_library_object("test_lib")
     file_list = library.get_hdlfile_list()
     assert isinstance(file_list[0], SVFile) == True, "check filetype object"
+
+
+# ==============================================================
+# Change detection tests
+# ==============================================================
+
+
+class UnchangedLibrary:
+    def get_need_compile(self):
+        return False
+
+
+def test_touched_file_with_same_content_is_not_changed(tmp_path):
+    source = tmp_path / "dut.vhd"
+    source.write_text("entity dut is\nend entity;\n")
+    hdlFile = HDLFile(
+        filename_with_path=str(source),
+        project=None,
+        library=UnchangedLibrary(),
+        code_coverage=False,
+        hdl_version="2008",
+        parse_file=False,
+        com_options=None,
+    )
+    assert hdlFile.get_need_compile() is True, "Expecting compile of new file"
+
+    hdlFile.update_compile_time()
+    assert hdlFile.get_need_compile() is False
+
+    # Touch, e.g. checkout, without content change
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert hdlFile.get_need_compile() is False, "Expecting touched file to be unchanged"
+
+    source.write_text("entity dut is\nend entity dut;\n")
+    assert hdlFile.get_need_compile() is True, "Expecting changed file to compile"
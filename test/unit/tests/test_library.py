@@ -285,3 +285,199 @@ def test_empty_library(sim_env, tb_path):
 #    res = hr.start()
 #
 #    assert res == 1, "check recursive dependency detection and report"
+
+
+class ContainerItem:
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+    def get_name(self):
+        return self.name
+
+    def get_path(self):
+        return self.path
+
+
+def test_container_name_index_follows_add_remove_and_pickle():
+    import pickle
+    from hdlregression.construct.container import Container
+
+    container = Container("items")
+    first = ContainerItem("Tb", "/src/a/tb.vhd")
+    second = ContainerItem("tb", "/src/b/tb.vhd")
+    other = ContainerItem("pkg", "/src/pkg.vhd")
+    for item in [first, second, other, first]:
+        container.add(item)
+
+    assert container.get() == [first, second, other]
+    assert container.get("TB") is first
+    assert container.find("/SRC/B/tb.vhd", index_method="get_path") is second
+    assert container.find("missing") is None
+    assert container.exists("pkg")
+
+    item_list = container.get()
+    for item in item_list:
+        if item.get_name().lower() == "tb":
+            container.remove(item)
+    assert container.get() == [other]
+    assert len(item_list) == 3
+
+    container = pickle.loads(pickle.dumps(container))
+    assert "_id_set" not in container.__getstate__()
+    assert container.find("pkg", index_method="get_path") is None
+    assert container.add(container.find("pkg")) is False
+    # Elements compared by value are not added twice
+    container.add(["tc_1", "gen"])
+    assert container.add(["tc_1", "gen"]) is False
+
+
+class ProjectSettings:
+    """
+    Settings used when scanning files, without simulator detection.
+    """
+
+    def get_script_path(self):
+        return ""
+
+    def get_testcase_identifier_name(self):
+        return "gc_testcase"
+
+    def get_logger_level(self):
+        return "warning"
+
+    def get_is_gui_mode(self):
+        return False
+
+    def get_use_log_color(self):
+        return False
+
+    def get_debug_mode(self):
+        return False
+
+    def get_num_threads(self):
+        return 0
+
+    def get_scan_large_file_size(self):
+        return 50
+
+    def get_scan_cache_path(self):
+        return None
+
+
+def create_project_library(tmp_path):
+    """
+    Returns a project with a library of a package and a testbench
+    using it, and the library container of the project.
+    """
+    from types import SimpleNamespace
+    from hdlregression.construct.container import Container
+    from hdlregression.construct.hdllibrary import HDLLibrary
+
+    (tmp_path / "pkg.vhd").write_text(
+        "package pkg is\nend package;\npackage body pkg is\nend package body;\n"
+    )
+    (tmp_path / "tb.vhd").write_text(
+        "-- hdlregression:tb\nuse work.pkg.all;\nentity tb is\nend entity;\n"
+        "architecture sim of tb is\nbegin\nend architecture;\n"
+    )
+    project = SimpleNamespace(settings=ProjectSettings())
+    library = HDLLibrary(name="lib", project=project)
+    for filename in ["pkg.vhd", "tb.vhd"]:
+        library.add_file(filename=str(tmp_path / filename), hdl_version="2008",
+                         com_options=None, parse_file=True, code_coverage=False,
+                         netlist_instance=None)
+    library.update_file_list()
+    library.check_library_files_for_changes()
+    library.prepare_for_run()
+    library_container = Container("library")
+    library_container.add(library)
+    return project, library_container
+
+
+def test_project_database_keeps_references_and_writes_changed_rows(tmp_path):
+    import sqlite3
+    from contextlib import closing
+    from hdlregression.construct.project_db import ProjectDatabase
+
+    (project, library_container) = create_project_library(tmp_path)
+    ProjectDatabase(str(tmp_path), project=project).save({"library": library_container}, [])
+
+    project_db = ProjectDatabase(str(tmp_path), project=project)
+    (object_dict, test_list) = project_db.load(["library"])
+    assert test_list == []
+    library = object_dict["library"].get("lib")
+    (pkg_file, tb_file) = library.get_hdlfile_list()
+    # Objects refer to the same objects, and to this project
+    assert library.get_compile_order_list() == [pkg_file, tb_file]
+    assert tb_file.get_hdlfile_this_dep_on() == [pkg_file, tb_file]
+    assert pkg_file.get_library() is library
+    assert pkg_file.get_modules()[0].get_hdlfile() is pkg_file
+    assert pkg_file.project is project
+
+    def get_digests():
+        with closing(sqlite3.connect(project_db.filename)) as connection:
+            return dict(
+                (row[0], row[1])
+                for row in connection.execute("SELECT filename, digest FROM hdlfile")
+            )
+
+    # Only the changed file is written
+    project_db.save(object_dict, [])
+    digests = get_digests()
+    tb_file.update_compile_time()
+    project_db.save(object_dict, [])
+    new_digests = get_digests()
+    pkg_filename = pkg_file.get_filename_with_path()
+    tb_filename = tb_file.get_filename_with_path()
+    assert new_digests[pkg_filename] == digests[pkg_filename]
+    assert new_digests[tb_filename] != digests[tb_filename]
+
+
+def test_project_database_loads_modules_when_used_and_saves_changed_objects(tmp_path):
+    from hdlregression.construct.hdlfile import HDLFile
+    from hdlregression.construct.hdl_modules_pkg import BaseModule
+    from hdlregression.construct.project_db import ProjectDatabase
+    from hdlregression.scan.hdlscanner import HDLScanner
+
+    (project, library_container) = create_project_library(tmp_path)
+    ProjectDatabase(str(tmp_path), project=project).save({"library": library_container}, [])
+
+    project_db = ProjectDatabase(str(tmp_path), project=project)
+    (object_dict, _) = project_db.load(["library"])
+    library = object_dict["library"].get("lib")
+    (pkg_file, tb_file) = library.get_hdlfile_list()
+    # Scan data and modules are loaded when used, by file
+    assert not pkg_file.scanner.__dict__
+    assert not tb_file.scanner.__dict__
+    assert [module.get_name() for module in pkg_file.get_modules()] == ["pkg", "pkg"]
+    assert pkg_file.scanner.__dict__
+    assert not tb_file.scanner.__dict__
+    # Testbenches are found without loading other files
+    assert pkg_file.get_tb_modules() == []
+    (tb_module,) = tb_file.get_tb_modules()
+    assert tb_module.get_hdlfile() is tb_file
+    assert tb_module in library.module_list
+
+    saved_list = []
+    dumps = project_db._dumps
+
+    def saved_dumps(obj):
+        saved_list.append(obj)
+        return dumps(obj)
+
+    project_db._dumps = saved_dumps
+    # Unchanged files, scan data and modules are not pickled
+    project_db.save(object_dict, [])
+    assert not any(isinstance(obj, (HDLFile, HDLScanner, BaseModule)) for obj in saved_list)
+
+    saved_list.clear()
+    tb_file.update_compile_time()
+    project_db.save(object_dict, [])
+    assert [obj for obj in saved_list if isinstance(obj, HDLFile)] == [tb_file]
+
+    # Modules not loaded are kept
+    (object_dict, _) = ProjectDatabase(str(tmp_path), project=project).load(["library"])
+    library = object_dict["library"].get("lib")
+    assert [module.get_name() for module in library.module_list] == ["pkg", "pkg", "tb", "sim"]
+    assert library.get_hdlfile_list()[1].get_compile_time() == tb_file.get_compile_time()
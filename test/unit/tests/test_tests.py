@@ -18,6 +18,7 @@ import pytest
 import subprocess
 
 from hdlregression import HDLRegression
+from fakes import FakeHdlFile, FakeHdlLibrary, FakeProject, FakeRunner, FakeTest
 
 
 if len(sys.argv) >= 2:
@@ -137,3 +138,213 @@ def test_sequencer_generated_testcases(sim_env, tb_path):
         ), "check testcase from GC_TESTCASE (%s)" % (test)
 
     assert len(run_tests) == 3, "check number of generated tests"
+
+
+def test_tests_ordered_longest_first():
+    from hdlregression.run.sim_runner import SimRunner
+
+    short_test = FakeTest("lib:tb.arch.short", "lib:tb.arch")
+    long_test = FakeTest("lib:tb.arch.long", "lib:tb.arch")
+    medium_test = FakeTest("lib:tb2.arch.medium", "lib:tb2.arch")
+    runner = FakeRunner(
+        {
+            "lib:tb.arch.short": 10,
+            "lib:tb.arch.long": 2000,
+            "lib:tb2.arch.medium": 500,
+        }
+    )
+
+    ordered = SimRunner._order_tests_by_duration(
+        runner, [short_test, medium_test, long_test]
+    )
+
+    assert ordered == [long_test, medium_test, short_test]
+
+
+def test_tests_without_duration_are_estimated():
+    from hdlregression.run.sim_runner import SimRunner
+
+    known_tb_test = FakeTest("lib:tb.arch.known", "lib:tb.arch")
+    new_tb_testcase = FakeTest("lib:tb.arch.new", "lib:tb.arch")
+    short_test = FakeTest("lib:tb2.arch.short", "lib:tb2.arch")
+    new_tb = FakeTest("lib:tb3.arch.new", "lib:tb3.arch")
+    runner = FakeRunner({"lib:tb.arch.known": 1000, "lib:tb2.arch.short": 10})
+
+    ordered = SimRunner._order_tests_by_duration(
+        runner, [short_test, new_tb, known_tb_test, new_tb_testcase]
+    )
+
+    # New testcase in a known testbench uses the testbench mean (1000),
+    # an unknown testbench uses the mean of all recorded tests (505).
+    assert ordered == [known_tb_test, new_tb_testcase, new_tb, short_test]
+
+
+def test_tests_keep_order_without_durations():
+    from hdlregression.run.sim_runner import SimRunner
+
+    tests = [FakeTest("a", "a"), FakeTest("b", "b"), FakeTest("c", "c")]
+    ordered = SimRunner._order_tests_by_duration(FakeRunner(), tests)
+
+    assert ordered == tests
+
+
+FAKE_SIMULATOR_SHELL = """
+import sys
+import time
+for line in sys.stdin:
+    cmd = line.strip()
+    if cmd == "crash":
+        sys.exit(3)
+    elif cmd == "hang":
+        time.sleep(60)
+    elif cmd.startswith("puts "):
+        print(cmd[5:].strip('"'), flush=True)
+    elif cmd:
+        print("# " + cmd, flush=True)
+"""
+
+
+def test_simulator_worker_pool_replaces_crashed_worker(tmp_path):
+    from hdlregression.run.sim_worker import SimulatorWorkerPool
+
+    pool = SimulatorWorkerPool(
+        command=[sys.executable, "-c", FAKE_SIMULATOR_SHELL],
+        num_workers=1,
+        path=str(tmp_path),
+        project=FakeProject(),
+    )
+    worker_id, worker = pool.acquire()
+    assert list(worker.run(["do run.do"])) == [("# do run.do\n", True)]
+    # Worker is reused for the next test
+    pool.release(worker_id, worker)
+    assert pool.acquire() == (worker_id, worker)
+
+    output = list(worker.run(["crash"]))
+    assert output[-1][1] is False
+    pool.release(worker_id, worker)
+
+    worker_id, new_worker = pool.acquire()
+    assert new_worker is not worker
+    assert list(new_worker.run(["quit -sim"])) == [("# quit -sim\n", True)]
+
+    # Reported status other than ok fails the test and replaces the worker
+    status = 'puts "HDLREGRESSION_WORKER_STATUS {}"'
+    assert list(new_worker.run([status.format("ok")])) == [
+        ("HDLREGRESSION_WORKER_STATUS ok\n", True)
+    ]
+    output = list(new_worker.run([status.format("load failed")]))
+    assert output[-1] == ("Error: Simulator worker status: load failed", False)
+    assert not new_worker.is_alive()
+    pool.release(worker_id, new_worker)
+
+    # Test running longer than the timeout replaces the worker
+    worker_id, worker = pool.acquire()
+    assert worker is not new_worker
+    output = list(worker.run(["hang"], timeout=0.5))
+    assert output[-1] == ("Error: Simulator worker timed out after 0.5 seconds", False)
+    assert not worker.is_alive()
+    pool.release(worker_id, worker)
+    pool.stop()
+
+
+def test_library_sort_reports_recursive_dependency_path():
+    from hdlregression.hdlregression_pkg import sort_libraries_by_dependency
+
+    util = FakeHdlLibrary()
+    lib_a = FakeHdlLibrary(lib_deps=[util])
+    lib_b = FakeHdlLibrary(lib_deps=[lib_a])
+    lib_c = FakeHdlLibrary(lib_deps=[lib_b, lib_a])
+    tb_lib = FakeHdlLibrary(lib_deps=[lib_c])
+    lib_a._lib_deps.append(lib_c)
+
+    (levels, cycle) = sort_libraries_by_dependency([tb_lib, lib_c, lib_b, lib_a, util])
+    assert levels == [[util], [tb_lib], [lib_c], [lib_b], [lib_a]]
+    # tb_lib is not part of the cycle, only depends on it
+    assert cycle == [lib_c, lib_b, lib_a, lib_c]
+
+    lib_a._lib_deps.remove(lib_c)
+    (levels, cycle) = sort_libraries_by_dependency([tb_lib, lib_c, lib_b, lib_a, util])
+    assert levels == [[util], [lib_a], [lib_b], [lib_c], [tb_lib]]
+    assert cycle == []
+
+
+def test_compile_batches_group_files_with_identical_options():
+    from hdlregression.run.sim_runner import SimRunner
+
+    lib = FakeHdlLibrary()
+    pkg = FakeHdlFile("pkg.vhd", lib)
+    dut = FakeHdlFile("dut.vhd", lib)
+    assertions = FakeHdlFile("assertions.sv", lib)
+    tb = FakeHdlFile("tb.vhd", lib)
+
+    def get_compile_call(hdlfile):
+        if hdlfile is assertions:
+            return ["vlog", "-sv", "-work", "lib", hdlfile.get_filename_with_path()]
+        return ["vcom", "-2008", "-work", "lib", hdlfile.get_filename_with_path(), "-quiet"]
+
+    batches = SimRunner._get_compile_batches([pkg, dut, assertions, tb], get_compile_call)
+    assert batches == [
+        (["vcom", "-2008", "-work", "lib", "/src/pkg.vhd", "/src/dut.vhd", "-quiet"], [pkg, dut]),
+        (["vlog", "-sv", "-work", "lib", "/src/assertions.sv"], [assertions]),
+        (["vcom", "-2008", "-work", "lib", "/src/tb.vhd", "-quiet"], [tb]),
+    ]
+
+
+def test_compile_cache_restores_and_evicts_libraries(tmp_path):
+    from hdlregression.run.compile_cache import CompileCache
+
+    def create_library(name, size):
+        library_path = tmp_path / "workspace" / name
+        library_path.mkdir(parents=True)
+        (library_path / "_info").write_bytes(b"x" * size)
+        return str(library_path)
+
+    cache = CompileCache(str(tmp_path / "cache"), max_size_mb=1, project=FakeProject())
+    util_path = create_library("uvvm_util", 600 * 1024)
+    assert not cache.restore("aa01", util_path)
+    cache.store("aa01", util_path)
+
+    # Library is restored in another workspace
+    restore_path = str(tmp_path / "other_workspace" / "uvvm_util")
+    assert cache.restore("aa01", restore_path)
+    assert os.path.getsize(os.path.join(restore_path, "_info")) == 600 * 1024
+
+    # Least recently used entry is removed when the cache is full
+    os.utime(os.path.join(cache.path, "aa", "aa01"), (0, 0))
+    cache.store("bb02", create_library("bitvis_vip", 600 * 1024))
+    assert not cache.restore("aa01", restore_path)
+    assert cache.restore("bb02", restore_path)
+
+
+def test_verdict_hash_changes_with_test_inputs():
+    from hdlregression.run.sim_runner import SimRunner
+    from hdlregression.settings import TestcaseSettings
+
+    runner = object.__new__(SimRunner)
+    runner.simulator_version = "1.0"
+    runner.project = FakeProject()
+    runner.project.testcase_settings = TestcaseSettings()
+    tb_file = FakeHdlFile("tb.vhd", digest="aaaa")
+    runner._get_test_dependency_files = lambda test: [tb_file]
+
+    test = FakeTest("lib:tb.arch tc_1", gc_str="-gGC_TESTCASE=tc_1")
+    other_test = FakeTest("lib:tb.arch tc_2", gc_str="-gGC_TESTCASE=tc_2")
+    verdict_hash = runner._get_verdict_hash(test)
+    assert runner._get_verdict_hash(test) == verdict_hash
+    assert runner._get_verdict_hash(other_test) != verdict_hash
+
+    tb_file.digest = "bbbb"
+    assert runner._get_verdict_hash(test) != verdict_hash
+
+
+def test_ghdl_backend_from_code_generator_line():
+    from hdlregression.run.runner_ghdl import GHDLRunner
+
+    get_backend = GHDLRunner._get_backend_from_version
+    header = "GHDL 3.0.0 (Ubuntu 3.0.0+dfsg-1) [Dunoon edition]\n"
+    assert get_backend(header + " Compiled with GNAT Version: 12.2.0\n mcode code generator\n") == "mcode"
+    assert get_backend(header + " llvm 14.0.6 code generator\n") == "llvm"
+    assert get_backend(header + " GCC 12.2.0 code generator\n") == "gcc"
+    assert get_backend(header + " GCC back-end code generator\n") == "gcc"
+    # Build paths and compiler names do not select the backend
+    assert get_backend("GHDL 4.0.0 (/opt/llvm-gcc/ghdl) [mcode build]\n") is None